@@ -10,6 +10,8 @@ from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 
+from . import rng_service
+
 # ============================================================================
 # SYSTEM PROMPT
 # ============================================================================
@@ -257,19 +259,25 @@ def generate_map_seed(
 # COMBAT MECHANICS
 # ============================================================================
 
-def roll_initiative(dex_modifier: int) -> int:
-    """Roll initiative: 1d20 + DEX modifier."""
-    d20 = random.randint(1, 20)
+def roll_initiative(dex_modifier: int, rng: Optional[random.Random] = None) -> int:
+    """Roll initiative: 1d20 + DEX modifier (from rng, or the "initiative" stream)."""
+    d20 = (rng or rng_service.stream("initiative")).randint(1, 20)
     return d20 + dex_modifier
 
-def roll_attack(attack_bonus: int, advantage: bool = False, disadvantage: bool = False) -> Dict[str, Any]:
-    """Roll attack: 1d20 + bonus, with optional advantage/disadvantage."""
+def roll_attack(
+    attack_bonus: int,
+    advantage: bool = False,
+    disadvantage: bool = False,
+    rng: Optional[random.Random] = None
+) -> Dict[str, Any]:
+    """Roll attack: 1d20 + bonus, with optional advantage/disadvantage (from rng, or the "dice" stream)."""
+    rng = rng or rng_service.stream("dice")
     if advantage:
-        roll = max(random.randint(1, 20), random.randint(1, 20))
+        roll = max(rng.randint(1, 20), rng.randint(1, 20))
     elif disadvantage:
-        roll = min(random.randint(1, 20), random.randint(1, 20))
+        roll = min(rng.randint(1, 20), rng.randint(1, 20))
     else:
-        roll = random.randint(1, 20)
+        roll = rng.randint(1, 20)
     
     total = roll + attack_bonus
     hit = roll == 1 or (roll != 20 and total >= 10)  # Assume AC 10 for now
@@ -283,8 +291,8 @@ def roll_attack(attack_bonus: int, advantage: bool = False, disadvantage: bool =
         "fumble": roll == 1
     }
 
-def roll_damage(damage_dice: str, damage_bonus: int) -> Dict[str, Any]:
-    """Roll damage from a dice expression (e.g., '1d8', '2d6')."""
+def roll_damage(damage_dice: str, damage_bonus: int, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """Roll damage from a dice expression (e.g., '1d8', '2d6'), from rng or the "dice" stream."""
     # Simple parser: "1d8" or "2d6+3"
     parts = damage_dice.lower().split('d')
     if len(parts) != 2:
@@ -298,7 +306,8 @@ def roll_damage(damage_dice: str, damage_bonus: int) -> Dict[str, Any]:
     except (ValueError, IndexError):
         return {"error": f"Invalid damage dice format: {damage_dice}"}
     
-    rolls = [random.randint(1, die_size) for _ in range(num_dice)]
+    rng = rng or rng_service.stream("dice")
+    rolls = [rng.randint(1, die_size) for _ in range(num_dice)]
     total = sum(rolls) + extra_bonus + damage_bonus
     
     return {
@@ -311,17 +320,19 @@ def roll_damage(damage_dice: str, damage_bonus: int) -> Dict[str, Any]:
 
 def create_combat_state(
     encounter_id: str,
-    actors: List[Dict[str, Any]]
+    actors: List[Dict[str, Any]],
+    rng: Optional[random.Random] = None
 ) -> CombatState:
     """
     Create a new combat state from initiative rolls.
     actors: [{"actor_id", "actor_name", "dex_modifier"}, ...]
+    rng: the room's "initiative" stream, so seeded rooms replay turn order
     """
     initiative_rolls = [
         {
             "actor_id": actor["actor_id"],
             "actor_name": actor["actor_name"],
-            "initiative": roll_initiative(actor.get("dex_modifier", 0))
+            "initiative": roll_initiative(actor.get("dex_modifier", 0), rng)
         }
         for actor in actors
     ]
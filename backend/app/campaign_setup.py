@@ -529,6 +529,10 @@ import json
 from datetime import datetime
 from typing import List
 
+from . import save_store
+from .play_history import store_for
+from .save_manifest import list_summaries
+
 CAMPAIGNS_DIR = "saved_campaigns"
 
 def _ensure_campaigns_dir() -> None:
@@ -537,6 +541,14 @@ def _ensure_campaigns_dir() -> None:
         os.makedirs(CAMPAIGNS_DIR)
 
 
+def _use_store() -> bool:
+    """True when campaigns live in SQLite; imports the legacy directory on first use."""
+    if not save_store.enabled():
+        return False
+    save_store.import_campaign_dir(CAMPAIGNS_DIR)
+    return True
+
+
 def _get_campaign_path(campaign_id: str) -> str:
     """Get the file path for a campaign."""
     return os.path.join(CAMPAIGNS_DIR, f"{campaign_id}.json")
@@ -552,8 +564,6 @@ def save_campaign(campaign: CampaignSetup) -> str:
     Returns:
         campaign_id: The saved campaign's ID
     """
-    _ensure_campaigns_dir()
-    
     if not campaign.campaign_id:
         import uuid
         campaign.campaign_id = str(uuid.uuid4())
@@ -562,6 +572,11 @@ def save_campaign(campaign: CampaignSetup) -> str:
     campaign_data["created_at"] = datetime.now().isoformat()
     campaign_data["last_played"] = None
     
+    if _use_store():
+        return save_store.put_campaign(campaign_data)
+    
+    _ensure_campaigns_dir()
+    
     path = _get_campaign_path(campaign.campaign_id)
     
     with open(path, 'w') as f:
@@ -580,6 +595,10 @@ def load_campaign(campaign_id: str) -> Optional[CampaignSetup]:
     Returns:
         CampaignSetup object or None if not found
     """
+    if _use_store():
+        campaign_data = save_store.get_campaign(campaign_id)
+        return deserialize_campaign(campaign_data) if campaign_data else None
+    
     path = _get_campaign_path(campaign_id)
     
     if not os.path.exists(path):
@@ -588,11 +607,9 @@ def load_campaign(campaign_id: str) -> Optional[CampaignSetup]:
     with open(path, 'r') as f:
         campaign_data = json.load(f)
     
-    # Update last_played timestamp
-    campaign_data["last_played"] = datetime.now().isoformat()
-    
-    with open(path, 'w') as f:
-        json.dump(campaign_data, f, indent=2)
+    # Update last_played timestamp (kept out of the file so loading stays read-only)
+    campaign_data.pop("last_played", None)
+    store_for(CAMPAIGNS_DIR).touch(campaign_id)
     
     return deserialize_campaign(campaign_data)
 
@@ -607,15 +624,33 @@ def delete_campaign(campaign_id: str) -> bool:
     Returns:
         True if deleted, False if not found
     """
+    if _use_store():
+        return save_store.delete_campaign(campaign_id)
+    
     path = _get_campaign_path(campaign_id)
     
     if not os.path.exists(path):
         return False
     
     os.remove(path)
+    store_for(CAMPAIGNS_DIR).forget(campaign_id)
     return True
 
 
+def _summarize_campaign(campaign_data: Dict[str, Any], filename: str) -> Dict[str, Any]:
+    """Summary fields shown in the campaign picker."""
+    return {
+        "id": campaign_data.get("campaign_id") or filename[:-len(".json")],
+        "name": campaign_data.get("campaign_name"),
+        "story_type": campaign_data.get("story_type"),
+        "campaign_length": campaign_data.get("campaign_length"),
+        "core_conflict": campaign_data.get("core_conflict"),
+        "estimated_sessions": campaign_data.get("estimated_sessions"),
+        "created_at": campaign_data.get("created_at"),
+        "last_played": campaign_data.get("last_played"),
+    }
+
+
 def list_campaigns() -> List[Dict[str, Any]]:
     """
     List all saved campaigns.
@@ -623,35 +658,16 @@ def list_campaigns() -> List[Dict[str, Any]]:
     Returns:
         List of campaign metadata dictionaries
     """
+    if _use_store():
+        return save_store.list_campaigns()
+    
     _ensure_campaigns_dir()
     
-    campaigns = []
+    last_played = store_for(CAMPAIGNS_DIR)
     
-    if not os.path.exists(CAMPAIGNS_DIR):
-        return campaigns
-    
-    for filename in os.listdir(CAMPAIGNS_DIR):
-        if not filename.endswith('.json'):
-            continue
-        
-        try:
-            path = os.path.join(CAMPAIGNS_DIR, filename)
-            with open(path, 'r') as f:
-                campaign_data = json.load(f)
-            
-            campaigns.append({
-                "id": campaign_data.get("campaign_id"),
-                "name": campaign_data.get("campaign_name"),
-                "story_type": campaign_data.get("story_type"),
-                "campaign_length": campaign_data.get("campaign_length"),
-                "core_conflict": campaign_data.get("core_conflict"),
-                "estimated_sessions": campaign_data.get("estimated_sessions"),
-                "created_at": campaign_data.get("created_at"),
-                "last_played": campaign_data.get("last_played"),
-            })
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error reading campaign {filename}: {e}")
-            continue
+    campaigns = list_summaries(CAMPAIGNS_DIR, _summarize_campaign, "campaign")
+    for campaign in campaigns:
+        campaign["last_played"] = last_played.get(campaign["id"], fallback=campaign.get("last_played"))
     
     # Sort by last_played (most recent first), then by created_at
     campaigns.sort(
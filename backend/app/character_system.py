@@ -10,6 +10,10 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from . import save_store
+from .play_history import store_for
+from .save_manifest import list_summaries
+
 
 # ============================================================================
 # CHARACTER DATACLASS
@@ -106,6 +110,68 @@ def _get_player_character_path(player_id: str, character_id: str) -> str:
     return os.path.join(player_dir, f"{character_id}.json")
 
 
+# character_id -> file path. Built by a single directory scan on first use and
+# kept current by save/delete, so lookups don't probe every player directory.
+# _character_index_stamp is CHARACTERS_DIR's mtime at that scan: a miss rescans
+# only if it has changed (a player directory was added, removed or renamed).
+_character_index: Optional[Dict[str, str]] = None
+_character_index_stamp: Optional[int] = None
+
+
+def _characters_dir_stamp() -> Optional[int]:
+    try:
+        return os.stat(CHARACTERS_DIR).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _build_character_index() -> Dict[str, str]:
+    """Scan all player directories once and map character ids to their files."""
+    index: Dict[str, str] = {}
+    if not os.path.exists(CHARACTERS_DIR):
+        return index
+    with os.scandir(CHARACTERS_DIR) as players:
+        for player_entry in players:
+            if not player_entry.name.startswith("player_") or not player_entry.is_dir():
+                continue
+            with os.scandir(player_entry.path) as files:
+                for file_entry in files:
+                    if file_entry.name.endswith(".json"):
+                        index[file_entry.name[:-len(".json")]] = file_entry.path
+    return index
+
+
+def _get_character_index(rescan: bool = False) -> Dict[str, str]:
+    """The id -> path index; rescan=True rebuilds it if CHARACTERS_DIR changed since."""
+    global _character_index, _character_index_stamp
+    if _character_index is None or rescan:
+        stamp = _characters_dir_stamp()
+        if _character_index is None or stamp != _character_index_stamp:
+            # Stamp first, so a change made during the scan triggers another one.
+            _character_index_stamp = stamp
+            _character_index = _build_character_index()
+    return _character_index
+
+
+def _find_character_path(character_id: str) -> Optional[str]:
+    """Get the file path for a character id, or None if it isn't stored."""
+    path = _get_character_index().get(character_id)
+    if path and os.path.exists(path):
+        return path
+    # Missing or stale: rebuild once if another process changed the directory,
+    # so unknown ids cost one stat rather than a scan each.
+    path = _get_character_index(rescan=True).get(character_id)
+    return path if path and os.path.exists(path) else None
+
+
+def _use_store() -> bool:
+    """True when characters live in SQLite; imports the legacy directory on first use."""
+    if not save_store.enabled():
+        return False
+    save_store.import_character_dir(CHARACTERS_DIR)
+    return True
+
+
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
@@ -161,17 +227,22 @@ def save_character(character: Character) -> str:
     Returns:
         character_id
     """
-    _ensure_player_dir(character.player_id)
-    
     character_data = asdict(character)
     character_data["created_at"] = character.created_at
     character_data["last_played"] = None
     
+    if _use_store():
+        return save_store.put_character(character_data)
+    
+    _ensure_player_dir(character.player_id)
+    
     path = _get_player_character_path(character.player_id, character.character_id)
     
     with open(path, 'w') as f:
         json.dump(character_data, f, indent=2)
     
+    _get_character_index()[character.character_id] = path
+    
     return character.character_id
 
 
@@ -185,26 +256,20 @@ def load_character(character_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Character dictionary or None if not found
     """
-    # First try to find in any player directory
-    if not os.path.exists(CHARACTERS_DIR):
+    if _use_store():
+        return save_store.get_character(character_id)
+    
+    path = _find_character_path(character_id)
+    if not path:
         return None
     
-    for player_dir in os.listdir(CHARACTERS_DIR):
-        if player_dir.startswith("player_"):
-            path = os.path.join(CHARACTERS_DIR, player_dir, f"{character_id}.json")
-            if os.path.exists(path):
-                with open(path, 'r') as f:
-                    character_data = json.load(f)
-                
-                # Update last_played
-                character_data["last_played"] = datetime.now().isoformat()
-                
-                with open(path, 'w') as f:
-                    json.dump(character_data, f, indent=2)
-                
-                return character_data
+    with open(path, 'r') as f:
+        character_data = json.load(f)
+    
+    # Update last_played (kept out of the file so loading stays read-only)
+    character_data["last_played"] = store_for(CHARACTERS_DIR).touch(character_id)
     
-    return None
+    return character_data
 
 
 def delete_character(character_id: str) -> bool:
@@ -217,17 +282,32 @@ def delete_character(character_id: str) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    if not os.path.exists(CHARACTERS_DIR):
-        return False
+    if _use_store():
+        return save_store.delete_character(character_id)
     
-    for player_dir in os.listdir(CHARACTERS_DIR):
-        if player_dir.startswith("player_"):
-            path = os.path.join(CHARACTERS_DIR, player_dir, f"{character_id}.json")
-            if os.path.exists(path):
-                os.remove(path)
-                return True
+    path = _find_character_path(character_id)
+    if not path:
+        return False
     
-    return False
+    os.remove(path)
+    _get_character_index().pop(character_id, None)
+    store_for(CHARACTERS_DIR).forget(character_id)
+    return True
+
+
+def _summarize_character(character_data: Dict[str, Any], filename: str) -> Dict[str, Any]:
+    """Summary fields shown in the character picker."""
+    return {
+        "id": character_data.get("character_id") or filename[:-len(".json")],
+        "character_name": character_data.get("character_name"),
+        "player_name": character_data.get("player_name"),
+        "race": character_data.get("race"),
+        "class": character_data.get("class_name"),
+        "level": character_data.get("level", 1),
+        "background": character_data.get("background"),
+        "created_at": character_data.get("created_at"),
+        "last_played": character_data.get("last_played"),
+    }
 
 
 def list_characters(player_id: str) -> List[Dict[str, Any]]:
@@ -240,35 +320,15 @@ def list_characters(player_id: str) -> List[Dict[str, Any]]:
     Returns:
         List of character dictionaries
     """
-    characters = []
-    player_dir = _get_player_dir(player_id)
+    if _use_store():
+        return save_store.list_characters(player_id)
     
-    if not os.path.exists(player_dir):
-        return characters
+    player_dir = _get_player_dir(player_id)
+    last_played = store_for(CHARACTERS_DIR)
     
-    for filename in os.listdir(player_dir):
-        if not filename.endswith('.json'):
-            continue
-        
-        try:
-            path = os.path.join(player_dir, filename)
-            with open(path, 'r') as f:
-                character_data = json.load(f)
-            
-            characters.append({
-                "id": character_data.get("character_id"),
-                "character_name": character_data.get("character_name"),
-                "player_name": character_data.get("player_name"),
-                "race": character_data.get("race"),
-                "class": character_data.get("class_name"),
-                "level": character_data.get("level", 1),
-                "background": character_data.get("background"),
-                "created_at": character_data.get("created_at"),
-                "last_played": character_data.get("last_played"),
-            })
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error reading character {filename}: {e}")
-            continue
+    characters = list_summaries(player_dir, _summarize_character, "character")
+    for character in characters:
+        character["last_played"] = last_played.get(character["id"], fallback=character.get("last_played"))
     
     # Sort by last_played (most recent first), then by created_at
     characters.sort(
@@ -293,32 +353,29 @@ def update_character(character_id: str, updates: Dict[str, Any]) -> bool:
     Returns:
         True if successful, False if not found
     """
+    if _use_store():
+        return save_store.update_character(character_id, updates)
+    
     # Find and load the character
-    if not os.path.exists(CHARACTERS_DIR):
+    path = _find_character_path(character_id)
+    if not path:
         return False
     
-    for player_dir in os.listdir(CHARACTERS_DIR):
-        if player_dir.startswith("player_"):
-            path = os.path.join(CHARACTERS_DIR, player_dir, f"{character_id}.json")
-            if os.path.exists(path):
-                with open(path, 'r') as f:
-                    character_data = json.load(f)
-                
-                # Apply updates
-                for key, value in updates.items():
-                    if key in character_data:
-                        character_data[key] = value
-                
-                # Update last_played
-                character_data["last_played"] = datetime.now().isoformat()
-                
-                # Save updated character
-                with open(path, 'w') as f:
-                    json.dump(character_data, f, indent=2)
-                
-                return True
-    
-    return False
+    with open(path, 'r') as f:
+        character_data = json.load(f)
+    
+    # Apply updates
+    for key, value in updates.items():
+        if key in character_data:
+            character_data[key] = value
+    
+    store_for(CHARACTERS_DIR).touch(character_id)
+    
+    # Save updated character
+    with open(path, 'w') as f:
+        json.dump(character_data, f, indent=2)
+    
+    return True
 
 
 # ============================================================================
@@ -329,7 +386,8 @@ def update_character(character_id: str, updates: Dict[str, Any]) -> bool:
 Character System provides:
 
 1. Character Creation: Build D&D 5e characters with all attributes
-2. Persistence: Save/load characters as JSON files (organized by player)
+2. Persistence: Save/load characters as JSON files organized by player, or in
+   SQLite (save_store) when ARCANE_SAVE_BACKEND=sqlite
 3. Management: List, load, update, and delete characters
 4. Timestamps: Track creation and last played times
 5. Validation: Ensure all required fields are present
@@ -337,7 +395,7 @@ Character System provides:
 Usage:
 - Player creates character through form
 - Character data converted to Character object
-- Saved to saved_characters/player_{player_id}/{character_id}.json
+- Saved to saved_characters/player_{player_id}/{character_id}.json (or the saved_characters table)
 - Can be loaded and updated later
 - Characters are player-specific (organized by player directory)
 """
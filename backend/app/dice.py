@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import random
 import re
-import secrets
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 
+from . import rng_service
+
 # Supports: "d20", "2d6+1", " 3 d 8 - 2 "
 DICE_RE = re.compile(r"^\s*(?:(\d+)\s*)?d\s*(\d+)\s*([+-]\s*\d+)?\s*$", re.IGNORECASE)
 
-MAX_COUNT = 200  # sanity limit for MVP
+MAX_COUNT = 10000  # mass combat: a whole warband's attacks in one expression
 ALLOWED_SIDES = {4, 6, 8, 10, 12, 20, 100}
 
+# Larger rolls are summarized in DiceResult.detail instead of listed die by die.
+DETAIL_MAX_ROLLS = 100
+
 
 @dataclass
 class DiceResult:
@@ -21,17 +26,30 @@ class DiceResult:
     detail: str
 
 
-def _roll_die(sides: int) -> int:
-    # 1..sides inclusive, cryptographically strong
-    return secrets.randbelow(sides) + 1
+def _roll_dice(count: int, sides: int, rng: random.Random) -> List[int]:
+    """``count`` rolls of 1..sides from one block of random bytes (sides <= 256).
+
+    Bytes at or above the largest multiple of ``sides`` are rejected so every
+    face stays equally likely; the unseeded dice stream is the OS CSPRNG.
+    """
+    limit = 256 - 256 % sides
+    rolls: List[int] = []
+    while len(rolls) < count:
+        need = count - len(rolls)
+        # Over-draw by the rejection rate so one pass almost always suffices.
+        data = rng.randbytes(need * 256 // limit + 8)
+        rolls.extend([b % sides + 1 for b in data if b < limit][:need])
+    return rolls
 
 
-def parse_and_roll(expr: str, mode: Optional[str] = None) -> DiceResult:
+def parse_and_roll(expr: str, mode: Optional[str] = None, rng: Optional[random.Random] = None) -> DiceResult:
     """
     mode:
       - None / "" => normal
       - "adv"     => advantage (only 1d20)
       - "dis"     => disadvantage (only 1d20)
+    rng:
+      - defaults to the process-wide "dice" stream from rng_service
     """
     raw = (expr or "").strip()
     if not raw:
@@ -54,6 +72,7 @@ def parse_and_roll(expr: str, mode: Optional[str] = None) -> DiceResult:
         raise ValueError(f"Unsupported die: d{sides}. Allowed: {sorted(ALLOWED_SIDES)}")
 
     mode = (mode or "").strip().lower() or None
+    rng = rng or rng_service.stream("dice")
 
     detail_parts: List[str] = []
     rolls: List[int] = []
@@ -62,13 +81,16 @@ def parse_and_roll(expr: str, mode: Optional[str] = None) -> DiceResult:
     if mode in ("adv", "dis"):
         if not (count == 1 and sides == 20):
             raise ValueError("adv/dis only supported for 1d20 in this MVP.")
-        r1, r2 = _roll_die(20), _roll_die(20)
+        r1, r2 = _roll_dice(2, 20, rng)
         picked = max(r1, r2) if mode == "adv" else min(r1, r2)
         rolls = [picked]
         detail_parts.append(f"{mode} rolls=[{r1}, {r2}] picked={picked}")
     else:
-        rolls = [_roll_die(sides) for _ in range(count)]
-        detail_parts.append(f"rolls={rolls}")
+        rolls = _roll_dice(count, sides, rng)
+        if count <= DETAIL_MAX_ROLLS:
+            detail_parts.append(f"rolls={rolls}")
+        else:
+            detail_parts.append(f"rolls={count}d{sides} sum={sum(rolls)}")
 
     total = sum(rolls) + modifier
     if modifier:
@@ -81,8 +103,8 @@ def parse_and_roll(expr: str, mode: Optional[str] = None) -> DiceResult:
 # -------------------------------------------------------------------
 # Back-compat wrapper: some main.py versions import roll_dice()
 # -------------------------------------------------------------------
-def roll_dice(expr: str, mode: Optional[str] = None) -> Dict[str, Any]:
-    r = parse_and_roll(expr, mode=mode)
+def roll_dice(expr: str, mode: Optional[str] = None, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    r = parse_and_roll(expr, mode=mode, rng=rng)
     return {
         "expr": r.expr,
         "rolls": r.rolls,
@@ -8,6 +8,8 @@ import random
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 
+from . import rng_service
+
 # ============================================================================
 # ITEM TYPE DEFINITIONS
 # ============================================================================
@@ -87,10 +89,15 @@ ITEM_TEMPLATES = {
 # DICE ROLLING
 # ============================================================================
 
-def parse_and_roll_damage(damage_expr: str) -> Dict[str, Any]:
+def parse_and_roll_damage(
+    damage_expr: str,
+    rng: Optional[random.Random] = None,
+    room_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Parse and roll damage from expression like '2d6+3' or '3d8'.
     Returns dict with rolls, total, breakdown.
+    Rolls come from rng, or the "hazards" stream of room_id (process-wide without one).
     """
     if damage_expr == "0":
         return {"total": 0, "rolls": [], "expression": "0"}
@@ -105,7 +112,8 @@ def parse_and_roll_damage(damage_expr: str) -> Dict[str, Any]:
     except (ValueError, IndexError):
         return {"error": f"Invalid damage expression: {damage_expr}"}
     
-    rolls = [random.randint(1, die_size) for _ in range(num_dice)]
+    rng = rng or rng_service.stream("hazards", room_id)
+    rolls = [rng.randint(1, die_size) for _ in range(num_dice)]
     total = sum(rolls) + bonus
     
     return {
@@ -139,15 +147,18 @@ def check_if_triggered(item: InteractiveItem, trigger_type: str) -> bool:
 def apply_item_effect(
     item: InteractiveItem,
     targets: List[str],  # List of token IDs
-    combat_state: Optional[Dict[str, Any]] = None
+    combat_state: Optional[Dict[str, Any]] = None,
+    rng: Optional[random.Random] = None,
+    room_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Apply an item's effect to targets.
     Returns effect summary with damage, conditions, etc.
+    Damage rolls from rng, or room_id's "hazards" stream.
     """
     item.is_triggered = True
     
-    damage_result = parse_and_roll_damage(item.damage) if item.damage != "0" else {"total": 0}
+    damage_result = parse_and_roll_damage(item.damage, rng, room_id) if item.damage != "0" else {"total": 0}
     
     effect_summary = {
         "item_id": item.id,
@@ -320,10 +331,15 @@ def check_elevation_advantage(attacker_height: int, defender_height: int) -> Dic
 # ITEM GENERATION FOR MAP_SEEDS
 # ============================================================================
 
-def generate_items_for_environment(environment: str, num_items: int = 3) -> List[Dict[str, Any]]:
+def generate_items_for_environment(
+    environment: str,
+    num_items: int = 3,
+    rng: Optional[random.Random] = None,
+    room_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
     Generate appropriate interactive items for an environment.
-    Used by map generation AI.
+    Used by map generation AI. Draws from rng, or room_id's "hazards" stream.
     """
     environment_items = {
         "tavern": [
@@ -353,15 +369,16 @@ def generate_items_for_environment(environment: str, num_items: int = 3) -> List
         ]
     }
     
+    rng = rng or rng_service.stream("hazards", room_id)
     items_for_env = environment_items.get(environment, environment_items["dungeon"])
-    selected = random.sample(items_for_env, min(num_items, len(items_for_env)))
+    selected = rng.sample(items_for_env, min(num_items, len(items_for_env)))
     
     return [
         {
             "id": f"item_{i:03d}",
             "type": item["type"],
             "name": item["name"],
-            "pos_ft": (random.randint(10, 70), random.randint(10, 70)),
+            "pos_ft": (rng.randint(10, 70), rng.randint(10, 70)),
             **{k: v for k, v in item.items() if k not in ["type", "name"]}
         }
         for i, item in enumerate(selected, 1)
@@ -407,14 +424,16 @@ NARRATION_TEMPLATES = {
 def generate_narration(
     item_type: str,
     object_name: str,
-    custom_narration: Optional[str] = None
+    custom_narration: Optional[str] = None,
+    rng: Optional[random.Random] = None,
+    room_id: Optional[str] = None
 ) -> str:
-    """Generate DM narration for item trigger."""
+    """Generate DM narration for item trigger (template from rng, or room_id's "hazards" stream)."""
     if custom_narration:
         return custom_narration
     
     templates = NARRATION_TEMPLATES.get(f"{item_type}_trigger", ["Something happens!"])
-    template = random.choice(templates)
+    template = (rng or rng_service.stream("hazards", room_id)).choice(templates)
     
     return template.format(object=object_name, mechanism=object_name.lower(), condition=object_name)
 
@@ -0,0 +1,534 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Bump when the compiled shape changes so stale cache files are ignored.
+CATALOG_FORMAT = 5
+
+# How often the watcher stats ItemsDB.xml; 0 disables hot reload.
+POLL_SECONDS = float(os.getenv("ARCANE_ITEM_DB_POLL_SECONDS") or "2")
+
+MAX_TIER = 3
+
+# Order of the fields in each compiled item record (ItemDef's constructor order).
+ITEM_FIELDS = ("id", "name", "slot", "tier", "category", "is_two_handed", "tags")
+
+
+@dataclass(frozen=True)
+class CompiledCatalog:
+    """Everything item_db and rules5e need from ItemsDB.xml, parsed once.
+
+    items are tuples in ITEM_FIELDS order (tags as tuples); weapons/armor
+    are the 5e stat blocks keyed by lowercase base item id. version counts
+    swaps in this process, so clients can tell when the catalog changed.
+    """
+
+    path: str
+    digest: str
+    stamp: Optional[Tuple[int, int]]  # (mtime_ns, size) of the compiled file
+    items: List[tuple] = field(default_factory=list)
+    weapons: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    armor: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    error: Optional[str] = None
+    version: int = 0
+
+
+_CURRENT: CompiledCatalog | None = None
+_VERSION = 0
+_LOCK = threading.Lock()
+_LISTENERS: List[Callable[[CompiledCatalog], None]] = []
+_WATCHER: threading.Thread | None = None
+_WATCHER_STOP = threading.Event()
+
+
+def default_db_path() -> str:
+    # backend/app -> backend -> project root -> Item-database/ItemsDB.xml
+    here = os.path.dirname(__file__)
+    backend_dir = os.path.abspath(os.path.join(here, ".."))
+    project_root = os.path.abspath(os.path.join(backend_dir, ".."))
+    return os.path.join(project_root, "Item-database", "ItemsDB.xml")
+
+
+def db_path() -> str:
+    return os.getenv("ARCANE_ITEM_DB_PATH") or default_db_path()
+
+
+def _cache_dir() -> str:
+    return os.getenv("ARCANE_CATALOG_CACHE_DIR") or os.path.join(os.path.dirname(__file__), ".catalog_cache")
+
+
+# ------------------------------------------------------------
+# XML parsing
+# ------------------------------------------------------------
+def _parse_bool(v: Any) -> bool:
+    v = str(v or "").strip().lower()
+    return v in ("1", "true", "yes", "y", "t")
+
+
+def _parse_int(v: Any, default: int) -> int:
+    try:
+        return int(str(v).strip())
+    except Exception:
+        return default
+
+
+def _split_tags(v: Any) -> List[str]:
+    if v is None:
+        return []
+    if isinstance(v, list):
+        return [str(x).strip() for x in v if str(x).strip()]
+    s = str(v).strip()
+    if not s:
+        return []
+    return [t.strip() for t in s.split(",") if t.strip()]
+
+
+def _split_list(value: str) -> list[str]:
+    if not value:
+        return []
+    return [part.strip().lower() for part in value.split(",") if part.strip()]
+
+
+def _infer_category(slot: str) -> str:
+    s = (slot or "").strip().lower()
+    if s in ("mainhand", "offhand", "twohand", "weapon", "bow", "staff", "dagger", "sword", "axe", "mace"):
+        return "weapons"
+    if s in ("head", "chest", "legs", "boots", "gloves", "belt", "bracers", "shoulders", "armor", "shield"):
+        return "armor"
+    if s in ("ring", "ring1", "ring2", "necklace", "jewelry"):
+        return "jewelry"
+    return "misc"
+
+
+def _parse_tier_refs(v: str) -> List[int]:
+    if not v:
+        return []
+    out: List[int] = []
+    for part in str(v).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            out.append(int(part))
+        except Exception:
+            continue
+    return out
+
+
+def _equip_slot_from_armor(slot_id: str) -> str:
+    s = (slot_id or "").strip().lower()
+    return {
+        "footwear": "boots",
+        "leggings": "legs",
+        "belt": "belt",
+        "gloves": "gloves",
+        "bracers": "bracers",
+        "headwear": "head",
+    }.get(s, s or "bag")
+
+
+def _equip_slot_from_jewelry(slot_id: str) -> str:
+    s = (slot_id or "").strip().lower()
+    return {
+        "ring": "ring",
+        "necklace": "necklace",
+    }.get(s, s or "bag")
+
+
+def _base_item_tags(node: Any, category: str, slot_id: str | None = None) -> List[str]:
+    tags: List[str] = []
+    raw_tags = _split_tags(node.get("tags") or "")
+    tags.extend(raw_tags)
+    for key in ("material", "weaponClass", "rangeType", "damageType", "magicType"):
+        v = (node.get(key) or "").strip()
+        if v:
+            tags.append(v)
+    if category:
+        tags.append(category)
+    if slot_id:
+        tags.append(slot_id)
+    return tags
+
+
+def _item_record(
+    iid: str, name: str, slot: str, tier: int, category: str, is_two_handed: bool, tags: Tuple[str, ...]
+) -> tuple:
+    # A tuple in ITEM_FIELDS order is a fraction of a dict's size, which matters
+    # at one record per base item per tier.
+    return (iid, name, slot, tier, category, is_two_handed, tags)
+
+
+def _parse_item_node(node: ET.Element) -> tuple | None:
+    # We accept many schemas:
+    # - <item id="" name="" slot="" tier="" category="" tags="" is_two_handed=""/>
+    # - or <item><id>..</id><name>..</name><slot>..</slot>...</item>
+    iid = (node.get("id") or node.findtext("id") or "").strip()
+    name = (node.get("name") or node.findtext("name") or "").strip()
+    slot = (node.get("slot") or node.findtext("slot") or "").strip()
+    if not iid or not name or not slot:
+        return None
+
+    tier = _parse_int(node.get("tier") or node.findtext("tier") or "0", 0)
+    category = (node.get("category") or node.findtext("category") or "").strip().lower() or _infer_category(slot)
+
+    # Check for is_two_handed, two_handed, or hands attribute
+    is_two_handed = _parse_bool(node.get("is_two_handed") or node.get("two_handed") or node.findtext("is_two_handed") or "")
+    if not is_two_handed:
+        # If hands="2" attribute exists, treat as two-handed
+        hands = _parse_int(node.get("hands") or node.findtext("hands") or "0", 0)
+        is_two_handed = hands >= 2
+
+    tags = _split_tags(node.get("tags") or node.findtext("tags"))
+
+    # Optional convenience: tag-based inference
+    for t in tags:
+        if t.lower().startswith("tier:"):
+            tier = _parse_int(t.split(":", 1)[1], tier)
+        if t.lower().startswith("cat:"):
+            category = t.split(":", 1)[1].strip().lower() or category
+
+    return _item_record(iid, name, slot, tier, category, is_two_handed, tuple(tags))
+
+
+def _weapon_block(base: Any, iid: str) -> Dict[str, Any]:
+    return {
+        "id": iid,
+        "name": base.get("name") or "",
+        "weaponClass": (base.get("weaponClass") or "").strip().lower(),
+        "rangeType": (base.get("rangeType") or "").strip().lower(),
+        "damageDice": base.get("damageDice") or "",
+        "damageType": (base.get("damageType") or "").strip().lower(),
+        "properties": _split_list(base.get("properties") or ""),
+        "range": base.get("range") or "",
+        "versatile": base.get("versatile") or "",
+        "mastery": (base.get("mastery") or "").strip().lower(),
+    }
+
+
+def _armor_block(base: Any, iid: str) -> Dict[str, Any]:
+    return {
+        "id": iid,
+        "name": base.get("name") or "",
+        "armorType": (base.get("armorType") or "").strip().lower(),
+        "armorCategory": (base.get("armorCategory") or "").strip().lower(),
+        "acBase": base.get("acBase"),
+        "dexCap": base.get("dexCap"),
+        "strengthRequirement": base.get("strengthRequirement"),
+        "stealthDisadvantage": base.get("stealthDisadvantage"),
+        "donTime": base.get("donTime") or "",
+        "doffTime": base.get("doffTime") or "",
+    }
+
+
+def _base_spec(cat_id: str, base: Any, slot_id: str | None) -> tuple | None:
+    """(id, name, slot, category, is_two_handed, tags) for one <baseItem>, before tiering.
+
+    slot_id is set only for base items that sit directly in one of the
+    category's <slot>s; armor and jewelry only take items from there.
+    """
+    iid = (base.get("id") or "").strip()
+    name = (base.get("name") or "").strip()
+    if not iid or not name:
+        return None
+    if cat_id == "weapons":
+        is_two_handed = _parse_int(base.get("hands") or "1", 1) >= 2
+        tags = _base_item_tags(base, cat_id)
+        if is_two_handed:
+            tags.append("two-handed")
+        return (iid, name, "mainhand", "weapons", is_two_handed, tuple(tags))
+    if cat_id == "armor":
+        if slot_id is None:
+            return None
+        return (iid, name, _equip_slot_from_armor(slot_id), "armor", False, tuple(_base_item_tags(base, cat_id, slot_id)))
+    if cat_id == "jewelry":
+        if slot_id is None:
+            return None
+        return (iid, name, _equip_slot_from_jewelry(slot_id), "jewelry", False, tuple(_base_item_tags(base, cat_id, slot_id)))
+    return (iid, name, "bag", cat_id or "misc", False, tuple(_base_item_tags(base, cat_id)))
+
+
+def _expand_tiers(specs: List[tuple], tiers: List[int]) -> List[tuple]:
+    # Every tier shares the spec's name and tag tuple.
+    return [
+        _item_record(f"{iid}_t{tier}", name, slot, tier, category, two_handed, tags)
+        for iid, name, slot, category, two_handed, tags in specs
+        for tier in tiers
+    ]
+
+
+def _compile_stream(source: Any) -> tuple[list, list, dict, dict]:
+    """Single iterparse pass over ItemsDB.xml.
+
+    Elements are dropped from their parent as soon as they have been consumed,
+    so memory tracks the catalog being built rather than the whole DOM.
+    <categories> is only honoured as a direct child of the root, and each
+    <category>'s <appliesQuality> may come after its base items, so a
+    category keeps compact base specs and expands them into tiers when it closes.
+    """
+    explicit: List[tuple] = []
+    base_items: List[tuple] = []
+    weapons: Dict[str, Dict[str, Any]] = {}
+    armor: Dict[str, Dict[str, Any]] = {}
+
+    stack: List[ET.Element] = []
+    item_depth = 0  # open <item> elements; their children must survive until they close
+    seen_categories = False
+    in_categories = False
+    cat: Dict[str, Any] | None = None
+    slot_id: str | None = None
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        tag = elem.tag if isinstance(elem.tag, str) else ""
+        if event == "start":
+            stack.append(elem)
+            depth = len(stack)
+            if tag.lower() == "item":
+                item_depth += 1
+            if depth == 2 and tag == "categories" and not seen_categories:
+                seen_categories = in_categories = True
+            elif in_categories and depth == 3 and tag == "category":
+                cat_id = (elem.get("id") or "").strip().lower()
+                cat = {"id": cat_id, "tiers": None, "specs": []} if cat_id else None
+            elif cat is not None and depth == 4 and tag == "slot":
+                slot_id = (elem.get("id") or "").strip().lower()
+            continue
+
+        depth = len(stack)
+        stack.pop()
+        if tag.lower() == "item":
+            item_depth -= 1
+            record = _parse_item_node(elem)
+            if record:
+                explicit.append(record)
+
+        if cat is not None:
+            if depth == 4 and tag == "appliesQuality" and cat["tiers"] is None:
+                cat["tiers"] = _parse_tier_refs(elem.get("tierRefs") or "") or [1]
+            elif tag == "baseItem":
+                iid = (elem.get("id") or "").strip().lower()
+                if iid and cat["id"] == "weapons":
+                    weapons[iid] = _weapon_block(elem, iid)
+                elif iid and cat["id"] == "armor":
+                    armor[iid] = _armor_block(elem, iid)
+                direct = depth == 5 and stack[-1].tag == "slot"
+                spec = _base_spec(cat["id"], elem, slot_id if direct else None)
+                if spec:
+                    cat["specs"].append(spec)
+            elif depth == 4 and tag == "slot":
+                slot_id = None
+            elif depth == 3 and tag == "category":
+                base_items.extend(_expand_tiers(cat["specs"], cat["tiers"] or [1]))
+                cat = None
+        if depth == 2 and tag == "categories" and in_categories:
+            in_categories = False
+
+        if item_depth == 0 and stack:
+            # The element just closed is always its parent's last child.
+            del stack[-1][-1]
+
+    return explicit, base_items, weapons, armor
+
+
+def compile_xml(source: Any, path: str = "", digest: str = "", stamp: Tuple[int, int] | None = None) -> CompiledCatalog:
+    """Compile ItemsDB.xml from a file path, file object or bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        explicit, base_items, weapons, armor = _compile_stream(source)
+    except Exception as e:
+        return CompiledCatalog(path=path, digest=digest, stamp=stamp, error=f"Failed to parse ItemsDB.xml: {e}")
+    return CompiledCatalog(
+        path=path,
+        digest=digest,
+        stamp=stamp,
+        items=explicit or base_items,
+        weapons=weapons,
+        armor=armor,
+    )
+
+
+# ------------------------------------------------------------
+# Compiled cache
+# ------------------------------------------------------------
+def _cache_file(digest: str) -> str:
+    return os.path.join(_cache_dir(), f"items-v{CATALOG_FORMAT}-{digest[:32]}.json")
+
+
+def _decode_items(rows: Any) -> List[tuple] | None:
+    """Item records back from JSON lists, sharing one tuple per distinct tag list."""
+    if not isinstance(rows, list):
+        return None
+    tag_tuples: Dict[tuple, tuple] = {}
+    items: List[tuple] = []
+    for row in rows:
+        if not isinstance(row, list) or len(row) != len(ITEM_FIELDS) or not isinstance(row[-1], list):
+            return None
+        tags = tuple(row[-1])
+        items.append(_item_record(*row[:-1], tag_tuples.setdefault(tags, tags)))
+    return items
+
+
+def _read_cache(digest: str) -> CompiledCatalog | None:
+    # Plain JSON, so a tampered cache file can at worst fail validation and
+    # be recompiled; it can never run code the way an unpickled one could.
+    try:
+        with open(_cache_file(digest), "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != CATALOG_FORMAT or data.get("digest") != digest:
+        return None
+    items = _decode_items(data.get("items"))
+    weapons, armor = data.get("weapons"), data.get("armor")
+    if items is None or not isinstance(weapons, dict) or not isinstance(armor, dict):
+        return None
+    return CompiledCatalog(path="", digest=digest, stamp=None, items=items, weapons=weapons, armor=armor)
+
+
+def _write_cache(catalog: CompiledCatalog) -> None:
+    path = _cache_file(catalog.digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    data = {
+        "format": CATALOG_FORMAT,
+        "digest": catalog.digest,
+        "items": catalog.items,
+        "weapons": catalog.weapons,
+        "armor": catalog.armor,
+    }
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError:
+        # Read-only install: we just recompile on the next cold start.
+        pass
+
+
+def _file_stamp(path: str) -> Tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_catalog(path: str | None = None) -> CompiledCatalog:
+    """Compile ItemsDB.xml, reusing the on-disk compiled cache when the file hash matches."""
+    path = path or db_path()
+    try:
+        stamp = _file_stamp(path)
+        digest = _file_digest(path)
+    except FileNotFoundError:
+        return CompiledCatalog(path=path, digest="", stamp=None, error=f"ItemsDB.xml not found at: {path}")
+    except OSError as e:
+        return CompiledCatalog(path=path, digest="", stamp=None, error=f"Failed to read ItemsDB.xml: {e}")
+
+    cached = _read_cache(digest)
+    if cached is not None:
+        return replace(cached, path=path, stamp=stamp)
+
+    catalog = compile_xml(path, path=path, digest=digest, stamp=stamp)
+    if catalog.error is None:
+        _write_cache(catalog)
+    return catalog
+
+
+def _install(catalog: CompiledCatalog) -> CompiledCatalog:
+    """Swap in a new catalog (caller holds _LOCK) and notify listeners."""
+    global _CURRENT, _VERSION
+    _VERSION += 1
+    catalog = replace(catalog, version=_VERSION)
+    _CURRENT = catalog
+    for listener in list(_LISTENERS):
+        try:
+            listener(catalog)
+        except Exception as e:
+            print(f"[items] reload listener failed: {e}", flush=True)
+    return catalog
+
+
+def get_catalog(force: bool = False) -> CompiledCatalog:
+    """The shared compiled catalog.
+
+    Never touches the filesystem once loaded: changes to ItemsDB.xml are picked
+    up by the watcher thread (see start_watcher), or by force=True.
+    """
+    current = _CURRENT
+    if current is not None and not force:
+        return current
+    with _LOCK:
+        if _CURRENT is not None and not force:
+            return _CURRENT
+        return _install(load_catalog())
+
+
+def on_reload(listener: Callable[[CompiledCatalog], None]) -> None:
+    """Call listener(catalog) after every swap, on the thread that did the swap."""
+    _LISTENERS.append(listener)
+
+
+def reload_if_changed() -> bool:
+    """Recompile and swap if ItemsDB.xml (or ARCANE_ITEM_DB_PATH) changed; True if swapped.
+
+    A file that fails to parse keeps the previous good catalog in place, so a
+    half-saved edit never empties the item list mid-session.
+    """
+    global _CURRENT
+    path = db_path()
+    current = _CURRENT
+    if current is not None and current.path == path and current.stamp == _file_stamp(path):
+        return False
+    catalog = load_catalog(path)
+    with _LOCK:
+        current = _CURRENT
+        if current is not None and catalog.error and not current.error:
+            print(f"[items] keeping previous catalog: {catalog.error}", flush=True)
+            # Remember the bad file's stamp so we don't reparse it every poll.
+            _CURRENT = replace(current, path=path, stamp=catalog.stamp)
+            return False
+        if current is not None and catalog.digest and catalog.digest == current.digest:
+            _CURRENT = replace(current, path=path, stamp=catalog.stamp)
+            return False
+        _install(catalog)
+        return True
+
+
+def _watch(interval: float) -> None:
+    while not _WATCHER_STOP.wait(interval):
+        try:
+            if reload_if_changed():
+                print(f"[items] ItemsDB.xml reloaded (version {_VERSION})", flush=True)
+        except Exception as e:
+            print(f"[items] reload failed: {e}", flush=True)
+
+
+def start_watcher(interval: float = POLL_SECONDS) -> bool:
+    """Poll ItemsDB.xml on a daemon thread and hot-swap the catalog on change."""
+    global _WATCHER
+    if interval <= 0 or (_WATCHER is not None and _WATCHER.is_alive()):
+        return False
+    _WATCHER_STOP.clear()
+    _WATCHER = threading.Thread(target=_watch, args=(interval,), name="items-watcher", daemon=True)
+    _WATCHER.start()
+    return True
+
+
+def stop_watcher() -> None:
+    _WATCHER_STOP.set()
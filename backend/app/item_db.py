@@ -3,27 +3,162 @@ from __future__ import annotations
 import json
 import os
 import random
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+import sys
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 
+from . import item_catalog, item_search, rng_service
+
+
+class ItemBase:
+    """Fields shared by every tier of one base item."""
+
+    __slots__ = ("name", "slot", "category", "is_two_handed", "tags")
+
+    def __init__(self, name: str, slot: str, category: str, is_two_handed: bool, tags: Tuple[str, ...]):
+        self.name = name
+        self.slot = slot
+        self.category = category
+        self.is_two_handed = is_two_handed
+        self.tags = tags
+
+
+# (name, slot, category, is_two_handed, tags) -> shared ItemBase; tag tuple -> itself.
+# ItemDefs built by hand intern here; each catalog snapshot gets its own tables.
+_BASES: Dict[tuple, ItemBase] = {}
+_TAG_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern_tags(tags: Any, tag_tuples: Dict[Tuple[str, ...], Tuple[str, ...]]) -> Tuple[str, ...]:
+    key = tuple(sys.intern(str(t)) for t in (tags or ()))
+    return tag_tuples.setdefault(key, key)
+
+
+def _intern_base(
+    name: str,
+    slot: str,
+    category: str,
+    is_two_handed: bool,
+    tags: Any,
+    bases: Dict[tuple, ItemBase] | None = None,
+    tag_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] | None = None,
+) -> ItemBase:
+    if bases is None:
+        bases, tag_tuples = _BASES, _TAG_TUPLES
+    key = (sys.intern(name), sys.intern(slot), sys.intern(category), bool(is_two_handed), _intern_tags(tags, tag_tuples))
+    base = bases.get(key)
+    if base is None:
+        base = bases[key] = ItemBase(*key)
+    return base
+
 
-@dataclass(frozen=True)
 class ItemDef:
-    id: str
-    name: str
-    slot: str
-    tier: int = 0
-    category: str = "misc"     # weapons | armor | jewelry | misc
-    is_two_handed: bool = False
-    tags: List[str] = None
+    """One catalog item: its own id and tier plus an interned ItemBase.
+
+    Tier variants of the same base item share the base, so names, slots and
+    tag tuples are stored once however many tiers a catalog defines.
+    """
+
+    __slots__ = ("id", "tier", "base")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        slot: str,
+        tier: int = 0,
+        category: str = "misc",     # weapons | armor | jewelry | misc
+        is_two_handed: bool = False,
+        tags: Any = None,
+    ):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "tier", tier)
+        object.__setattr__(self, "base", _intern_base(name, slot, category, is_two_handed, tags))
+
+    @classmethod
+    def _from_record(cls, record: tuple, bases: Dict[tuple, ItemBase], tag_tuples: Dict[Tuple[str, ...], Tuple[str, ...]]) -> ItemDef:
+        """Build from a compiled catalog record, interning into the given tables."""
+        iid, name, slot, tier, category, is_two_handed, tags = record
+        item = cls.__new__(cls)
+        object.__setattr__(item, "id", iid)
+        object.__setattr__(item, "tier", tier)
+        object.__setattr__(item, "base", _intern_base(name, slot, category, is_two_handed, tags, bases, tag_tuples))
+        return item
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError("ItemDef is immutable")
+
+    @property
+    def name(self) -> str:
+        return self.base.name
+
+    @property
+    def slot(self) -> str:
+        return self.base.slot
+
+    @property
+    def category(self) -> str:
+        return self.base.category
+
+    @property
+    def is_two_handed(self) -> bool:
+        return self.base.is_two_handed
+
+    @property
+    def tags(self) -> Tuple[str, ...]:
+        return self.base.tags
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ItemDef):
+            return NotImplemented
+        if self.id != other.id or self.tier != other.tier:
+            return False
+        a, b = self.base, other.base
+        return a is b or (a.name, a.slot, a.category, a.is_two_handed, a.tags) == (
+            b.name, b.slot, b.category, b.is_two_handed, b.tags
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.tier, self.base.name))
+
+    def __repr__(self) -> str:
+        return (
+            f"ItemDef(id={self.id!r}, name={self.name!r}, slot={self.slot!r}, tier={self.tier!r}, "
+            f"category={self.category!r}, is_two_handed={self.is_two_handed!r}, tags={self.tags!r})"
+        )
+
+
+class ItemSnapshot:
+    """One catalog version's items, id lookup, load error and loot filter index.
+
+    Built in full, then published by a single assignment to _SNAPSHOT, so a
+    request reading the snapshot once never sees items from one catalog next
+    to the index of another while the watcher reloads.
+    """
+
+    __slots__ = ("items", "by_id", "error", "version", "index")
+
+    def __init__(self, items: List[ItemDef], error: Optional[str], version: int):
+        object.__setattr__(self, "items", items)
+        object.__setattr__(self, "by_id", {it.id: it for it in items})
+        object.__setattr__(self, "error", error)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "index", _build_loot_index(items))
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError("ItemSnapshot is immutable")
 
 
-_CACHE: List[ItemDef] | None = None
-_CACHE_ERR: str | None = None
-_CACHE_BY_ID: Dict[str, ItemDef] | None = None
+_SNAPSHOT: ItemSnapshot | None = None
+_SNAPSHOT_LOCK = threading.Lock()
 
-MAX_TIER = 3
+# (id(items), filter key, source bias) -> (items, pool, alias prob, alias index).
+# Entries hold their items list, so its id can't be reused while they are cached.
+_POOL_CACHE: Dict[tuple, tuple] = {}
+_POOL_CACHE_MAX = 512
+_POOL_LOCK = threading.Lock()
+
+MAX_TIER = item_catalog.MAX_TIER
 MAGIC_TYPES = {
     "acid",
     "cold",
@@ -40,19 +175,6 @@ MAGIC_TYPES = {
 ELEMENTAL_TYPES = ["acid", "cold", "fire", "lightning", "poison", "thunder"]
 
 
-def _default_db_path() -> str:
-    # backend/app -> backend -> project root -> Item-database/ItemsDB.xml
-    here = os.path.dirname(__file__)
-    backend_dir = os.path.abspath(os.path.join(here, ".."))
-    project_root = os.path.abspath(os.path.join(backend_dir, ".."))
-    return os.path.join(project_root, "Item-database", "ItemsDB.xml")
-
-
-def _parse_bool(v: str) -> bool:
-    v = (v or "").strip().lower()
-    return v in ("1", "true", "yes", "y", "t")
-
-
 def _parse_int(v: str, default: int) -> int:
     try:
         return int(str(v).strip())
@@ -60,272 +182,201 @@ def _parse_int(v: str, default: int) -> int:
         return default
 
 
-def _split_tags(v: Any) -> List[str]:
-    if v is None:
-        return []
-    if isinstance(v, list):
-        return [str(x).strip() for x in v if str(x).strip()]
-    s = str(v).strip()
-    if not s:
-        return []
-    return [t.strip() for t in s.split(",") if t.strip()]
-
-
-def _infer_category(slot: str) -> str:
-    s = (slot or "").strip().lower()
-    if s in ("mainhand", "offhand", "twohand", "weapon", "bow", "staff", "dagger", "sword", "axe", "mace"):
-        return "weapons"
-    if s in ("head", "chest", "legs", "boots", "gloves", "belt", "bracers", "shoulders", "armor", "shield"):
-        return "armor"
-    if s in ("ring", "ring1", "ring2", "necklace", "jewelry"):
-        return "jewelry"
-    return "misc"
-
-def _parse_tier_refs(v: str) -> List[int]:
-    if not v:
-        return []
-    out: List[int] = []
-    for part in str(v).split(","):
-        part = part.strip()
-        if not part:
-            continue
-        try:
-            out.append(int(part))
-        except Exception:
-            continue
-    return out
-
-
-def _category_tiers(cat: ET.Element) -> List[int]:
-    applies = cat.find("appliesQuality")
-    if applies is None:
-        return [1]
-    tiers = _parse_tier_refs(applies.get("tierRefs") or "")
-    return tiers or [1]
-
-
-def _equip_slot_from_armor(slot_id: str) -> str:
-    s = (slot_id or "").strip().lower()
-    return {
-        "footwear": "boots",
-        "leggings": "legs",
-        "belt": "belt",
-        "gloves": "gloves",
-        "bracers": "bracers",
-        "headwear": "head",
-    }.get(s, s or "bag")
-
-
-def _equip_slot_from_jewelry(slot_id: str) -> str:
-    s = (slot_id or "").strip().lower()
-    return {
-        "ring": "ring",
-        "necklace": "necklace",
-    }.get(s, s or "bag")
-
-
-def _base_item_tags(node: ET.Element, category: str, slot_id: str | None = None) -> List[str]:
-    tags: List[str] = []
-    raw_tags = _split_tags(node.get("tags") or "")
-    tags.extend(raw_tags)
-    for key in ("material", "weaponClass", "rangeType", "damageType", "magicType"):
-        v = (node.get(key) or "").strip()
-        if v:
-            tags.append(v)
-    if category:
-        tags.append(category)
-    if slot_id:
-        tags.append(slot_id)
-    return tags
-
-
-def _load_base_items(root: ET.Element) -> List[ItemDef]:
-    items: List[ItemDef] = []
-    cats = root.find("categories")
-    if cats is None:
-        return items
-
-    for cat in cats.findall("category"):
-        cat_id = (cat.get("id") or "").strip().lower()
-        if not cat_id:
-            continue
-        tiers = _category_tiers(cat)
-
-        if cat_id == "weapons":
-            for base in cat.findall(".//baseItem"):
-                iid = (base.get("id") or "").strip()
-                name = (base.get("name") or "").strip()
-                if not iid or not name:
-                    continue
-                hands = _parse_int(base.get("hands") or "1", 1)
-                is_two_handed = hands >= 2
-                tags = _base_item_tags(base, cat_id)
-                if is_two_handed:
-                    tags.append("two-handed")
-                for tier in tiers:
-                    items.append(
-                        ItemDef(
-                            id=f"{iid}_t{tier}",
-                            name=name,
-                            slot="mainhand",
-                            tier=tier,
-                            category="weapons",
-                            is_two_handed=is_two_handed,
-                            tags=tags[:],
-                        )
-                    )
-            continue
-
-        if cat_id == "armor":
-            for slot in cat.findall("slot"):
-                slot_id = (slot.get("id") or "").strip().lower()
-                equip_slot = _equip_slot_from_armor(slot_id)
-                for base in slot.findall("baseItem"):
-                    iid = (base.get("id") or "").strip()
-                    name = (base.get("name") or "").strip()
-                    if not iid or not name:
-                        continue
-                    tags = _base_item_tags(base, cat_id, slot_id)
-                    for tier in tiers:
-                        items.append(
-                            ItemDef(
-                                id=f"{iid}_t{tier}",
-                                name=name,
-                                slot=equip_slot,
-                                tier=tier,
-                                category="armor",
-                                is_two_handed=False,
-                                tags=tags[:],
-                            )
-                        )
-            continue
-
-        if cat_id == "jewelry":
-            for slot in cat.findall("slot"):
-                slot_id = (slot.get("id") or "").strip().lower()
-                equip_slot = _equip_slot_from_jewelry(slot_id)
-                for base in slot.findall("baseItem"):
-                    iid = (base.get("id") or "").strip()
-                    name = (base.get("name") or "").strip()
-                    if not iid or not name:
-                        continue
-                    tags = _base_item_tags(base, cat_id, slot_id)
-                    for tier in tiers:
-                        items.append(
-                            ItemDef(
-                                id=f"{iid}_t{tier}",
-                                name=name,
-                                slot=equip_slot,
-                                tier=tier,
-                                category="jewelry",
-                                is_two_handed=False,
-                                tags=tags[:],
-                            )
-                        )
-            continue
-
-        for base in cat.findall(".//baseItem"):
-            iid = (base.get("id") or "").strip()
-            name = (base.get("name") or "").strip()
-            if not iid or not name:
-                continue
-            tags = _base_item_tags(base, cat_id)
-            for tier in tiers:
-                items.append(
-                    ItemDef(
-                        id=f"{iid}_t{tier}",
-                        name=name,
-                        slot="bag",
-                        tier=tier,
-                        category=cat_id or "misc",
-                        is_two_handed=False,
-                        tags=tags[:],
-                    )
-                )
-    return items
+def _snapshot(force: bool = False) -> ItemSnapshot:
+    """The published snapshot for the current catalog, building it on a version change."""
+    global _SNAPSHOT
+    catalog = item_catalog.get_catalog(force=force)
+    snap = _SNAPSHOT
+    if snap is not None and snap.version == catalog.version:
+        return snap
+    with _SNAPSHOT_LOCK:
+        # Re-read under the lock: a reload may have landed since, and an older
+        # catalog must never replace a newer snapshot.
+        catalog = item_catalog.get_catalog()
+        snap = _SNAPSHOT
+        if snap is not None and snap.version == catalog.version:
+            return snap
+        # Fresh intern tables per snapshot, so bases dropped from the XML can be freed.
+        bases: Dict[tuple, ItemBase] = {}
+        tag_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        if catalog.error:
+            items: List[ItemDef] = []
+        else:
+            items = [ItemDef._from_record(record, bases, tag_tuples) for record in catalog.items]
+        snap = ItemSnapshot(items, catalog.error, catalog.version)
+        _SNAPSHOT = snap
+    with _POOL_LOCK:
+        _POOL_CACHE.clear()
+    return snap
 
 
 def load_items(force: bool = False) -> Tuple[List[ItemDef], Optional[str]]:
-    global _CACHE, _CACHE_ERR, _CACHE_BY_ID
-    if _CACHE is not None and not force:
-        return _CACHE, _CACHE_ERR
+    snap = _snapshot(force=force)
+    return snap.items, snap.error
 
-    path = os.getenv("ARCANE_ITEM_DB_PATH") or _default_db_path()
-    if not os.path.exists(path):
-        _CACHE = []
-        _CACHE_ERR = f"ItemsDB.xml not found at: {path}"
-        _CACHE_BY_ID = {}
-        return _CACHE, _CACHE_ERR
 
-    try:
-        tree = ET.parse(path)
-        root = tree.getroot()
-    except Exception as e:
-        _CACHE = []
-        _CACHE_ERR = f"Failed to parse ItemsDB.xml: {e}"
-        _CACHE_BY_ID = {}
-        return _CACHE, _CACHE_ERR
-
-    items: List[ItemDef] = []
-
-    # We accept many schemas:
-    # - <item id="" name="" slot="" tier="" category="" tags="" is_two_handed=""/>
-    # - or <item><id>..</id><name>..</name><slot>..</slot>...</item>
-    for node in root.iter():
-        if node.tag.lower() != "item":
-            continue
-
-        iid = (node.get("id") or node.findtext("id") or "").strip()
-        name = (node.get("name") or node.findtext("name") or "").strip()
-        slot = (node.get("slot") or node.findtext("slot") or "").strip()
-
-        if not iid or not name or not slot:
-            continue
-
-        tier = _parse_int(node.get("tier") or node.findtext("tier") or "0", 0)
-        category = (node.get("category") or node.findtext("category") or "").strip().lower() or _infer_category(slot)
-        
-        # Check for is_two_handed, two_handed, or hands attribute
-        is_two_handed = _parse_bool(node.get("is_two_handed") or node.get("two_handed") or node.findtext("is_two_handed") or "")
-        if not is_two_handed:
-            # If hands="2" attribute exists, treat as two-handed
-            hands = _parse_int(node.get("hands") or node.findtext("hands") or "0", 0)
-            is_two_handed = hands >= 2
-        
-        tags = _split_tags(node.get("tags") or node.findtext("tags"))
-
-        # Optional convenience: tag-based inference
-        for t in tags:
-            if t.lower().startswith("tier:"):
-                tier = _parse_int(t.split(":", 1)[1], tier)
-            if t.lower().startswith("cat:"):
-                category = t.split(":", 1)[1].strip().lower() or category
-
-        items.append(ItemDef(id=iid, name=name, slot=slot, tier=tier, category=category, is_two_handed=is_two_handed, tags=tags))
+def _on_catalog_reload(catalog: item_catalog.CompiledCatalog) -> None:
+    # Runs on the watcher thread, so requests never pay for the rebuild.
+    snap = _snapshot()
+    if not snap.error:
+        item_search.index_for(snap.items)
 
-    if not items:
-        items = _load_base_items(root)
 
-    _CACHE = items
-    _CACHE_ERR = None
-    _CACHE_BY_ID = {it.id: it for it in items}
-    return _CACHE, _CACHE_ERR
+item_catalog.on_reload(_on_catalog_reload)
 
 
 def get_item_by_id(item_id: str) -> Optional[ItemDef]:
     if not item_id:
         return None
-    items, err = load_items()
-    if err or not items:
+    snap = _snapshot()
+    if snap.error:
         return None
-    return (_CACHE_BY_ID or {}).get(item_id)
+    return snap.by_id.get(item_id)
+
+
+def search_items(
+    q: str,
+    tier: Optional[int] = None,
+    category: str = "",
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Ranked, paginated item search over names, ids and tags, with tier/category facets."""
+    items, err = load_items()
+    if err:
+        return {}, err
+    return item_search.index_for(items).search(q, tier=tier, category=category, limit=limit, offset=offset), None
+
+
+def _bitset(positions: List[int], size: int) -> int:
+    buf = bytearray((size + 7) // 8)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _bit_positions(bits: int) -> List[int]:
+    out: List[int] = []
+    while bits:
+        low = bits & -bits
+        out.append(low.bit_length() - 1)
+        bits ^= low
+    return out
+
 
+def _loot_index(items: List[ItemDef]) -> Dict[str, Any]:
+    """The published snapshot's index for its items, else one built for this list."""
+    snap = _SNAPSHOT
+    if snap is not None and snap.items is items:
+        return snap.index
+    return _build_loot_index(items)
+
+
+def _build_loot_index(items: List[ItemDef]) -> Dict[str, Any]:
+    """Bitsets of item positions per category, tier, slot and tag (all lowercased)."""
+    groups: Dict[str, Dict[Any, List[int]]] = {"category": {}, "tier": {}, "slot": {}, "tag": {}}
+    magic: List[int] = []
+    for i, it in enumerate(items):
+        groups["category"].setdefault(it.category.lower(), []).append(i)
+        groups["tier"].setdefault(it.tier, []).append(i)
+        groups["slot"].setdefault(it.slot.lower(), []).append(i)
+        it_tags = {x.lower() for x in (it.tags or [])}
+        for t in it_tags:
+            groups["tag"].setdefault(t, []).append(i)
+        if "magic" in it_tags or "magical" in it_tags:
+            magic.append(i)
+
+    size = len(items)
+    index: Dict[str, Any] = {
+        kind: {key: _bitset(positions, size) for key, positions in by_key.items()}
+        for kind, by_key in groups.items()
+    }
+    index["items"] = items
+    index["all"] = (1 << size) - 1
+    index["magic"] = _bitset(magic, size)
+    return index
+
+
+def _select(index: Dict[str, Any], kind: str, keys: Any) -> int:
+    bits = 0
+    for key in keys:
+        bits |= index[kind].get(key, 0)
+    return bits
+
+
+def _alias_table(weights: List[float]) -> Tuple[List[float], List[int]]:
+    """Vose's alias method: O(n) setup, then two uniforms per weighted pick."""
+    n = len(weights)
+    total = sum(weights)
+    prob = [w * n / total for w in weights]
+    alias = list(range(n))
+    small = [i for i, p in enumerate(prob) if p < 1.0]
+    large = [i for i, p in enumerate(prob) if p >= 1.0]
+    while small and large:
+        s = small.pop()
+        g = large.pop()
+        alias[s] = g
+        prob[g] = prob[g] + prob[s] - 1.0
+        (small if prob[g] < 1.0 else large).append(g)
+    for i in small + large:
+        prob[i] = 1.0
+    return prob, alias
+
+
+def _alias_pick(pool: List[ItemDef], prob: List[float], alias: List[int], rng: random.Random) -> ItemDef:
+    i = int(rng.random() * len(pool))
+    return pool[i] if rng.random() < prob[i] else pool[alias[i]]
+
+
+def _loot_pool(
+    items: List[ItemDef],
+    tier_min: int,
+    tier_max: int,
+    allow_magic: bool,
+    categories: List[str],
+    slots: List[str],
+    tags: List[str],
+    tier_bias: float,
+) -> Tuple[List[ItemDef], List[float], List[int]] | None:
+    index = _loot_index(items)
+    key = (
+        id(items),
+        tier_min,
+        tier_max,
+        allow_magic,
+        tuple(sorted(set(categories))),
+        tuple(sorted({s.lower() for s in slots})),
+        tuple(sorted(set(tags))),
+        tier_bias,
+    )
+    with _POOL_LOCK:
+        cached = _POOL_CACHE.get(key)
+    if cached is not None and cached[0] is items:
+        return cached[1:]
+
+    bits = _select(index, "tier", range(tier_min, tier_max + 1))
+    if key[4]:
+        bits &= _select(index, "category", key[4])
+    if key[5]:
+        bits &= _select(index, "slot", key[5])
+    if not allow_magic:
+        bits &= ~index["magic"]
+    for t in key[6]:
+        bits &= index["tag"].get(t, 0)
+    if not bits:
+        return None
 
-def _weighted_pick(pool: List[ItemDef], weights: List[float]) -> ItemDef:
-    return random.choices(pool, weights=weights, k=1)[0]
+    pool = [items[i] for i in _bit_positions(bits)]
+    weights = [max(float(it.tier + 1) ** float(tier_bias), 0.01) for it in pool]
+    prob, alias = _alias_table(weights)
+    with _POOL_LOCK:
+        if len(_POOL_CACHE) >= _POOL_CACHE_MAX:
+            _POOL_CACHE.clear()
+        _POOL_CACHE[key] = (items, pool, prob, alias)
+    return pool, prob, alias
 
 
-def generate_loot(cfg: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+def generate_loot(cfg: Dict[str, Any], rng: random.Random | None = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """Generate a list of loot items based on lightweight filters.
 
     cfg fields:
@@ -339,11 +390,13 @@ def generate_loot(cfg: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[s
       - categoryProps: {
           weapons|armor|jewelry: { bonus?: 1|2|3, elemental?: str, magical?: str }
         }
+
+    rng defaults to the process-wide "loot" stream from rng_service.
     """
+    rng = rng or rng_service.stream("loot")
+    # A missing or broken ItemsDB.xml is reported, not re-read per request:
+    # the watcher thread owns reloads.
     items, err = load_items()
-    if not items or err:
-        # In case the cache was built before new parsers existed, force a reload.
-        items, err = load_items(force=True)
     if err:
         return [], err
     if not items:
@@ -382,36 +435,13 @@ def generate_loot(cfg: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[s
         if not v:
             return ""
         if v == "random":
-            return random.choice(pool) if pool else ""
+            return rng.choice(pool) if pool else ""
         return v if v in MAGIC_TYPES else ""
 
     def _parse_bonus(value: Any) -> Optional[int]:
         b = _parse_int(value, 0)
         return b if b in (1, 2, 3) else None
 
-    def is_magic(it: ItemDef) -> bool:
-        t = [x.lower() for x in (it.tags or [])]
-        return ("magic" in t) or ("magical" in t)
-
-    pool = []
-    for it in items:
-        if it.tier < tier_min or it.tier > tier_max:
-            continue
-        if categories and it.category.lower() not in categories:
-            continue
-        if slots and (it.slot not in slots and it.slot.lower() not in [s.lower() for s in slots]):
-            continue
-        if (not allow_magic) and is_magic(it):
-            continue
-        if tags:
-            it_tags = [x.lower() for x in (it.tags or [])]
-            if not all(t in it_tags for t in tags):
-                continue
-        pool.append(it)
-
-    if not pool:
-        return [], "No items match loot filters."
-
     # Source affects tier weighting:
     tier_bias = {
         "mob": 0.9,
@@ -421,18 +451,17 @@ def generate_loot(cfg: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[s
         "custom": 1.0,
     }.get(source, 1.0)
 
-    weights = []
-    for it in pool:
-        base = (it.tier + 1)
-        w = float(base) ** float(tier_bias)
-        weights.append(max(w, 0.01))
+    selected = _loot_pool(items, tier_min, tier_max, allow_magic, categories, slots, tags, tier_bias)
+    if selected is None:
+        return [], "No items match loot filters."
+    pool, prob, alias = selected
 
     if not isinstance(category_props, dict):
         category_props = {}
 
     out: List[Dict[str, Any]] = []
     for _ in range(count):
-        picked = _weighted_pick(pool, weights)
+        picked = _alias_pick(pool, prob, alias, rng)
         out_tags = list(picked.tags or [])
         magic_type = None
         magic_bonus = None
@@ -448,7 +477,7 @@ def generate_loot(cfg: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[s
         magical_is_random = str(magical_raw or "").strip().lower() == "random"
 
         if elemental_is_random and magical_is_random:
-            if random.choice([True, False]):
+            if rng.choice([True, False]):
                 elemental = _resolve_magic_type("random", elemental_pool)
                 magical = ""
             else:
@@ -474,7 +503,7 @@ def generate_loot(cfg: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[s
             out_tags.append("magic")
 
         if not elemental and not magical and add_elemental and ELEMENTAL_TYPES:
-            magic_type = random.choice(ELEMENTAL_TYPES)
+            magic_type = rng.choice(ELEMENTAL_TYPES)
             if magic_type not in out_tags:
                 out_tags.append(magic_type)
             if "magic" not in out_tags and "magical" not in out_tags:
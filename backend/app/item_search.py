@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+# Splits "longSword_t2" / "Long Sword" / "two-handed" into lowercase words.
+_WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+# Score weights per match kind; higher ranks first.
+NAME_EXACT = 8.0
+NAME_PREFIX = 5.0
+ID_MATCH = 3.0
+TAG_MATCH = 2.0
+NGRAM_MATCH = 1.0
+
+MIN_NGRAM_OVERLAP = 0.5
+
+
+def _words(text: str) -> List[str]:
+    return [w.lower() for w in _WORD_RE.findall(text or "")]
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ItemSearchIndex:
+    """Token, prefix and trigram index over a list of ItemDef.
+
+    Prefix lookups bisect a sorted vocabulary, which answers the same queries
+    as a trie without a dict per character.
+    """
+
+    def __init__(self, items: Sequence[Any]):
+        self.items = items
+        # token -> {item position: best score for that token}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._grams: Dict[str, set[str]] = {}
+        for pos, it in enumerate(items):
+            name_words = _words(it.name)
+            for w in name_words:
+                self._add(w, pos, NAME_EXACT)
+            for w in _words(_strip_tier(it.id)):
+                self._add(w, pos, ID_MATCH)
+            for tag in it.tags or ():
+                for w in _words(tag):
+                    self._add(w, pos, TAG_MATCH)
+        self._vocab = sorted(self._postings)
+        for token in self._vocab:
+            for gram in _trigrams(token):
+                self._grams.setdefault(gram, set()).add(token)
+
+    def _add(self, token: str, pos: int, score: float) -> None:
+        postings = self._postings.setdefault(token, {})
+        if postings.get(pos, 0.0) < score:
+            postings[pos] = score
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocab, prefix)
+        out: List[str] = []
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            out.append(token)
+        return out
+
+    def _fuzzy_tokens(self, word: str) -> List[tuple[str, float]]:
+        grams = _trigrams(word)
+        counts: Dict[str, int] = {}
+        for gram in grams:
+            for token in self._grams.get(gram, ()):
+                counts[token] = counts.get(token, 0) + 1
+        out = []
+        for token, shared in counts.items():
+            # Share of the query's trigrams found in the token: covers typos
+            # and substrings ("sword" in "longsword") alike.
+            overlap = shared / len(grams)
+            if overlap >= MIN_NGRAM_OVERLAP:
+                out.append((token, overlap))
+        return out
+
+    def _match_word(self, word: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for token in self._prefix_tokens(word):
+            exact = token == word
+            for pos, score in self._postings[token].items():
+                if not exact:
+                    score = NAME_PREFIX if score == NAME_EXACT else score * 0.75
+                if scores.get(pos, 0.0) < score:
+                    scores[pos] = score
+        if scores:
+            return scores
+        # Nothing starts with the word: fall back to typo-tolerant trigram matches.
+        for token, overlap in self._fuzzy_tokens(word):
+            for pos in self._postings[token]:
+                score = NGRAM_MATCH * overlap
+                if scores.get(pos, 0.0) < score:
+                    scores[pos] = score
+        return scores
+
+    def search(
+        self,
+        q: str,
+        tier: Optional[int] = None,
+        category: str = "",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        words = _words(q)
+        category = (category or "").strip().lower()
+
+        if words:
+            totals: Dict[int, float] | None = None
+            for word in words:
+                scores = self._match_word(word)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {pos: totals[pos] + s for pos, s in scores.items() if pos in totals}
+                if not totals:
+                    break
+            ranked = sorted((totals or {}).items(), key=lambda kv: (-kv[1], self.items[kv[0]].name, self.items[kv[0]].tier))
+        else:
+            ranked = [(pos, 0.0) for pos in range(len(self.items))]
+
+        facets: Dict[str, Dict[str, int]] = {"tier": {}, "category": {}}
+        hits = []
+        for pos, score in ranked:
+            it = self.items[pos]
+            facets["tier"][str(it.tier)] = facets["tier"].get(str(it.tier), 0) + 1
+            facets["category"][it.category] = facets["category"].get(it.category, 0) + 1
+            if tier is not None and it.tier != tier:
+                continue
+            if category and it.category.lower() != category:
+                continue
+            hits.append((pos, score))
+
+        page = hits[offset:offset + limit]
+        return {
+            "q": q,
+            "total": len(hits),
+            "offset": offset,
+            "limit": limit,
+            "facets": facets,
+            "results": [_item_payload(self.items[pos], score) for pos, score in page],
+        }
+
+
+def _strip_tier(item_id: str) -> str:
+    return re.sub(r"_t\d+$", "", item_id or "")
+
+
+def _item_payload(it: Any, score: float) -> Dict[str, Any]:
+    return {
+        "id": it.id,
+        "name": it.name,
+        "slot": it.slot,
+        "tier": it.tier,
+        "category": it.category,
+        "is_two_handed": it.is_two_handed,
+        "tags": list(it.tags or []),
+        "score": round(score, 3),
+    }
+
+
+_INDEX: ItemSearchIndex | None = None
+_LOCK = threading.Lock()
+
+
+def index_for(items: Sequence[Any]) -> ItemSearchIndex:
+    """The search index for this exact items list, rebuilt when the list is swapped."""
+    global _INDEX
+    index = _INDEX
+    if index is not None and index.items is items:
+        return index
+    with _LOCK:
+        if _INDEX is None or _INDEX.items is not items:
+            _INDEX = ItemSearchIndex(items)
+        return _INDEX
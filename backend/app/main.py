@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import http.client
 import os
 import sys
 import logging
@@ -9,31 +11,54 @@ import time
 import uuid
 import sqlite3
 import re
+import threading
 import urllib.error
+import urllib.parse
 import urllib.request
-from typing import Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
-from .rooms import manager, Room, ClientConn
+from .rooms import manager, Room, ClientConn, MAX_SEATS_TOTAL
 from .dice import roll_dice
 from .item_db import generate_loot
 from . import item_db
 from . import rules5e
 from . import rules5e_data
+from . import save_store
+from . import rng_service
+from . import item_catalog
 from .ai import maybe_ai_response
 from .message_handlers import HANDLERS
 
+_IMPORT_STARTED = time.perf_counter()
+
 load_dotenv()
 
 app = FastAPI(title="Arcane Engine Backend")
 loot_logger = logging.getLogger("arcane.loot")
 LOOT_DEBUG_LOG_PATH = os.path.join(os.path.dirname(__file__), "loot-debug.log")
 
+# Milliseconds spent per boot phase, reported once startup completes.
+STARTUP_PHASES: dict[str, float] = {}
+_STARTUP_TIMES: dict[str, float] = {}
+
+
+@contextmanager
+def _startup_phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_PHASES[name] = round((time.perf_counter() - started) * 1000, 2)
+
+
 def _truthy_env(name: str, default: str = "0") -> bool:
     return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
 
@@ -55,6 +80,8 @@ def _append_loot_debug(line: str) -> None:
 def _loot_debug_startup() -> None:
     from . import message_handlers
     
+    _STARTUP_TIMES["startup_began"] = time.perf_counter()
+
     # Register utility functions with message_handlers module
     message_handlers.register_functions(
         db_append_chat_log=db_append_chat_log,
@@ -64,10 +91,11 @@ def _loot_debug_startup() -> None:
         db_save_inventories=db_save_inventories,
         db_save_loot_bags=db_save_loot_bags,
         merge_category_props=_merge_category_props,
-        apply_category_props_to_items=_apply_category_props_to_items,
+        ensure_bag_props=_ensure_bag_props,
         coerce_category_props=_coerce_category_props,
         broadcast_loot_snapshot=broadcast_loot_snapshot,
         filter_loot_bags=filter_loot_bags,
+        party_stats=_party_stats,
         append_loot_debug=_append_loot_debug,
         loot_logger=loot_logger,
     )
@@ -167,17 +195,81 @@ class RulesSyncReq(BaseModel):
 # ------------------------------------------------------------
 DB_PATH = os.getenv("ARCANE_DB_PATH") or os.path.join(os.path.dirname(__file__), "arcane.db")
 _db: sqlite3.Connection | None = None
+_db_ready = False
+_db_migrating = False
+_db_lock = threading.RLock()
 
 
 def db() -> sqlite3.Connection:
-    global _db
-    if _db is None:
-        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        _db = sqlite3.connect(DB_PATH, check_same_thread=False)
-        _db.row_factory = sqlite3.Row
+    """Shared connection; opened and migrated on first use rather than at import."""
+    global _db, _db_ready, _db_migrating
+    if _db_ready:
+        return _db
+    with _db_lock:
+        if _db is None:
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            _db = sqlite3.connect(DB_PATH, check_same_thread=False)
+            _db.row_factory = sqlite3.Row
+        if not _db_ready and not _db_migrating:
+            # Migrations call db() themselves; the flag lets those calls through.
+            _db_migrating = True
+            try:
+                with _startup_phase("db.migrate"):
+                    db_migrate()
+                _db_ready = True
+            finally:
+                _db_migrating = False
     return _db
 
 
+def _ensure_columns(table: str, columns: dict[str, str]) -> None:
+    """Add columns missing from databases created by older versions."""
+    c = db().cursor()
+    existing = {row["name"] for row in c.execute(f"PRAGMA table_info({table})").fetchall()}
+    for column, decl in columns.items():
+        if column not in existing:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+# Sheet fields the inventory rules need; kept in characters.summary_json so
+# room-wide rule passes never have to parse full sheets.
+CHARACTER_SUMMARY_KEYS = ("name", "level", "prof_bonus", "stats", "mods", "proficiencies", "proficiencies_text")
+
+
+def _character_summary(sheet: dict) -> dict:
+    return {key: sheet[key] for key in CHARACTER_SUMMARY_KEYS if key in (sheet or {})}
+
+
+def _sheet_level(sheet: dict) -> int | None:
+    try:
+        return int(sheet.get("level"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backfill_character_summaries() -> None:
+    c = db().cursor()
+    rows = c.execute(
+        "SELECT character_id, sheet_json FROM characters WHERE summary_json IS NULL"
+    ).fetchall()
+    for row in rows:
+        try:
+            sheet = json.loads(row["sheet_json"] or "{}")
+        except (json.JSONDecodeError, TypeError):
+            sheet = {}
+        if not isinstance(sheet, dict):
+            sheet = {}
+        c.execute(
+            "UPDATE characters SET class_name=?, level=?, summary_json=? WHERE character_id=?",
+            (
+                sheet.get("class") or sheet.get("class_name"),
+                _sheet_level(sheet),
+                json.dumps(_character_summary(sheet), default=str),
+                row["character_id"],
+            ),
+        )
+
+
 def db_init():
     c = db().cursor()
     c.execute(
@@ -192,10 +284,16 @@ def db_init():
           grid_cols INTEGER,
           grid_rows INTEGER,
           grid_cell INTEGER,
-          map_image_url TEXT
+          map_image_url TEXT,
+          tokens_json TEXT,
+          lighting_json TEXT,
+          locked INTEGER DEFAULT 0
         )
         """
     )
+    _ensure_columns("rooms", {"tokens_json": "TEXT", "lighting_json": "TEXT", "locked": "INTEGER DEFAULT 0"})
+    c.execute("CREATE INDEX IF NOT EXISTS idx_rooms_created_at ON rooms(created_at DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_rooms_name ON rooms(name COLLATE NOCASE)")
     c.execute(
         """
         CREATE TABLE IF NOT EXISTS inventory (
@@ -217,10 +315,16 @@ def db_init():
           sheet_json TEXT,
           enriched_json TEXT,
           created_at REAL,
-          updated_at REAL
+          updated_at REAL,
+          class_name TEXT,
+          level INTEGER,
+          summary_json TEXT
         )
         """
     )
+    _ensure_columns("characters", {"class_name": "TEXT", "level": "INTEGER", "summary_json": "TEXT"})
+    c.execute("CREATE INDEX IF NOT EXISTS idx_characters_room ON characters(room_id, updated_at DESC)")
+    _backfill_character_summaries()
     c.execute(
         """
         CREATE TABLE IF NOT EXISTS chat_log (
@@ -253,11 +357,62 @@ def db_init():
         )
         """
     )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dnd_ref_cache (
+          path TEXT PRIMARY KEY,
+          payload_json TEXT,
+          found INTEGER,
+          fetched_at REAL
+        )
+        """
+    )
     db().commit()
 
 
-db_init()
-rules5e_data.seed_core_rules(db())
+# Append-only: (version, name, step). Each step must be safe on databases created
+# before schema_version existed, since those start from version 0.
+SCHEMA_MIGRATIONS: list[tuple[int, str, Callable[[], None]]] = [
+    (1, "base tables", lambda: db_init()),
+    (2, "core rules seed", lambda: rules5e_data.seed_core_rules(db())),
+    (3, "rules tables", lambda: rules5e_data.ensure_rules_tables(db())),
+    (4, "save tables", lambda: save_store.ensure_tables(db())),
+]
+save_store.register_connection(db)
+
+
+def db_schema_version() -> int:
+    row = db().execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return int(row[0] or 0)
+
+
+def db_migrate() -> list[int]:
+    """Apply pending SCHEMA_MIGRATIONS; a no-op beyond one query when up to date."""
+    c = db().cursor()
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+          version INTEGER PRIMARY KEY,
+          name TEXT,
+          applied_at REAL
+        )
+        """
+    )
+    current = db_schema_version()
+    applied: list[int] = []
+    for version, name, step in SCHEMA_MIGRATIONS:
+        if version <= current:
+            continue
+        step()
+        c.execute(
+            "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+            (version, name, time.time()),
+        )
+        db().commit()
+        applied.append(version)
+    if applied:
+        _append_loot_debug(f"[db.migrate] applied {applied}")
+    return applied
 
 
 def db_upsert_room(room: Any):
@@ -267,8 +422,8 @@ def db_upsert_room(room: Any):
         """
         INSERT INTO rooms (
           room_id, name, created_at, updated_at, scene_title, scene_text,
-          grid_cols, grid_rows, grid_cell, map_image_url
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+          grid_cols, grid_rows, grid_cell, map_image_url, tokens_json, lighting_json, locked
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(room_id) DO UPDATE SET
           name=excluded.name,
           updated_at=excluded.updated_at,
@@ -277,7 +432,10 @@ def db_upsert_room(room: Any):
           grid_cols=excluded.grid_cols,
           grid_rows=excluded.grid_rows,
           grid_cell=excluded.grid_cell,
-          map_image_url=excluded.map_image_url
+          map_image_url=excluded.map_image_url,
+          tokens_json=excluded.tokens_json,
+          lighting_json=excluded.lighting_json,
+          locked=excluded.locked
         """,
         (
             getattr(room, "room_id", ""),
@@ -290,6 +448,9 @@ def db_upsert_room(room: Any):
             (getattr(room, "grid", {}) or {}).get("rows", 100),
             (getattr(room, "grid", {}) or {}).get("cell", 20),
             getattr(room, "map_image_url", "") or "",
+            json.dumps(getattr(room, "tokens", []) or [], default=str),
+            json.dumps(getattr(room, "lighting", {}) or {}, default=str),
+            1 if getattr(room, "locked", False) else 0,
         ),
     )
     db().commit()
@@ -305,9 +466,92 @@ def db_load_room(room_id: str) -> Any | None:
     room.scene = {"title": row["scene_title"] or "", "text": row["scene_text"] or ""}
     room.grid = {"cols": row["grid_cols"] or 100, "rows": row["grid_rows"] or 100, "cell": row["grid_cell"] or 20}
     room.map_image_url = row["map_image_url"] or ""
+    room.locked = bool(row["locked"])
+    try:
+        room.tokens = json.loads(row["tokens_json"] or "[]")
+    except (json.JSONDecodeError, TypeError):
+        room.tokens = []
+    try:
+        lighting = json.loads(row["lighting_json"] or "{}")
+    except (json.JSONDecodeError, TypeError):
+        lighting = {}
+    if isinstance(lighting, dict) and lighting:
+        room.lighting = lighting
     return room
 
 
+LOBBY_PAGE_MAX = 100
+_lobby_cache: dict[tuple, dict] = {}
+# Sync endpoints run on the threadpool while the SSE feed reads from the loop.
+_lobby_cache_lock = threading.Lock()
+_LOBBY_CACHE_MAX = 64
+
+
+def _lobby_page(q: str, limit: int | None, offset: int) -> dict:
+    """Persisted room summaries for one lobby page (every room when limit is None),
+    cached until a room is created or locked."""
+    key = (manager.lobby_version, q, limit, offset)
+    with _lobby_cache_lock:
+        cached = _lobby_cache.get(key)
+    if cached is not None:
+        return cached
+    where = ""
+    params: list[Any] = []
+    if q:
+        where = "WHERE name LIKE ? ESCAPE '\\'"
+        params.append("%" + re.sub(r"([%_\\])", r"\\\1", q) + "%")
+    c = db().cursor()
+    total = c.execute(f"SELECT COUNT(1) FROM rooms {where}", params).fetchone()[0]
+    rows = c.execute(
+        f"SELECT room_id, name, locked, created_at FROM rooms {where} "
+        "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+        # LIMIT -1 is SQLite for "no limit".
+        [*params, -1 if limit is None else limit, offset],
+    ).fetchall()
+    page = {
+        "total": int(total or 0),
+        "rooms": [
+            {
+                "room_id": row["room_id"],
+                "name": row["name"],
+                "locked": bool(row["locked"]),
+                "created_at": row["created_at"],
+            }
+            for row in rows
+        ],
+    }
+    with _lobby_cache_lock:
+        if len(_lobby_cache) >= _LOBBY_CACHE_MAX:
+            _lobby_cache.clear()
+        _lobby_cache[key] = page
+    return page
+
+
+def db_list_lobby(q: str = "", limit: int | None = 50, offset: int = 0) -> dict:
+    """Lobby listing: indexed rooms-table page merged with live seat counts.
+
+    ``limit=None`` returns every matching room, which is what /api/rooms
+    clients have always received.
+    """
+    q = (q or "").strip()
+    if limit is not None:
+        limit = clamp_int(limit, 1, LOBBY_PAGE_MAX, 50)
+    offset = max(0, int(offset or 0))
+    page = _lobby_page(q, limit, offset)
+    rooms = []
+    for summary in page["rooms"]:
+        live = manager.live_occupancy(summary["room_id"])
+        entry = manager.room_summary(live) if live else {
+            **summary,
+            "seats_used": 0,
+            "max_seats": MAX_SEATS_TOTAL,
+        }
+        entry["created_at"] = summary["created_at"]
+        entry["loaded"] = live is not None
+        rooms.append(entry)
+    return {"rooms": rooms, "total": page["total"], "limit": limit, "offset": offset}
+
+
 def db_load_inventories(room_id: str) -> dict:
     """Load all player inventories for a room from database."""
     c = db().cursor()
@@ -445,15 +689,19 @@ def db_upsert_character(
     c.execute(
         """
         INSERT INTO characters (
-          character_id, room_id, owner_user_id, name, sheet_json, enriched_json, created_at, updated_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+          character_id, room_id, owner_user_id, name, sheet_json, enriched_json, created_at, updated_at,
+          class_name, level, summary_json
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(character_id) DO UPDATE SET
           room_id=excluded.room_id,
           owner_user_id=excluded.owner_user_id,
           name=excluded.name,
           sheet_json=excluded.sheet_json,
           enriched_json=excluded.enriched_json,
-          updated_at=excluded.updated_at
+          updated_at=excluded.updated_at,
+          class_name=excluded.class_name,
+          level=excluded.level,
+          summary_json=excluded.summary_json
         """,
         (
             character_id,
@@ -464,9 +712,14 @@ def db_upsert_character(
             json.dumps(enriched or {}, default=str),
             now,
             now,
+            sheet.get("class") or sheet.get("class_name"),
+            _sheet_level(sheet),
+            json.dumps(_character_summary(sheet), default=str),
         ),
     )
     db().commit()
+    # A sheet may have moved rooms, so drop every room's cached summaries.
+    _CHARACTER_SUMMARIES.clear()
 
 
 def db_get_character(character_id: str) -> dict | None:
@@ -511,6 +764,48 @@ def db_list_characters(room_id: str | None = None) -> list[dict]:
     return out
 
 
+def db_list_character_summaries(room_id: str) -> list[dict]:
+    """Projected characters for rule passes; "sheet" holds only CHARACTER_SUMMARY_KEYS."""
+    c = db().cursor()
+    rows = c.execute(
+        """
+        SELECT character_id, owner_user_id, name, class_name, level, summary_json
+        FROM characters WHERE room_id=? ORDER BY updated_at DESC
+        """,
+        (room_id,),
+    ).fetchall()
+    out: list[dict] = []
+    for row in rows:
+        try:
+            summary = json.loads(row["summary_json"] or "{}")
+        except (json.JSONDecodeError, TypeError):
+            summary = {}
+        out.append(
+            {
+                "character_id": row["character_id"],
+                "owner_user_id": row["owner_user_id"],
+                "name": row["name"],
+                "class_name": row["class_name"],
+                "level": row["level"],
+                "sheet": summary,
+            }
+        )
+    return out
+
+
+# room_id -> db_list_character_summaries result; db_upsert_character clears it.
+_CHARACTER_SUMMARIES: dict[str, list[dict]] = {}
+
+
+def _character_summaries(room_id: str) -> tuple[list[dict], bool]:
+    """Cached character summaries for a room, and whether they were just (re)read."""
+    cached = _CHARACTER_SUMMARIES.get(room_id)
+    if cached is not None:
+        return cached, False
+    cached = _CHARACTER_SUMMARIES[room_id] = db_list_character_summaries(room_id)
+    return cached, True
+
+
 def _merge_dict(base: dict, patch: dict) -> dict:
     out = dict(base or {})
     for key, value in (patch or {}).items():
@@ -538,13 +833,29 @@ def _summarize_sheet_changes(before: dict, after: dict, patch: dict) -> list[str
     return changes
 
 
+def _flush_room(room: Room) -> None:
+    """Persist everything a hibernated room needs to be rehydrated on next join."""
+    db_upsert_room(room)
+    # Both saves upsert per user/bag, so a room that never loaded its rows
+    # only adds what changed in memory without clobbering the stored ones.
+    db_save_inventories(room.room_id, getattr(room, "inventories", {}))
+    db_save_loot_bags(room.room_id, getattr(room, "loot_bags", {}))
+    if not getattr(room, "_db_loaded", False):
+        # Nothing was loaded from chat_log yet, so everything here is unsaved.
+        for message in getattr(room, "chat_log", []):
+            db_append_chat_log(room.room_id, message)
+    rng_service.drop_room(room.room_id)
+    _CHARACTER_SUMMARIES.pop(room.room_id, None)
+
+
 def ensure_room_loaded(room_id: str) -> Any | None:
     room = manager.get_room(room_id)
     if room:
         return room
     loaded = db_load_room(room_id)
     if loaded:
-        manager.rooms[room_id] = loaded
+        manager.load_room(loaded)
+        manager.evict_idle(_flush_room, keep=room_id)
         return loaded
     return None
 
@@ -579,7 +890,18 @@ def root():
 # DnD 5e API helpers
 # ------------------------------------------------------------
 DND5EAPI_BASE_URL = (os.getenv("ARCANE_DND5EAPI_URL") or "https://www.dnd5eapi.co").rstrip("/")
-_dnd_cache: dict[str, dict] = {}
+DND_CACHE_TTL = float(os.getenv("ARCANE_DND_CACHE_TTL_HOURS") or "168") * 3600
+DND_NEGATIVE_TTL = float(os.getenv("ARCANE_DND_NEGATIVE_TTL_HOURS") or "24") * 3600
+DND_FETCH_WORKERS = int(os.getenv("ARCANE_DND_FETCH_WORKERS") or "8")
+DND_FETCH_TIMEOUT = 6
+
+# path -> (fetched_at, payload or None for a cached "unknown name")
+_dnd_cache: dict[str, tuple[float, dict | None]] = {}
+_dnd_pool: ThreadPoolExecutor | None = None
+_dnd_conn_local = threading.local()
+
+# Synced Open5e tables that can answer a lookup without the network.
+_DND_LOCAL_TABLES = {"races": "rules_races"}
 
 
 def _slugify(value: str) -> str:
@@ -589,23 +911,96 @@ def _slugify(value: str) -> str:
     return v.strip("-")
 
 
+def _dnd_fresh(fetched_at: float, found: bool, now: float) -> bool:
+    return now - fetched_at < (DND_CACHE_TTL if found else DND_NEGATIVE_TTL)
+
+
+def _dnd_http_get(path: str) -> tuple[bool, dict | None]:
+    """GET one dnd5eapi path over this worker's keep-alive connection.
+
+    Returns (cacheable, payload); a 404 is a cacheable miss, transport errors are not.
+    """
+    parts = urllib.parse.urlsplit(DND5EAPI_BASE_URL)
+    for attempt in range(2):
+        conn = getattr(_dnd_conn_local, "conn", None)
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(parts.netloc, timeout=DND_FETCH_TIMEOUT)
+            _dnd_conn_local.conn = conn
+        try:
+            conn.request("GET", f"{parts.path}{path}", headers={"Accept": "application/json"})
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            _dnd_conn_local.conn = None
+            # A pooled connection may have been dropped by the server; retry once on a fresh one.
+            continue
+        if resp.status == 404:
+            return True, None
+        if resp.status != 200:
+            return False, None
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return False, None
+        return True, payload if isinstance(payload, dict) else None
+    return False, None
+
+
+def _dnd_fetch_many(paths: list[str]) -> dict[str, dict | None]:
+    """Resolve dnd5eapi paths via memory cache, then dnd_ref_cache, then concurrent HTTP."""
+    global _dnd_pool
+    now = time.time()
+    out: dict[str, dict | None] = {}
+    missing: list[str] = []
+    for path in dict.fromkeys(paths):
+        hit = _dnd_cache.get(path)
+        if hit and _dnd_fresh(hit[0], hit[1] is not None, now):
+            out[path] = hit[1]
+        else:
+            missing.append(path)
+
+    if missing:
+        c = db().cursor()
+        placeholders = ",".join("?" for _ in missing)
+        rows = c.execute(
+            f"SELECT path, payload_json, found, fetched_at FROM dnd_ref_cache WHERE path IN ({placeholders})",
+            missing,
+        ).fetchall()
+        for row in rows:
+            found = bool(row["found"])
+            if not _dnd_fresh(row["fetched_at"] or 0, found, now):
+                continue
+            payload = json.loads(row["payload_json"] or "{}") if found else None
+            _dnd_cache[row["path"]] = (row["fetched_at"], payload)
+            out[row["path"]] = payload
+        missing = [path for path in missing if path not in out]
+
+    if missing:
+        if _dnd_pool is None:
+            _dnd_pool = ThreadPoolExecutor(max_workers=DND_FETCH_WORKERS, thread_name_prefix="dnd-fetch")
+        results = list(_dnd_pool.map(_dnd_http_get, missing))
+        rows = []
+        for path, (cacheable, payload) in zip(missing, results):
+            out[path] = payload
+            if cacheable:
+                _dnd_cache[path] = (now, payload)
+                rows.append((path, json.dumps(payload or {}, default=str), 1 if payload else 0, now))
+        if rows:
+            db().cursor().executemany(
+                "INSERT OR REPLACE INTO dnd_ref_cache (path, payload_json, found, fetched_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            db().commit()
+    return out
+
+
 def _dnd_fetch(path: str) -> dict | None:
-    key = path
-    if key in _dnd_cache:
-        return _dnd_cache[key]
-    url = f"{DND5EAPI_BASE_URL}{path}"
-    try:
-        with urllib.request.urlopen(url, timeout=6) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-        if isinstance(payload, dict):
-            _dnd_cache[key] = payload
-            return payload
-    except Exception:
-        return None
-    return None
+    return _dnd_fetch_many([path]).get(path)
 
 
-def _lookup_dnd(kind: str, raw_value: Any) -> dict | None:
+def _dnd_ref_key(raw_value: Any) -> tuple[str, str] | None:
     if raw_value is None:
         return None
     if isinstance(raw_value, dict):
@@ -618,57 +1013,176 @@ def _lookup_dnd(kind: str, raw_value: Any) -> dict | None:
     index = _slugify(text)
     if not index:
         return None
-    payload = _dnd_fetch(f"/api/{kind}/{index}")
-    if not payload:
+    return text, index
+
+
+def _local_dnd_ref(kind: str, index: str, text: str) -> dict | None:
+    table = _DND_LOCAL_TABLES.get(kind)
+    if not table:
+        return None
+    try:
+        row = db().cursor().execute(
+            f"SELECT slug, name FROM {table} WHERE slug=? OR name=? COLLATE NOCASE LIMIT 1",
+            (index, text),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # rules_* tables only exist after the first Open5e sync.
+        return None
+    if not row:
         return None
+    return {"index": row["slug"] or index, "name": row["name"] or text, "url": f"/api/{kind}/{index}"}
+
+
+def _lookup_dnd_many(lookups: list[tuple[str, Any]]) -> list[dict | None]:
+    """Resolve (kind, value) pairs, preferring synced rules tables, with one concurrent fetch for the rest."""
+    keys = [_dnd_ref_key(raw_value) for _kind, raw_value in lookups]
+    refs: list[dict | None] = [None] * len(lookups)
+    remote: dict[int, str] = {}
+    for i, ((kind, _raw), key) in enumerate(zip(lookups, keys)):
+        if not key:
+            continue
+        text, index = key
+        local = _local_dnd_ref(kind, index, text)
+        if local:
+            refs[i] = local
+        else:
+            remote[i] = f"/api/{kind}/{index}"
+    payloads = _dnd_fetch_many(list(remote.values())) if remote else {}
+    for i, path in remote.items():
+        payload = payloads.get(path)
+        if not payload:
+            continue
+        kind = lookups[i][0]
+        text, index = keys[i]
+        refs[i] = {
+            "index": payload.get("index") or index,
+            "name": payload.get("name") or text,
+            "url": payload.get("url") or f"/api/{kind}/{index}",
+        }
+    return refs
+
+
+def _lookup_dnd(kind: str, raw_value: Any) -> dict | None:
+    return _lookup_dnd_many([(kind, raw_value)])[0]
+
+
+def _sheet_ref_values(sheet: dict) -> dict:
+    spells = sheet.get("spells")
     return {
-        "index": payload.get("index") or index,
-        "name": payload.get("name") or text,
-        "url": payload.get("url") or f"/api/{kind}/{index}",
+        "class": sheet.get("class") or sheet.get("class_name") or sheet.get("className"),
+        "race": sheet.get("race"),
+        "background": sheet.get("background"),
+        "spells": spells[:30] if isinstance(spells, list) else [],
     }
 
 
-def _enrich_character_sheet(sheet: dict) -> tuple[dict, list[str]]:
+def _enrich_character_sheet(
+    sheet: dict, previous: tuple[dict, dict] | None = None
+) -> tuple[dict, list[str]]:
+    """Resolve 5e references for a sheet.
+
+    previous is the stored (sheet, enriched) pair; refs whose source value is
+    unchanged are reused from it so only edited fields hit the lookup path.
+    Values with no stored ref are looked up again.
+    """
     warnings: list[str] = []
     enriched: dict = {}
+    values = _sheet_ref_values(sheet)
+    prev_values = _sheet_ref_values(previous[0]) if previous else None
+    prev_enriched = (previous[1] or {}) if previous else {}
+
+    fields = (("class", "classes"), ("race", "races"), ("background", "backgrounds"))
+    refs: dict[str, dict | None] = {}
+    lookups: list[tuple[str, Any]] = []
+    lookup_fields: list[str] = []
+    for field, kind in fields:
+        unchanged = prev_values is not None and values[field] == prev_values[field]
+        if unchanged and (prev_enriched.get(field) or not values[field]):
+            refs[field] = prev_enriched.get(field)
+        else:
+            lookups.append((kind, values[field]))
+            lookup_fields.append(field)
+
+    # Spells already on the previous sheet keep their stored ref, keyed by the
+    # slug of the value the user typed. Unknown spells are dropped from enriched,
+    # so typed values and refs only line up by position when every one resolved;
+    # otherwise fall back to matching the ref's own index/name slug.
+    prev_spells = (prev_values or {}).get("spells", [])
+    prev_refs = [ref for ref in prev_enriched.get("spells") or [] if isinstance(ref, dict)]
+    prev_spell_refs: dict[str, dict] = {}
+    if prev_refs and len(prev_refs) == len(prev_spells):
+        for spell, ref in zip(prev_spells, prev_refs):
+            key = _dnd_ref_key(spell)
+            if key:
+                prev_spell_refs.setdefault(key[1], ref)
+    for ref in prev_refs:
+        for key in (ref.get("index"), _slugify(str(ref.get("name") or ""))):
+            if key:
+                prev_spell_refs.setdefault(key, ref)
+    prev_spell_keys = {key[1] for key in (_dnd_ref_key(spell) for spell in prev_spells) if key}
+    spells = values["spells"]
+    spell_refs_by_pos: dict[int, dict | None] = {}
+    lookup_spells: list[int] = []
+    for pos, spell in enumerate(spells):
+        key = _dnd_ref_key(spell)
+        if key and key[1] in prev_spell_keys and key[1] in prev_spell_refs:
+            spell_refs_by_pos[pos] = prev_spell_refs[key[1]]
+        else:
+            lookups.append(("spells", spell))
+            lookup_spells.append(pos)
+
+    resolved = _lookup_dnd_many(lookups) if lookups else []
+    for field, ref in zip(lookup_fields, resolved):
+        refs[field] = ref
+    for pos, ref in zip(lookup_spells, resolved[len(lookup_fields):]):
+        spell_refs_by_pos[pos] = ref
+
+    for field, _kind in fields:
+        value = values[field]
+        ref = refs.get(field)
+        if value and not ref:
+            warnings.append(f"Unknown {field}: {value}")
+        if ref:
+            enriched[field] = ref
 
-    class_value = sheet.get("class") or sheet.get("class_name") or sheet.get("className")
-    class_ref = _lookup_dnd("classes", class_value)
-    if class_value and not class_ref:
-        warnings.append(f"Unknown class: {class_value}")
-    if class_ref:
-        enriched["class"] = class_ref
-
-    race_value = sheet.get("race")
-    race_ref = _lookup_dnd("races", race_value)
-    if race_value and not race_ref:
-        warnings.append(f"Unknown race: {race_value}")
-    if race_ref:
-        enriched["race"] = race_ref
-
-    background_value = sheet.get("background")
-    background_ref = _lookup_dnd("backgrounds", background_value)
-    if background_value and not background_ref:
-        warnings.append(f"Unknown background: {background_value}")
-    if background_ref:
-        enriched["background"] = background_ref
-
-    spells_value = sheet.get("spells")
     spell_refs: list[dict] = []
-    if isinstance(spells_value, list):
-        for spell in spells_value[:30]:
-            ref = _lookup_dnd("spells", spell)
-            if ref:
-                spell_refs.append(ref)
-            else:
-                if spell:
-                    warnings.append(f"Unknown spell: {spell}")
+    for pos, spell in enumerate(spells):
+        ref = spell_refs_by_pos.get(pos)
+        if ref:
+            spell_refs.append(ref)
+        else:
+            if spell:
+                warnings.append(f"Unknown spell: {spell}")
     if spell_refs:
         enriched["spells"] = spell_refs
 
     return enriched, warnings
 
 
+@app.get("/api/debug/startup")
+def debug_startup():
+    return {"phases_ms": STARTUP_PHASES, "schema_version": db_schema_version()}
+
+
+@app.get("/api/items/catalog")
+def api_items_catalog():
+    return _catalog_payload(item_catalog.get_catalog())
+
+
+@app.get("/api/items/search")
+def api_items_search(q: str = "", tier: int | None = None, category: str = "", limit: int = 20, offset: int = 0):
+    result, err = item_db.search_items(
+        q,
+        tier=tier,
+        category=category,
+        limit=clamp_int(limit, 1, 200, 20),
+        offset=clamp_int(offset, 0, 1_000_000, 0),
+    )
+    if err:
+        raise HTTPException(status_code=503, detail=err)
+    return result
+
+
 @app.get("/api/debug/where")
 def debug_where():
     line = f"[loot.debug] where {time.time()}"
@@ -684,7 +1198,11 @@ def debug_where():
 def api_rules_sync(req: RulesSyncReq):
     _append_loot_debug("[api] POST /api/rules/sync called")
     print("[api] POST /api/rules/sync called", flush=True)
-    counts = rules5e_data.sync_open5e(db(), req.kinds)
+    conn = _rules_sync_conn()
+    try:
+        counts = rules5e_data.sync_open5e(conn, req.kinds)
+    finally:
+        conn.close()
     return {"synced": counts}
 
 
@@ -696,10 +1214,16 @@ def api_rules_status():
 
 
 @app.get("/api/rules/{kind}")
-def api_rules_list(kind: str, full: int | None = None, limit: int | None = None):
-    _append_loot_debug(f"[api] GET /api/rules/{kind} called")
-    print(f"[api] GET /api/rules/{kind} called", flush=True)
-    return rules5e_data.list_rules(db(), kind, full=bool(full), limit=limit)
+def api_rules_list(request: Request, kind: str, full: int | None = None, limit: int | None = None):
+    catalog = rules5e_data.catalog_response(db(), kind, full=bool(full), limit=limit)
+    headers = {"ETag": catalog["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match") or ""
+    if catalog["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if "gzip" in (request.headers.get("accept-encoding") or "").lower():
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=catalog["gzip"], media_type="application/json", headers=headers)
+    return Response(content=catalog["body"], media_type="application/json", headers=headers)
 
 
 # ============================================================================
@@ -775,7 +1299,7 @@ def norm_role(v: str | None) -> str:
     return r
 
 
-def filter_loot_bags(room: Room, role: str, user_id: str) -> dict:
+def _build_loot_view(room: Room, role: str, user_id: str) -> dict:
     def _strip_private(bag: dict) -> dict:
         return {k: v for k, v in bag.items() if not str(k).startswith("_") and k != "config"}
 
@@ -809,6 +1333,41 @@ def filter_loot_bags(room: Room, role: str, user_id: str) -> dict:
     return out
 
 
+def _loot_view(room: Room, role: str, user_id: str) -> tuple[dict, str]:
+    """A viewer's filtered loot_bags and its loot.snapshot JSON, built once per room.loot_version.
+
+    Every DM sees the same view; players share one unless a visible player bag
+    targets them. Callers must treat the returned dict as read-only.
+    """
+    views = room._loot_views
+    if views.get("version") != room.loot_version:
+        views.clear()
+        views["version"] = room.loot_version
+    if role == "dm":
+        key: tuple = ("dm",)
+    else:
+        targets = views.get("targets")
+        if targets is None:
+            targets = {
+                bag.get("target_user_id")
+                for bag in room.loot_bags.values()
+                if bag.get("visible_to_players", False) and bag.get("type") == "player"
+            }
+            views["targets"] = targets
+        key = ("player", user_id if user_id in targets else "")
+    cached = views.get(key)
+    if cached is None:
+        view = _build_loot_view(room, role, user_id)
+        # Same encoding as WebSocket.send_json, so send_text(text) is byte-identical.
+        text = json.dumps({"type": "loot.snapshot", "loot_bags": view}, separators=(",", ":"), ensure_ascii=False)
+        cached = views[key] = (view, text)
+    return cached
+
+
+def filter_loot_bags(room: Room, role: str, user_id: str) -> dict:
+    return _loot_view(room, role, user_id)[0]
+
+
 def _hydrate_item_fields(item: dict) -> dict:
     if not item or not isinstance(item, dict):
         return item
@@ -861,7 +1420,7 @@ def _merge_category_props(cfg: dict, data: dict | None = None) -> dict:
     return cfg
 
 
-def _apply_category_props_to_items(items: list, cfg: dict) -> None:
+def _apply_category_props_to_items(items: list, cfg: dict, rng: random.Random | None = None) -> None:
     if not items or not isinstance(cfg, dict):
         return
     category_props = _coerce_category_props(cfg.get("categoryProps")) or {}
@@ -874,6 +1433,7 @@ def _apply_category_props_to_items(items: list, cfg: dict) -> None:
     if not normalized:
         return
 
+    rng = rng or rng_service.stream("loot")
     elemental_pool = list(item_db.ELEMENTAL_TYPES)
     magical_pool = sorted(set(item_db.MAGIC_TYPES) - set(item_db.ELEMENTAL_TYPES)) or sorted(item_db.MAGIC_TYPES)
 
@@ -882,7 +1442,7 @@ def _apply_category_props_to_items(items: list, cfg: dict) -> None:
         if not v:
             return ""
         if v == "random":
-            return random.choice(pool) if pool else ""
+            return rng.choice(pool) if pool else ""
         return v if v in item_db.MAGIC_TYPES else ""
 
     def resolve_bonus(value: Any) -> Optional[int]:
@@ -906,7 +1466,7 @@ def _apply_category_props_to_items(items: list, cfg: dict) -> None:
         elemental_is_random = str(elemental_raw or "").strip().lower() == "random"
         magical_is_random = str(magical_raw or "").strip().lower() == "random"
         if elemental_is_random and magical_is_random:
-            if random.choice([True, False]):
+            if rng.choice([True, False]):
                 elemental = resolve_type("random", elemental_pool)
                 magical = ""
             else:
@@ -937,9 +1497,36 @@ def _apply_category_props_to_items(items: list, cfg: dict) -> None:
             item["tags"] = tags
 
 
-def _normalize_inventories(room: Room) -> None:
+# Bump after changing _apply_category_props_to_items so existing bags are re-applied once.
+CATEGORY_PROPS_VERSION = 1
+
+
+def _ensure_bag_props(bag: dict, rng: random.Random | None = None) -> bool:
+    """Apply a bag's categoryProps to its items once; afterwards this is a dict lookup.
+
+    Returns True when the items were changed.
+    """
+    if bag.get("_props_version") == CATEGORY_PROPS_VERSION:
+        return False
+    cfg = bag.get("_config") or bag.get("config") or {}
+    cfg = _merge_category_props(cfg)
+    _apply_category_props_to_items(bag.get("items") or [], cfg, rng)
+    bag["_props_version"] = CATEGORY_PROPS_VERSION
+    return True
+
+
+def _normalize_inventories(room: Room, user_ids: list[str] | None = None) -> None:
+    """Hydrate and re-derive rule stats for ``user_ids``' inventories (all when None)."""
     inventories = getattr(room, "inventories", {})
-    for inv in inventories.values():
+    characters, fresh = _character_summaries(room.room_id)
+    if fresh:
+        # Sheets may have changed since the last pass, so every inventory is stale.
+        user_ids = None
+    if user_ids is None:
+        changed = list(inventories.values())
+    else:
+        changed = [inventories[uid] for uid in user_ids if uid in inventories]
+    for inv in changed:
         bag = inv.get("bag") or []
         for item in bag:
             _hydrate_item_fields(item)
@@ -948,58 +1535,169 @@ def _normalize_inventories(room: Room) -> None:
             if item:
                 _hydrate_item_fields(item)
     try:
-        rules5e.apply_inventory_rules(room.room_id, inventories, db_list_characters(room.room_id), room.clients)
+        rules5e.apply_inventory_rules(room.room_id, inventories, characters, room.clients, user_ids)
     except Exception:
         pass
 
 
+def _party_stats(room: Room) -> dict:
+    """Computed AC and attack lines for the room's party (see rules5e.party_stats)."""
+    if getattr(room, "_db_loaded", False):
+        inventories = room.inventories
+    else:
+        inventories = db_load_inventories(room.room_id)
+    characters, _ = _character_summaries(room.room_id)
+    return {
+        "room_id": room.room_id,
+        "rules_version": rules5e.RULES_VERSION,
+        "party": rules5e.party_stats(inventories, characters, room.clients),
+    }
+
+
+def _rules_sync_conn() -> sqlite3.Connection:
+    """Dedicated connection so a long sync never holds the request connection."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _run_rules_sync(kinds: list[str]) -> None:
+    db()
+    conn = _rules_sync_conn()
+    try:
+        try:
+            counts = rules5e_data.rules_counts(conn)
+        except Exception:
+            counts = {}
+
+        missing = [k for k in kinds if counts.get(k, 0) == 0]
+        present = [k for k in kinds if counts.get(k, 0) > 0]
+        if missing:
+            try:
+                result = rules5e_data.sync_open5e(conn, kinds)
+                _append_loot_debug(f"[rules.sync] bootstrap_all {result}")
+            except Exception as exc:
+                _append_loot_debug(f"[rules.sync] bootstrap failed: {exc}")
+            else:
+                try:
+                    counts = rules5e_data.rules_counts(conn)
+                    _append_loot_debug(f"[rules.sync] counts {counts}")
+                except Exception:
+                    pass
+
+        if _truthy_env("ARCANE_RULES_SYNC_ON_STARTUP", "1") and present:
+            try:
+                result = rules5e_data.sync_open5e(conn, present)
+                _append_loot_debug(f"[rules.sync] update {result}")
+            except Exception as exc:
+                _append_loot_debug(f"[rules.sync] update failed: {exc}")
+    finally:
+        conn.close()
+
+
+_rules_sync_task: asyncio.Task | None = None
+
+
 @app.on_event("startup")
-def _rules_sync_startup() -> None:
+async def _rules_sync_startup() -> None:
+    global _rules_sync_task
     kinds = _parse_rules_kinds()
-    if not kinds:
+    if not kinds or _rules_sync_task is not None:
         return
+    # Runs in the background: readiness must not wait on Open5e.
+    _rules_sync_task = asyncio.create_task(asyncio.to_thread(_run_rules_sync, kinds))
 
-    try:
-        counts = rules5e_data.rules_counts(db())
-    except Exception:
-        counts = {}
 
-    missing = [k for k in kinds if counts.get(k, 0) == 0]
-    present = [k for k in kinds if counts.get(k, 0) > 0]
-    if missing:
-        try:
-            result = rules5e_data.sync_open5e(db(), kinds)
-            _append_loot_debug(f"[rules.sync] bootstrap_all {result}")
-        except Exception as exc:
-            _append_loot_debug(f"[rules.sync] bootstrap failed: {exc}")
-        else:
-            try:
-                counts = rules5e_data.rules_counts(db())
-                _append_loot_debug(f"[rules.sync] counts {counts}")
-            except Exception:
-                pass
+ROOM_SWEEP_SECONDS = float(os.getenv("ARCANE_ROOM_SWEEP_SECONDS") or "60")
+_room_sweep_task: asyncio.Task | None = None
 
-    if _truthy_env("ARCANE_RULES_SYNC_ON_STARTUP", "1") and present:
+
+async def _room_sweep_loop() -> None:
+    while True:
+        await asyncio.sleep(ROOM_SWEEP_SECONDS)
         try:
-            result = rules5e_data.sync_open5e(db(), present)
-            _append_loot_debug(f"[rules.sync] update {result}")
+            evicted = manager.evict_idle(_flush_room)
+            if evicted:
+                _append_loot_debug(f"[rooms.hibernate] evicted {evicted}")
         except Exception as exc:
-            _append_loot_debug(f"[rules.sync] update failed: {exc}")
+            _append_loot_debug(f"[rooms.hibernate] sweep failed: {exc}")
+
+
+@app.on_event("startup")
+async def _room_sweep_startup() -> None:
+    global _room_sweep_task
+    if _room_sweep_task is None and ROOM_SWEEP_SECONDS > 0:
+        _room_sweep_task = asyncio.create_task(_room_sweep_loop())
+
+
+_items_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _catalog_payload(catalog: item_catalog.CompiledCatalog) -> dict:
+    return {
+        "version": catalog.version,
+        "digest": catalog.digest,
+        "items": len(catalog.items),
+        "error": catalog.error,
+    }
+
+
+async def _broadcast_catalog(payload: dict) -> None:
+    for room_id in list(manager.rooms):
+        await manager.broadcast(room_id, {"type": "items.catalog", **payload})
+
+
+def _on_catalog_reload(catalog: item_catalog.CompiledCatalog) -> None:
+    # Called on the watcher thread; hop onto the event loop to reach sockets.
+    loop = _items_loop
+    if loop is None or loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(_broadcast_catalog(_catalog_payload(catalog)), loop)
+
+
+item_catalog.on_reload(_on_catalog_reload)
+
+
+@app.on_event("startup")
+async def _item_catalog_startup() -> None:
+    global _items_loop
+    _items_loop = asyncio.get_running_loop()
+    with _startup_phase("items.catalog"):
+        await asyncio.to_thread(item_db.load_items)
+    item_catalog.start_watcher()
+
+
+@app.on_event("shutdown")
+def _item_catalog_shutdown() -> None:
+    item_catalog.stop_watcher()
+
+
+@app.on_event("startup")
+def _startup_report() -> None:
+    # Open the database here so the first request doesn't pay for migrations.
+    db()
+    began = _STARTUP_TIMES.get("startup_began")
+    if began is not None:
+        STARTUP_PHASES["startup.hooks"] = round((time.perf_counter() - began) * 1000, 2)
+    line = f"[startup] phases_ms {STARTUP_PHASES}"
+    _append_loot_debug(line)
+    logging.getLogger("arcane.startup").info(line)
 
 
 async def broadcast_loot_snapshot(room: Room) -> None:
+    changed = False
     for bag_id, bag in list(getattr(room, "loot_bags", {}).items()):
         if not bag.get("items"):
             del room.loot_bags[bag_id]
+            changed = True
             continue
-        cfg = bag.get("_config") or bag.get("config") or {}
-        cfg = _merge_category_props(cfg)
-        _apply_category_props_to_items(bag.get("items") or [], cfg)
+        if _ensure_bag_props(bag, rng_service.stream("loot", room.room_id)):
+            changed = True
+    if changed:
+        room.touch_loot()
     for conn in list(room.clients.values()):
         try:
-            await conn.ws.send_json(
-                {"type": "loot.snapshot", "loot_bags": filter_loot_bags(room, conn.role, conn.user_id)}
-            )
+            await conn.ws.send_text(_loot_view(room, conn.role, conn.user_id)[1])
         except Exception:
             pass
 
@@ -1008,8 +1706,8 @@ async def broadcast_loot_snapshot(room: Room) -> None:
 # HTTP API
 # ------------------------------------------------------------
 @app.get("/api/rooms")
-def api_rooms(debug: int | None = None):
-    rooms = manager.list_rooms()
+def api_rooms(debug: int | None = None, q: str = "", limit: int | None = None, offset: int = 0):
+    rooms = db_list_lobby(q, limit, offset)["rooms"]
     if debug:
         return {
             "rooms": rooms,
@@ -1028,9 +1726,43 @@ def api_create_room(req: CreateRoomReq):
     if not getattr(room, "map_image_url", ""):
         room.map_image_url = default_map_url()
     db_upsert_room(room)
+    manager.notify_lobby({"type": "room.created", **manager.room_summary(room)}, invalidate=True)
+    manager.evict_idle(_flush_room, keep=room.room_id)
     return {"room_id": room.room_id, "name": room.name}
 
 
+@app.get("/api/lobby")
+def api_lobby(q: str = "", limit: int = 50, offset: int = 0):
+    return db_list_lobby(q, limit, offset)
+
+
+LOBBY_HEARTBEAT_SECONDS = 15.0
+
+
+@app.get("/api/lobby/stream")
+async def api_lobby_stream():
+    queue = manager.subscribe_lobby()
+
+    async def events():
+        try:
+            yield f"event: lobby.version\ndata: {json.dumps({'version': manager.lobby_version})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=LOBBY_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            manager.unsubscribe_lobby(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/characters/upload")
 def api_character_upload(req: CharacterUploadReq):
     sheet_raw = req.sheet or {}
@@ -1089,7 +1821,7 @@ async def api_character_update(character_id: str, req: CharacterUpdateReq):
     sheet_data = sheet_model.dict(by_alias=True)
     name = (req.name or sheet_data.get("name") or record.get("name") or "Unnamed").strip()
 
-    enriched, warnings = _enrich_character_sheet(sheet_data)
+    enriched, warnings = _enrich_character_sheet(sheet_data, previous=(before_sheet, record.get("enriched") or {}))
     room_id = (req.room_id or record.get("room_id") or "").strip() or None
     owner_user_id = (req.owner_user_id or record.get("owner_user_id") or "").strip() or None
 
@@ -1138,6 +1870,14 @@ def api_characters_for_room(room_id: str):
     return {"room_id": room_id, "characters": db_list_characters(room_id)}
 
 
+@app.get("/api/rooms/{room_id}/party_stats")
+def api_party_stats(room_id: str):
+    room = ensure_room_loaded(room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    return _party_stats(room)
+
+
 @app.post("/api/rooms/{room_id}/scene")
 def api_scene_update(room_id: str, req: SceneUpdateReq):
     room = ensure_room_loaded(room_id)
@@ -1292,6 +2032,7 @@ async def ws_room(websocket: WebSocket, room_id: str, name: str, role: str):
         if not getattr(room, "_db_loaded", False):
             room.inventories = db_load_inventories(room_id)
             room.loot_bags = db_load_loot_bags(room_id)
+            room.touch_loot()
             room.chat_log = db_load_chat_log(room_id, limit=100)
             room._db_loaded = True
         
@@ -1300,6 +2041,7 @@ async def ws_room(websocket: WebSocket, room_id: str, name: str, role: str):
         for bag_id, bag in list(getattr(room, "loot_bags", {}).items()):
             if not bag.get("items"):
                 del room.loot_bags[bag_id]
+                room.touch_loot()
         loot_bags = filter_loot_bags(room, role, user_id)
         chat_log = getattr(room, "chat_log", [])
         
@@ -1394,3 +2136,6 @@ async def ws_room(websocket: WebSocket, room_id: str, name: str, role: str):
         
         await manager.broadcast(room_id, {"type": "members.update", "members": manager.get_members(room_id)})
         await manager.broadcast(room_id, leave_msg)
+
+
+STARTUP_PHASES["import.main"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 2)
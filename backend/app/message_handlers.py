@@ -9,9 +9,10 @@ import uuid
 import sys
 from typing import Any, Dict, Optional, Callable
 
-from .dice import roll_dice
+from .dice import DETAIL_MAX_ROLLS, roll_dice
 from .ai import maybe_ai_response
-from .item_db import generate_loot
+from .item_db import generate_loot, search_items
+from . import rng_service
 
 
 # Deferred imports to avoid circular dependencies - these will be set at runtime
@@ -22,10 +23,11 @@ _normalize_inventories: Optional[Callable] = None
 _db_save_inventories: Optional[Callable] = None
 _db_save_loot_bags: Optional[Callable] = None
 _merge_category_props: Optional[Callable] = None
-_apply_category_props_to_items: Optional[Callable] = None
+_ensure_bag_props: Optional[Callable] = None
 _coerce_category_props: Optional[Callable] = None
 _broadcast_loot_snapshot: Optional[Callable] = None
 _filter_loot_bags: Optional[Callable] = None
+_party_stats: Optional[Callable] = None
 _append_loot_debug: Optional[Callable] = None
 _loot_logger: Optional[Any] = None
 
@@ -38,18 +40,19 @@ def register_functions(
     db_save_inventories: Callable,
     db_save_loot_bags: Callable,
     merge_category_props: Callable,
-    apply_category_props_to_items: Callable,
+    ensure_bag_props: Callable,
     coerce_category_props: Callable,
     broadcast_loot_snapshot: Callable,
     filter_loot_bags: Callable,
+    party_stats: Callable,
     append_loot_debug: Callable,
     loot_logger: Any,
 ) -> None:
     """Register functions from main.py to avoid circular imports."""
     global _db_append_chat_log, _db_upsert_room, _clamp_int, _normalize_inventories
     global _db_save_inventories, _db_save_loot_bags, _merge_category_props
-    global _apply_category_props_to_items, _coerce_category_props, _broadcast_loot_snapshot
-    global _filter_loot_bags, _append_loot_debug, _loot_logger
+    global _ensure_bag_props, _coerce_category_props, _broadcast_loot_snapshot
+    global _filter_loot_bags, _party_stats, _append_loot_debug, _loot_logger
     
     _db_append_chat_log = db_append_chat_log
     _db_upsert_room = db_upsert_room
@@ -58,14 +61,28 @@ def register_functions(
     _db_save_inventories = db_save_inventories
     _db_save_loot_bags = db_save_loot_bags
     _merge_category_props = merge_category_props
-    _apply_category_props_to_items = apply_category_props_to_items
+    _ensure_bag_props = ensure_bag_props
     _coerce_category_props = coerce_category_props
     _broadcast_loot_snapshot = broadcast_loot_snapshot
     _filter_loot_bags = filter_loot_bags
+    _party_stats = party_stats
     _append_loot_debug = append_loot_debug
     _loot_logger = loot_logger
 
 
+def _paginate(items: list, data: Dict[str, Any]) -> tuple[list, Dict[str, Any]]:
+    """Slice a list by the optional limit/offset of a request; no limit returns everything."""
+    total = len(items)
+    offset = _clamp_int(data.get("offset"), 0, max(total, 0), 0)
+    limit = data.get("limit")
+    if limit is None:
+        page = items[offset:]
+    else:
+        limit = _clamp_int(limit, 1, 500, 50)
+        page = items[offset:offset + limit]
+    return page, {"total": total, "offset": offset, "limit": limit}
+
+
 # ============================================================================
 # CHAT HANDLERS
 # ============================================================================
@@ -152,6 +169,28 @@ async def handle_scene_update(
     await manager.broadcast(room.room_id, {"type": "scene.snapshot", "scene": room.scene})
 
 
+async def handle_room_lock(
+    room: Any,
+    websocket: Any,
+    data: Dict[str, Any],
+    manager: Any,
+    room_id: str,
+    user_id: str,
+    role: str,
+    name: str,
+) -> None:
+    """Handle room.lock message type."""
+    if role != "dm":
+        await websocket.send_json({"type": "error", "message": "DM only."})
+        return
+
+    room.locked = bool(data.get("locked"))
+    _db_upsert_room(room)
+
+    await manager.broadcast(room.room_id, {"type": "room.locked", "locked": room.locked})
+    manager.notify_lobby({"type": "room.locked", **manager.room_summary(room)}, invalidate=True)
+
+
 # ============================================================================
 # DICE HANDLERS
 # ============================================================================
@@ -171,13 +210,39 @@ async def handle_dice_roll(
     if not expr:
         return
     
-    result = roll_dice(expr)
+    result = roll_dice(expr, rng=rng_service.stream("dice", room_id))
+    if len(result["rolls"]) > DETAIL_MAX_ROLLS:
+        # Mass rolls go out as count and sum only (already in detail), not up
+        # to MAX_COUNT dice to every client in the room.
+        result["roll_count"] = len(result.pop("rolls"))
     await manager.broadcast(
         room_id,
         {"type": "dice.result", "user_id": user_id, "name": name, "role": role, "expr": expr, **result},
     )
 
 
+async def handle_rng_seed(
+    room: Any,
+    websocket: Any,
+    data: Dict[str, Any],
+    manager: Any,
+    room_id: str,
+    user_id: str,
+    role: str,
+    name: str,
+) -> None:
+    """Handle rng.seed message type: replayable dice, loot, initiative and hazards."""
+    if role != "dm":
+        await websocket.send_json({"type": "error", "message": "DM only."})
+        return
+
+    seed = str(data.get("seed") or "").strip()[:128] or None
+    rng_service.seed_room(room_id, seed)
+
+    # Players learn that rolls are replayable, never the seed that predicts them.
+    await manager.broadcast(room_id, {"type": "rng.seeded", "seeded": seed is not None})
+
+
 # ============================================================================
 # GRID HANDLERS
 # ============================================================================
@@ -485,7 +550,7 @@ async def handle_inventory_add(
         item["is_two_handed"] = item_data["is_two_handed"]
     
     inv["bag"].append(item)
-    _normalize_inventories(room)
+    _normalize_inventories(room, [user_id])
     
     await manager.broadcast(room_id, {"type": "inventory.snapshot", "inventories": room.inventories})
     _db_save_inventories(room_id, room.inventories)
@@ -555,7 +620,7 @@ async def handle_inventory_equip(
         # Equip the new item
         inv["equipment"][slot] = item
     
-    _normalize_inventories(room)
+    _normalize_inventories(room, [user_id])
     await manager.broadcast(room_id, {"type": "inventory.snapshot", "inventories": room.inventories})
     _db_save_inventories(room_id, room.inventories)
 
@@ -590,7 +655,7 @@ async def handle_inventory_unequip(
         item = inv["equipment"].pop(slot)
         inv["bag"].append(item)
     
-    _normalize_inventories(room)
+    _normalize_inventories(room, [user_id])
     await manager.broadcast(room_id, {"type": "inventory.snapshot", "inventories": room.inventories})
     _db_save_inventories(room_id, room.inventories)
 
@@ -622,7 +687,7 @@ async def handle_inventory_drop(
     
     # Remove item from bag
     inv["bag"] = [item for item in inv["bag"] if item.get("id") != itemId]
-    _normalize_inventories(room)
+    _normalize_inventories(room, [user_id])
     
     await manager.broadcast(room_id, {"type": "inventory.snapshot", "inventories": room.inventories})
     _db_save_inventories(room_id, room.inventories)
@@ -632,22 +697,14 @@ async def handle_inventory_drop(
 # LOOT HANDLERS
 # ============================================================================
 
-async def handle_loot_generate(
-    room: Any,
-    websocket: Any,
-    data: Dict[str, Any],
-    manager: Any,
-    room_id: str,
-    user_id: str,
-    role: str,
-    name: str,
-) -> None:
-    """Handle loot.generate message type."""
-    if role != "dm":
-        await websocket.send_json({"type": "error", "message": "DM only."})
-        return
-    
-    # Generate loot into a new loot bag
+MAX_LOOT_BATCH = 50
+
+
+def _create_loot_bag(room: Any, data: Dict[str, Any], room_id: str, user_id: str) -> Optional[str]:
+    """Generate one loot bag from a loot.generate spec into room.loot_bags.
+
+    Returns an error message, or None on success. Does not broadcast or persist.
+    """
     cfg = data.get("config") or {}
     if not isinstance(cfg, dict):
         cfg = {}
@@ -655,12 +712,9 @@ async def handle_loot_generate(
     items = data.get("items") or []
     
     if not items:
-        items, err = generate_loot(cfg)
+        items, err = generate_loot(cfg, rng_service.stream("loot", room_id))
         if err:
-            await websocket.send_json({"type": "error", "message": err})
-            return
-    
-    _apply_category_props_to_items(items, cfg)
+            return err
 
     bag_type = (data.get("bag_type") or "").strip().lower()
     target_user_id = (data.get("target_user_id") or "").strip()
@@ -684,7 +738,7 @@ async def handle_loot_generate(
             bag_name = f"Loot Bag {len(room.loot_bags)+1}"
     
     if not items:
-        return
+        return None
 
     bag_id = str(uuid.uuid4())[:8]
     debug_props = None
@@ -707,6 +761,8 @@ async def handle_loot_generate(
         "_config": cfg,
         "debug_config": {"categoryProps": debug_props, "configKeys": list(cfg.keys())},
     }
+    _ensure_bag_props(room.loot_bags[bag_id], rng_service.stream("loot", room_id))
+    room.touch_loot()
 
     sample_item = items[0] if items else {}
     magic_count = sum(1 for it in items if (it.get("magicType") or it.get("magicBonus")))
@@ -743,9 +799,58 @@ async def handle_loot_generate(
     except Exception:
         pass
     _append_loot_debug(debug_line)
+    return None
+
+
+async def handle_loot_generate(
+    room: Any,
+    websocket: Any,
+    data: Dict[str, Any],
+    manager: Any,
+    room_id: str,
+    user_id: str,
+    role: str,
+    name: str,
+) -> None:
+    """Handle loot.generate message type.
+
+    With a "bags" list, each entry is a bag spec (config, categoryProps, items,
+    bag_type, target_user_id, bag_name) layered over the message's other
+    fields; all bags are generated, persisted and broadcast together.
+    """
+    if role != "dm":
+        await websocket.send_json({"type": "error", "message": "DM only."})
+        return
     
-    await _broadcast_loot_snapshot(room)
-    _db_save_loot_bags(room_id, room.loot_bags)
+    specs = data.get("bags")
+    if not isinstance(specs, list):
+        # Generate loot into a new loot bag
+        err = _create_loot_bag(room, data, room_id, user_id)
+        if err:
+            await websocket.send_json({"type": "error", "message": err})
+            return
+        await _broadcast_loot_snapshot(room)
+        _db_save_loot_bags(room_id, room.loot_bags)
+        return
+
+    shared = {k: v for k, v in data.items() if k not in ("type", "bags")}
+    before = len(room.loot_bags)
+    errors = []
+    for idx, spec in enumerate(specs[:MAX_LOOT_BATCH]):
+        if not isinstance(spec, dict):
+            errors.append(f"Bag {idx + 1}: invalid spec")
+            continue
+        err = _create_loot_bag(room, {**shared, **spec}, room_id, user_id)
+        if err:
+            errors.append(f"Bag {idx + 1}: {err}")
+    if len(specs) > MAX_LOOT_BATCH:
+        errors.append(f"Only the first {MAX_LOOT_BATCH} bags were generated.")
+
+    if len(room.loot_bags) != before:
+        await _broadcast_loot_snapshot(room)
+        _db_save_loot_bags(room_id, room.loot_bags)
+    if errors:
+        await websocket.send_json({"type": "error", "message": " ".join(errors)})
 
 
 async def handle_loot_distribute(
@@ -780,9 +885,7 @@ async def handle_loot_distribute(
     
     # Find and remove item from loot bag
     loot_bag = room.loot_bags[bag_id]
-    cfg = loot_bag.get("_config") or loot_bag.get("config") or {}
-    cfg = _merge_category_props(cfg)
-    _apply_category_props_to_items(loot_bag.get("items") or [], cfg)
+    _ensure_bag_props(loot_bag, rng_service.stream("loot", room_id))
     
     item_idx = None
     for idx, item in enumerate(loot_bag["items"]):
@@ -797,9 +900,10 @@ async def handle_loot_distribute(
     
     if not loot_bag["items"]:
         del room.loot_bags[bag_id]
+    room.touch_loot()
     
     await _broadcast_loot_snapshot(room)
-    _normalize_inventories(room)
+    _normalize_inventories(room, [target_user_id])
     await manager.broadcast(room_id, {"type": "inventory.snapshot", "inventories": room.inventories})
     _db_save_loot_bags(room_id, room.loot_bags)
     _db_save_inventories(room_id, room.inventories)
@@ -828,13 +932,12 @@ async def handle_loot_discard(
     
     # Remove item from loot bag
     loot_bag = room.loot_bags[bag_id]
-    cfg = loot_bag.get("_config") or loot_bag.get("config") or {}
-    cfg = _merge_category_props(cfg)
-    _apply_category_props_to_items(loot_bag.get("items") or [], cfg)
+    _ensure_bag_props(loot_bag, rng_service.stream("loot", room_id))
     loot_bag["items"] = [item for item in loot_bag["items"] if item.get("id") != item_id]
     
     if not loot_bag["items"]:
         del room.loot_bags[bag_id]
+    room.touch_loot()
     
     await _broadcast_loot_snapshot(room)
     _db_save_loot_bags(room_id, room.loot_bags)
@@ -879,9 +982,50 @@ async def handle_loot_set_visibility(
     
     visible = bool(data.get("visible", True))
     room.loot_bags[bag_id]["visible_to_players"] = visible
+    room.touch_loot()
     await _broadcast_loot_snapshot(room)
 
 
+async def handle_items_search(
+    room: Any,
+    websocket: Any,
+    data: Dict[str, Any],
+    manager: Any,
+    room_id: str,
+    user_id: str,
+    role: str,
+    name: str,
+) -> None:
+    """Handle items.search message type (item picker autocomplete)."""
+    tier = data.get("tier")
+    tier = _clamp_int(tier, 0, 99, 0) if tier not in (None, "") else None
+    result, err = search_items(
+        str(data.get("q") or ""),
+        tier=tier,
+        category=str(data.get("category") or ""),
+        limit=_clamp_int(data.get("limit"), 1, 200, 20),
+        offset=_clamp_int(data.get("offset"), 0, 1_000_000, 0),
+    )
+    if err:
+        await websocket.send_json({"type": "error", "message": err})
+        return
+    await websocket.send_json({"type": "items.search_response", **result})
+
+
+async def handle_party_stats(
+    room: Any,
+    websocket: Any,
+    data: Dict[str, Any],
+    manager: Any,
+    room_id: str,
+    user_id: str,
+    role: str,
+    name: str,
+) -> None:
+    """Handle party.stats message type (computed AC/attack lines for combat tooling)."""
+    await websocket.send_json({"type": "party.stats_response", **_party_stats(room)})
+
+
 # ============================================================================
 # CAMPAIGN SETUP HANDLERS
 # ============================================================================
@@ -1064,12 +1208,13 @@ async def handle_campaign_setup_list(
     
     from .campaign_setup import list_campaigns
     
-    campaigns = list_campaigns()
+    campaigns, page = _paginate(list_campaigns(), data)
     msg_id = data.get("_msgId")
     
     await websocket.send_json({
         "type": "campaign.setup.list_response",
         "campaigns": campaigns,
+        **page,
         "_msgId": msg_id
     })
 
@@ -1249,11 +1394,12 @@ async def handle_character_list(
     msg_id = data.get("_msgId")
     
     try:
-        characters = list_characters(user_id)
+        characters, page = _paginate(list_characters(user_id), data)
         
         await websocket.send_json({
             "type": "character.list_response",
             "characters": characters,
+            **page,
             "_msgId": msg_id
         })
     except Exception as e:
@@ -1510,7 +1656,7 @@ async def handle_ai_dm_combat_start(
         return
     
     # Create combat state
-    combat = create_combat_state(encounter_id, actors)
+    combat = create_combat_state(encounter_id, actors, rng_service.stream("initiative", room_id))
     room.ai_combat = combat
     
     # Log combat start
@@ -1786,9 +1932,11 @@ HANDLERS: Dict[str, Any] = {
     
     # Scene domain
     "scene.update": handle_scene_update,
+    "room.lock": handle_room_lock,
     
     # Dice domain
     "dice.roll": handle_dice_roll,
+    "rng.seed": handle_rng_seed,
     
     # Grid domain
     "grid.set": handle_grid_update,
@@ -1817,6 +1965,8 @@ HANDLERS: Dict[str, Any] = {
     "loot.discard": handle_loot_discard,
     "loot.snapshot": handle_loot_snapshot,
     "loot.set_visibility": handle_loot_set_visibility,
+    "items.search": handle_items_search,
+    "party.stats": handle_party_stats,
     
     # AI domain (temporarily disabled - backend startup)
     # "ai.narration": handle_ai_narration,
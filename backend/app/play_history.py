@@ -0,0 +1,185 @@
+"""
+Last-played timestamps for the file-based character and campaign saves.
+
+Loading a save only needs to bump ``last_played``; rewriting the whole JSON
+file for that doubled the I/O of every load. Timestamps live instead in one
+small sidecar file per save directory, kept in memory and flushed in batches:
+at most FLUSH_SECONDS after a change, by a timer if nothing else triggers it.
+A flush merges this process's changes into the file under a lock, so several
+workers sharing a save directory don't overwrite each other's stamps.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+FLUSH_SECONDS = float(os.getenv("ARCANE_LAST_PLAYED_FLUSH_SECONDS") or "5")
+
+# No .json suffix so directory listings of saves never pick it up.
+SIDECAR_NAME = ".last_played"
+
+
+class LastPlayedStore:
+    """Maps save ids to ISO timestamps, persisted to a single sidecar file."""
+
+    def __init__(self, path: str, flush_seconds: float = FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._entries: Optional[Dict[str, str]] = None
+        # Ids touched (stamp) or forgotten (None) since the last flush.
+        self._changes: Dict[str, Optional[str]] = {}
+        self._dirty = False
+        self._last_flush = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        return {str(k): str(v) for k, v in data.items() if v} if isinstance(data, dict) else {}
+
+    def _load(self) -> Dict[str, str]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def get(self, item_id: str, fallback: Optional[str] = None) -> Optional[str]:
+        """
+        Get the last-played time for an id.
+
+        Args:
+            item_id: Character or campaign ID
+            fallback: Timestamp stored in the save itself by older versions
+
+        Returns:
+            The most recent of the two, or None
+        """
+        with self._lock:
+            value = self._load().get(item_id)
+        if fallback and (not value or fallback > value):
+            return fallback
+        return value
+
+    def touch(self, item_id: str) -> str:
+        """Record that an id was just played; flushes if the batch window has passed."""
+        stamp = datetime.now().isoformat()
+        with self._lock:
+            self._load()[item_id] = stamp
+            self._changes[item_id] = stamp
+            self._dirty = True
+            due = self._schedule_flush()
+        if due:
+            self.flush()
+        return stamp
+
+    def forget(self, item_id: str) -> None:
+        with self._lock:
+            if self._load().pop(item_id, None) is not None:
+                self._changes[item_id] = None
+                self._dirty = True
+                self._schedule_flush()
+
+    def _schedule_flush(self) -> bool:
+        """True if a flush is due now; otherwise make sure a timer will do it. Caller holds the lock."""
+        wait = self.flush_seconds - (time.monotonic() - self._last_flush)
+        if wait <= 0:
+            return True
+        if self._timer is None:
+            # A crash or SIGKILL skips atexit, so pending stamps must not wait for the next touch.
+            self._timer = threading.Timer(wait, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return False
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    def flush(self) -> None:
+        """Merge pending changes into the sidecar under a file lock, then write it atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            changes, self._changes = self._changes, {}
+            self._dirty = False
+            self._last_flush = time.monotonic()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with _file_lock(f"{self.path}.lock"):
+                # Re-read so stamps other processes flushed since our load survive.
+                entries = self._read()
+                for item_id, stamp in changes.items():
+                    if stamp is None:
+                        entries.pop(item_id, None)
+                    elif stamp > entries.get(item_id, ""):
+                        entries[item_id] = stamp
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            self._entries = entries
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive advisory lock on ``path`` across processes."""
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+_stores: Dict[str, LastPlayedStore] = {}
+_stores_lock = threading.Lock()
+
+
+def store_for(directory: str) -> LastPlayedStore:
+    """Get the shared store for a save directory."""
+    path = os.path.abspath(os.path.join(directory, SIDECAR_NAME))
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = LastPlayedStore(path)
+            _stores[path] = store
+        return store
+
+
+def flush_all() -> None:
+    for store in list(_stores.values()):
+        try:
+            store.flush()
+        except OSError:
+            pass
+
+
+atexit.register(flush_all)
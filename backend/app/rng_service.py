@@ -0,0 +1,130 @@
+"""
+Per-room random number streams.
+
+Loot, dice, initiative and hazard rolls each draw from their own named stream
+so one system's rolls never shift another's sequence. Streams are unseeded by
+default; seeding a room (or setting ARCANE_RNG_SEED for every room) makes its
+streams replay the same sequence, which is what tests and benchmarks need.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+from typing import Dict
+
+STREAMS = ("loot", "dice", "initiative", "hazards")
+
+# Unseeded dice stay on the OS CSPRNG; everything else uses the much faster
+# Mersenne Twister, which is fine for rolls nobody can exploit.
+SECURE_STREAMS = {"dice"}
+
+DEFAULT_ROOM = "_global"
+
+# Bytes fetched from os.urandom per refill of a BufferedSystemRandom.
+BUFFER_BYTES = 4096
+
+
+class BufferedSystemRandom(random.SystemRandom):
+    """OS CSPRNG that reads os.urandom in BUFFER_BYTES blocks instead of once per call.
+
+    SystemRandom pays a getrandom() syscall for every randrange(); dice draw
+    from the buffer and only refill when it runs dry.
+    """
+
+    def __init__(self, buffer_bytes: int = BUFFER_BYTES):
+        self._size = buffer_bytes
+        self._buf = b""
+        self._pos = 0
+        self._buf_lock = threading.Lock()
+        super().__init__()
+
+    def randbytes(self, n: int) -> bytes:
+        if n > self._size // 2:
+            return os.urandom(n)
+        with self._buf_lock:
+            if n > len(self._buf) - self._pos:
+                self._buf = self._buf[self._pos:] + os.urandom(self._size)
+                self._pos = 0
+            out = self._buf[self._pos:self._pos + n]
+            self._pos += n
+            return out
+
+    def getrandbits(self, k: int) -> int:
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        numbytes = (k + 7) // 8
+        return int.from_bytes(self.randbytes(numbytes), "big") >> (numbytes * 8 - k)
+
+    def random(self) -> float:
+        return (int.from_bytes(self.randbytes(7), "big") >> 3) * 2.0 ** -53
+
+
+class RoomRng:
+    """Named random.Random streams for one room."""
+
+    def __init__(self, room_id: str, seed: str | None = None):
+        self.room_id = room_id
+        self.seed = seed
+        self._streams: Dict[str, random.Random] = {}
+        self._lock = threading.Lock()
+
+    def stream(self, name: str) -> random.Random:
+        with self._lock:
+            rng = self._streams.get(name)
+            if rng is None:
+                rng = self._new_stream(name)
+                self._streams[name] = rng
+            return rng
+
+    def reseed(self, seed: str | None) -> None:
+        """Restart every stream from ``seed`` (None goes back to unseeded)."""
+        with self._lock:
+            self.seed = seed
+            self._streams.clear()
+
+    def _new_stream(self, name: str) -> random.Random:
+        if self.seed is None:
+            return BufferedSystemRandom() if name in SECURE_STREAMS else random.Random()
+        # str seeds are hashed with sha512, so each (seed, room, stream) is independent.
+        return random.Random(f"{self.seed}:{self.room_id}:{name}")
+
+
+_rooms: Dict[str, RoomRng] = {}
+_rooms_lock = threading.Lock()
+
+
+def _default_seed() -> str | None:
+    return os.getenv("ARCANE_RNG_SEED") or None
+
+
+def for_room(room_id: str | None = None) -> RoomRng:
+    key = room_id or DEFAULT_ROOM
+    with _rooms_lock:
+        room_rng = _rooms.get(key)
+        if room_rng is None:
+            room_rng = RoomRng(key, _default_seed())
+            _rooms[key] = room_rng
+        return room_rng
+
+
+def stream(name: str, room_id: str | None = None) -> random.Random:
+    """The ``name`` stream for a room, or the process-wide one without a room."""
+    return for_room(room_id).stream(name)
+
+
+def seed_room(room_id: str | None, seed: str | int | None) -> None:
+    for_room(room_id).reseed(None if seed is None else str(seed))
+
+
+def drop_room(room_id: str) -> None:
+    """Forget an unseeded room's streams.
+
+    Seeded rooms (explicitly or through ARCANE_RNG_SEED) keep their streams so
+    a replay continues the same sequence after the room is evicted and reloaded.
+    """
+    with _rooms_lock:
+        room_rng = _rooms.get(room_id)
+        if room_rng is not None and room_rng.seed is None:
+            del _rooms[room_id]
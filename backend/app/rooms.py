@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 
 from fastapi import WebSocket
 
@@ -11,6 +15,25 @@ MAX_PLAYERS = 6
 MAX_DMS = 1
 MAX_SEATS_TOTAL = MAX_PLAYERS + MAX_DMS
 
+# Hibernation: rooms with no clients are flushed to SQLite and dropped from memory
+# after ROOM_IDLE_SECONDS, or earlier (least recently used first) once more than
+# MAX_LOADED_ROOMS are resident. ensure_room_loaded() in main.py rehydrates them.
+ROOM_IDLE_SECONDS = float(os.getenv("ARCANE_ROOM_IDLE_MINUTES") or "30") * 60
+MAX_LOADED_ROOMS = int(os.getenv("ARCANE_MAX_LOADED_ROOMS") or "200")
+
+# Live AI/campaign state the handlers hang off a room that db_upsert_room does not
+# persist; a room holding any of it is never hibernated, so it cannot be lost.
+UNPERSISTED_ATTRS = (
+    "pending_ai",
+    "ai_campaign",
+    "ai_combat",
+    "campaign_setup",
+    "campaign_id",
+    "chosen_scenario",
+    "current_map_seed",
+    "player_character",
+)
+
 
 @dataclass
 class ClientConn:
@@ -49,20 +72,45 @@ class Room:
     # ✅ Loot bags (for DM loot distribution)
     # Structure: { "bag_id": { "name": "...", "items": [...], "created_at": ..., "created_by": "dm_id" } }
     loot_bags: dict = field(default_factory=dict)
+    # Bumped by touch_loot() on every loot_bags change; keys the per-viewer views cached in main.py
+    loot_version: int = 0
+    _loot_views: dict = field(default_factory=dict)
 
     # Internal flag used by db loader in main.py (safe default)
     _db_loaded: bool = False
 
+    # Last time a client joined/left or the room was (re)loaded; drives hibernation
+    last_active: float = field(default_factory=lambda: time.time())
+
     def seats_used(self) -> int:
         return len(self.clients)
 
     def count_role(self, role: str) -> int:
         return sum(1 for c in self.clients.values() if c.role == role)
 
+    def has_unpersisted_state(self) -> bool:
+        if self.ai_mode != "auto":
+            return True
+        return any(getattr(self, attr, None) for attr in UNPERSISTED_ATTRS)
+
+    def touch_loot(self) -> None:
+        """Mark loot_bags as changed so cached loot views are rebuilt."""
+        self.loot_version += 1
+
 
 class RoomManager:
-    def __init__(self):
-        self.rooms: Dict[str, Room] = {}
+    def __init__(self, idle_seconds: float = ROOM_IDLE_SECONDS, max_rooms: int = MAX_LOADED_ROOMS):
+        # Ordered least -> most recently used so eviction can walk from the front.
+        self.rooms: "OrderedDict[str, Room]" = OrderedDict()
+        self.idle_seconds = idle_seconds
+        self.max_rooms = max_rooms
+
+        # Lobby change feed (SSE subscribers in main.py). lobby_version only bumps on
+        # changes to persisted summaries (created/locked), not on seat counts.
+        self.lobby_version = 0
+        self._lobby_subscribers: set[asyncio.Queue] = set()
+        self._lobby_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lobby_loop_thread: Optional[int] = None
 
     def create_room(self, name: str) -> Room:
         room_id = uuid.uuid4().hex[:8]
@@ -70,22 +118,106 @@ class RoomManager:
         self.rooms[room_id] = room
         return room
 
+    def load_room(self, room: Room) -> Room:
+        """Register a room rehydrated from the database."""
+        room.last_active = time.time()
+        self.rooms[room.room_id] = room
+        return room
+
     def get_room(self, room_id: str) -> Optional[Room]:
-        return self.rooms.get(room_id)
+        room = self.rooms.get(room_id)
+        if room is not None:
+            self.rooms.move_to_end(room_id)
+        return room
+
+    def evict_idle(
+        self,
+        flush: Callable[[Room], None],
+        now: Optional[float] = None,
+        keep: Optional[str] = None,
+    ) -> List[str]:
+        """Flush and drop rooms nobody is connected to.
+
+        A room is evicted when it has been empty for ``idle_seconds``, or when more
+        than ``max_rooms`` are loaded (least recently used empty rooms go first).
+        Rooms whose flush raises, or that hold state the flush cannot persist
+        (see UNPERSISTED_ATTRS), are kept so no state is lost.
+        """
+        now = time.time() if now is None else now
+        evicted: List[str] = []
+
+        def _evict(room_id: str, room: Room) -> None:
+            try:
+                flush(room)
+            except Exception:
+                return
+            self.rooms.pop(room_id, None)
+            evicted.append(room_id)
+
+        for room_id, room in list(self.rooms.items()):
+            if room_id == keep or room.clients or room.has_unpersisted_state():
+                continue
+            if now - room.last_active >= self.idle_seconds:
+                _evict(room_id, room)
+
+        if len(self.rooms) > self.max_rooms:
+            for room_id, room in list(self.rooms.items()):
+                if len(self.rooms) <= self.max_rooms:
+                    break
+                if room_id == keep or room.clients or room.has_unpersisted_state():
+                    continue
+                _evict(room_id, room)
+
+        return evicted
 
     def list_rooms(self) -> List[dict]:
-        out = []
-        for r in self.rooms.values():
-            out.append(
-                {
-                    "room_id": r.room_id,
-                    "name": r.name,
-                    "locked": r.locked,
-                    "seats_used": r.seats_used(),
-                    "max_seats": MAX_SEATS_TOTAL,
-                }
-            )
-        return out
+        return [self.room_summary(r) for r in self.rooms.values()]
+
+    def room_summary(self, room: Room) -> dict:
+        return {
+            "room_id": room.room_id,
+            "name": room.name,
+            "locked": room.locked,
+            "seats_used": room.seats_used(),
+            "max_seats": MAX_SEATS_TOTAL,
+        }
+
+    def live_occupancy(self, room_id: str) -> Optional[Room]:
+        """Peek at a loaded room without touching its LRU position."""
+        return self.rooms.get(room_id)
+
+    def subscribe_lobby(self, maxsize: int = 256) -> asyncio.Queue:
+        self._lobby_loop = asyncio.get_running_loop()
+        self._lobby_loop_thread = threading.get_ident()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._lobby_subscribers.add(queue)
+        return queue
+
+    def unsubscribe_lobby(self, queue: asyncio.Queue) -> None:
+        self._lobby_subscribers.discard(queue)
+
+    def notify_lobby(self, event: dict, invalidate: bool = False) -> None:
+        """Fan a lobby event out to subscribers; safe to call from sync endpoints' threads."""
+        if invalidate:
+            self.lobby_version += 1
+        event = {**event, "version": self.lobby_version}
+        subscribers = list(self._lobby_subscribers)
+        loop = self._lobby_loop
+        if not subscribers or loop is None or loop.is_closed():
+            return
+
+        def _deliver() -> None:
+            for queue in subscribers:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Slow consumer: drop the event rather than block the room.
+                    pass
+
+        if threading.get_ident() == self._lobby_loop_thread:
+            _deliver()
+        else:
+            loop.call_soon_threadsafe(_deliver)
 
     def can_join(self, room: Room, role: str) -> tuple[bool, str]:
         role = (role or "").lower().strip()
@@ -112,6 +244,8 @@ class RoomManager:
         if not room:
             return False
         room.clients[conn.user_id] = conn
+        room.last_active = time.time()
+        self._notify_seats(room)
         return True
 
     def remove_client(self, room_id: str, user_id: str) -> None:
@@ -119,6 +253,18 @@ class RoomManager:
         room = self.get_room(room_id)
         if room and user_id in room.clients:
             del room.clients[user_id]
+            room.last_active = time.time()
+            self._notify_seats(room)
+
+    def _notify_seats(self, room: Room) -> None:
+        self.notify_lobby(
+            {
+                "type": "room.seats",
+                "room_id": room.room_id,
+                "seats_used": room.seats_used(),
+                "max_seats": MAX_SEATS_TOTAL,
+            }
+        )
 
     def get_members(self, room_id: str) -> List[dict]:
         """Get list of members in a room as dicts."""
@@ -1,26 +1,25 @@
 from __future__ import annotations
 
-import os
+import json
 import re
-import xml.etree.ElementTree as ET
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Optional
 
-RULES_VERSION = "5e-2024"
-
-_CACHE: dict[str, Any] = {"mtime": None, "weapons": {}, "armor": {}}
+from . import item_catalog
 
+RULES_VERSION = "5e-2024"
 
-def _db_path() -> str:
-    here = os.path.dirname(__file__)
-    backend_dir = os.path.abspath(os.path.join(here, ".."))
-    project_root = os.path.abspath(os.path.join(backend_dir, ".."))
-    return os.path.join(project_root, "Item-database", "ItemsDB.xml")
+_CACHE: dict[str, Any] = {"version": None, "weapons": {}, "armor": {}}
 
+# Sheet fields the derived stats read; a sheet's key is these fields as canonical JSON.
+SHEET_RULE_KEYS = ("level", "prof_bonus", "stats", "mods", "proficiencies", "proficiencies_text")
 
-def _split_list(value: str) -> list[str]:
-    if not value:
-        return []
-    return [part.strip().lower() for part in value.split(",") if part.strip()]
+# sheet key -> ability mods, proficiency bonus and parsed proficiencies
+_PROFILES: dict[str, dict] = {}
+# (kind, base id, magic bonus, two-handed, sheet key) -> rule_* fields; cleared on catalog reload
+_DERIVED: dict[tuple, dict] = {}
+# (sheet key, equipment signature) -> party_stats entry; cleared on catalog reload
+_LOADOUTS: dict[tuple, dict] = {}
+MAX_DERIVED = 8192
 
 
 def _parse_bool(value: Any) -> bool:
@@ -35,69 +34,19 @@ def _parse_int(value: Any, default: int = 0) -> int:
 
 
 def _load_rules() -> None:
-    path = os.getenv("ARCANE_ITEM_DB_PATH") or _db_path()
-    if not os.path.exists(path):
-        _CACHE["weapons"] = {}
-        _CACHE["armor"] = {}
-        _CACHE["mtime"] = None
+    # No stat here: the item catalog watcher swaps in XML edits in the background.
+    catalog = item_catalog.get_catalog()
+    if _CACHE.get("version") == catalog.version:
         return
-
-    mtime = os.path.getmtime(path)
-    if _CACHE.get("mtime") == mtime:
-        return
-
-    tree = ET.parse(path)
-    root = tree.getroot()
-
-    weapons: dict[str, dict[str, Any]] = {}
-    armor: dict[str, dict[str, Any]] = {}
-
-    categories = root.find("categories")
-    if categories is not None:
-        for cat in categories.findall("category"):
-            cat_id = (cat.get("id") or "").strip().lower()
-            if cat_id == "weapons":
-                for base in cat.findall(".//baseItem"):
-                    iid = (base.get("id") or "").strip().lower()
-                    if not iid:
-                        continue
-                    weapons[iid] = {
-                        "id": iid,
-                        "name": base.get("name") or "",
-                        "weaponClass": (base.get("weaponClass") or "").strip().lower(),
-                        "rangeType": (base.get("rangeType") or "").strip().lower(),
-                        "damageDice": base.get("damageDice") or "",
-                        "damageType": (base.get("damageType") or "").strip().lower(),
-                        "properties": _split_list(base.get("properties") or ""),
-                        "range": base.get("range") or "",
-                        "versatile": base.get("versatile") or "",
-                        "mastery": (base.get("mastery") or "").strip().lower(),
-                    }
-            elif cat_id == "armor":
-                for base in cat.findall(".//baseItem"):
-                    iid = (base.get("id") or "").strip().lower()
-                    if not iid:
-                        continue
-                    armor[iid] = {
-                        "id": iid,
-                        "name": base.get("name") or "",
-                        "armorType": (base.get("armorType") or "").strip().lower(),
-                        "armorCategory": (base.get("armorCategory") or "").strip().lower(),
-                        "acBase": base.get("acBase"),
-                        "dexCap": base.get("dexCap"),
-                        "strengthRequirement": base.get("strengthRequirement"),
-                        "stealthDisadvantage": base.get("stealthDisadvantage"),
-                        "donTime": base.get("donTime") or "",
-                        "doffTime": base.get("doffTime") or "",
-                    }
-
-    _CACHE["weapons"] = weapons
-    _CACHE["armor"] = armor
-    _CACHE["mtime"] = mtime
+    _CACHE["weapons"] = catalog.weapons
+    _CACHE["armor"] = catalog.armor
+    _CACHE["version"] = catalog.version
+    _DERIVED.clear()
+    _LOADOUTS.clear()
 
 
 def _base_id(item_id: str) -> str:
-    return re.sub(r"_t\\d+$", "", (item_id or "").strip().lower())
+    return re.sub(r"_t\d+$", "", (item_id or "").strip().lower())
 
 
 def _ability_mod(score: Optional[int]) -> int:
@@ -150,10 +99,10 @@ def _parse_proficiencies(sheet: dict) -> set[str]:
     if isinstance(raw, list):
         entries.extend([str(x) for x in raw if str(x).strip()])
     if isinstance(raw, str):
-        entries.extend(re.split(r"[\\n,]", raw))
+        entries.extend(re.split(r"[\n,]", raw))
     text = sheet.get("proficiencies_text") or ""
     if isinstance(text, str):
-        entries.extend(re.split(r"[\\n,]", text))
+        entries.extend(re.split(r"[\n,]", text))
     cleaned = {_normalize_words(x) for x in entries if str(x).strip()}
     out: set[str] = set()
     for item in cleaned:
@@ -201,7 +150,31 @@ def _score_from_sheet(sheet: dict, key: str) -> Optional[int]:
     return None
 
 
-def _derive_weapon(item: dict, sheet: dict, info: dict) -> dict:
+def _sheet_key(sheet: dict) -> str:
+    return json.dumps({k: sheet[k] for k in SHEET_RULE_KEYS if k in sheet}, sort_keys=True, default=str)
+
+
+def _sheet_profile(key: str, sheet: dict) -> dict:
+    profile = _PROFILES.get(key)
+    if profile is not None:
+        return profile
+    level = _coerce_int(sheet.get("level"))
+    prof_bonus = _coerce_int(sheet.get("prof_bonus"))
+    if prof_bonus is None:
+        prof_bonus = _proficiency_bonus(level)
+    profile = {
+        "str_mod": _ability_mod(_score_from_sheet(sheet, "str")),
+        "dex_mod": _ability_mod(_score_from_sheet(sheet, "dex")),
+        "prof_bonus": prof_bonus,
+        "profs": _parse_proficiencies(sheet),
+    }
+    if len(_PROFILES) >= MAX_DERIVED:
+        _PROFILES.clear()
+    _PROFILES[key] = profile
+    return profile
+
+
+def _derive_weapon(item: dict, profile: dict, info: dict) -> dict:
     properties = list(info.get("properties") or [])
     range_type = info.get("rangeType") or ""
     damage_dice = info.get("damageDice") or ""
@@ -209,10 +182,8 @@ def _derive_weapon(item: dict, sheet: dict, info: dict) -> dict:
     versatile = info.get("versatile") or ""
     mastery = info.get("mastery") or ""
 
-    str_score = _score_from_sheet(sheet, "str")
-    dex_score = _score_from_sheet(sheet, "dex")
-    str_mod = _ability_mod(str_score)
-    dex_mod = _ability_mod(dex_score)
+    str_mod = profile["str_mod"]
+    dex_mod = profile["dex_mod"]
 
     if "finesse" in properties:
         ability = "dex" if dex_mod >= str_mod else "str"
@@ -223,12 +194,8 @@ def _derive_weapon(item: dict, sheet: dict, info: dict) -> dict:
 
     ability_mod = dex_mod if ability == "dex" else str_mod
 
-    level = _coerce_int(sheet.get("level"))
-    prof_bonus = _coerce_int(sheet.get("prof_bonus"))
-    if prof_bonus is None:
-        prof_bonus = _proficiency_bonus(level)
-
-    proficient = _is_weapon_proficient(info, _parse_proficiencies(sheet))
+    prof_bonus = profile["prof_bonus"]
+    proficient = _is_weapon_proficient(info, profile["profs"])
     magic_bonus = _coerce_int(item.get("magicBonus")) or 0
 
     if item.get("is_two_handed") and versatile:
@@ -252,9 +219,8 @@ def _derive_weapon(item: dict, sheet: dict, info: dict) -> dict:
     }
 
 
-def _derive_armor(item: dict, sheet: dict, info: dict) -> dict:
-    dex_score = _score_from_sheet(sheet, "dex")
-    dex_mod = _ability_mod(dex_score)
+def _derive_armor(item: dict, profile: dict, info: dict) -> dict:
+    dex_mod = profile["dex_mod"]
     ac_base = _coerce_int(info.get("acBase"))
     dex_cap = _parse_dex_cap(info.get("dexCap"))
     strength_req = _coerce_int(info.get("strengthRequirement"))
@@ -291,13 +257,8 @@ def _derive_armor(item: dict, sheet: dict, info: dict) -> dict:
     }
 
 
-def apply_inventory_rules(room_id: str, inventories: dict, characters: list[dict], clients: dict) -> None:
-    _load_rules()
-    if not inventories:
-        return
-    weapons = _CACHE.get("weapons") or {}
-    armor = _CACHE.get("armor") or {}
-
+def _character_finder(characters: list[dict], clients: dict) -> Callable[[str], Optional[dict]]:
+    """user_id -> character: the one they own, else one named like their seat."""
     char_by_owner: dict[str, dict] = {}
     for char in characters:
         owner = char.get("owner_user_id") or ""
@@ -311,16 +272,64 @@ def apply_inventory_rules(room_id: str, inventories: dict, characters: list[dict
         if key:
             name_index[key] = char
 
-    for user_id, inv in inventories.items():
-        sheet = {}
+    def find(user_id: str) -> Optional[dict]:
         char = char_by_owner.get(user_id)
         if not char:
             conn = clients.get(user_id)
             if conn:
-                key = _normalize_words(conn.name)
-                char = name_index.get(key)
-        if char:
-            sheet = char.get("sheet") or {}
+                char = name_index.get(_normalize_words(conn.name))
+        return char
+
+    return find
+
+
+def _derived(kind: str, base_id: str, item: dict, key: str, profile: dict, info: dict) -> dict:
+    if kind == "weapon":
+        cache_key = (kind, base_id, _coerce_int(item.get("magicBonus")) or 0, bool(item.get("is_two_handed")), key)
+    else:
+        # Armor stats read neither the magic bonus nor the hands.
+        cache_key = (kind, base_id, 0, False, key)
+    derived = _DERIVED.get(cache_key)
+    if derived is None:
+        if kind == "weapon":
+            derived = _derive_weapon(item, profile, info)
+        else:
+            derived = _derive_armor(item, profile, info)
+        if len(_DERIVED) >= MAX_DERIVED:
+            _DERIVED.clear()
+        _DERIVED[cache_key] = derived
+    return derived
+
+
+def apply_inventory_rules(
+    room_id: str,
+    inventories: dict,
+    characters: list[dict],
+    clients: dict,
+    user_ids: Iterable[str] | None = None,
+) -> None:
+    """Write rule_* fields onto weapon and armor items.
+
+    Only the inventories of ``user_ids`` are visited when given. Derived stats
+    are memoized per item and sheet, so unchanged items cost a dict lookup.
+    """
+    _load_rules()
+    if not inventories:
+        return
+    weapons = _CACHE.get("weapons") or {}
+    armor = _CACHE.get("armor") or {}
+    find_character = _character_finder(characters, clients)
+
+    if user_ids is None:
+        targets = list(inventories.items())
+    else:
+        targets = [(uid, inventories[uid]) for uid in user_ids if uid in inventories]
+
+    for user_id, inv in targets:
+        char = find_character(user_id)
+        sheet = (char.get("sheet") or {}) if char else {}
+        sheet_key = _sheet_key(sheet)
+        profile = _sheet_profile(sheet_key, sheet)
 
         for group_key in ("bag", "equipment"):
             items = inv.get(group_key) or {}
@@ -335,6 +344,117 @@ def apply_inventory_rules(room_id: str, inventories: dict, characters: list[dict
                 if not base_id:
                     continue
                 if base_id in weapons:
-                    item.update(_derive_weapon(item, sheet, weapons[base_id]))
+                    item.update(_derived("weapon", base_id, item, sheet_key, profile, weapons[base_id]))
                 if base_id in armor:
-                    item.update(_derive_armor(item, sheet, armor[base_id]))
+                    item.update(_derived("armor", base_id, item, sheet_key, profile, armor[base_id]))
+
+
+def _damage_line(dice: str, bonus: int) -> str:
+    if not dice:
+        return ""
+    if bonus:
+        return f"{dice}{bonus:+d}"
+    return dice
+
+
+def _loadout_stats(sheet: dict, sheet_key: str, equipment: dict) -> dict:
+    weapons = _CACHE.get("weapons") or {}
+    armor = _CACHE.get("armor") or {}
+    profile = _sheet_profile(sheet_key, sheet)
+
+    body: dict | None = None
+    body_id = ""
+    shield_bonus = 0
+    attacks: list[dict] = []
+    for slot in sorted(equipment):
+        item = equipment[slot]
+        if not isinstance(item, dict):
+            continue
+        base_id = _base_id(item.get("id") or "")
+        if base_id in weapons:
+            derived = _derived("weapon", base_id, item, sheet_key, profile, weapons[base_id])
+            attacks.append(
+                {
+                    "slot": slot,
+                    "item_id": item.get("id"),
+                    "name": item.get("name") or weapons[base_id].get("name") or base_id,
+                    "ability": derived["rule_attack_ability"],
+                    "proficient": derived["rule_proficient"],
+                    "attack_bonus": derived["rule_attack_bonus"],
+                    "damage": _damage_line(derived["rule_damage_dice"], derived["rule_damage_bonus"]),
+                    "damage_type": derived["rule_damage_type"],
+                    "properties": derived["rule_weapon_properties"],
+                }
+            )
+        if base_id in armor:
+            derived = _derived("armor", base_id, item, sheet_key, profile, armor[base_id])
+            if "rule_ac_bonus" in derived:
+                shield_bonus = max(shield_bonus, derived["rule_ac_bonus"] or 0)
+            elif body is None or derived["rule_ac"] > body["rule_ac"]:
+                body, body_id = derived, item.get("id") or base_id
+
+    if body is None:
+        ac, dex_cap = 10 + profile["dex_mod"], None
+    else:
+        ac, dex_cap = body["rule_ac"], body["rule_dex_cap"]
+    return {
+        "rule_source": RULES_VERSION,
+        "prof_bonus": profile["prof_bonus"],
+        "ac": ac + shield_bonus,
+        "ac_armor": body_id,
+        "ac_dex_cap": dex_cap,
+        "ac_shield_bonus": shield_bonus,
+        "attacks": attacks,
+    }
+
+
+def party_stats(inventories: dict, characters: list[dict], clients: dict) -> dict[str, dict]:
+    """AC, attack and damage lines for each player's equipped loadout, keyed by user_id.
+
+    Covers everyone with an inventory plus every connected non-DM seat. AC is
+    the best body armor piece (10 + dex unarmored) plus the best shield.
+    Entries are memoized by sheet key and equipment, so an unchanged player
+    costs a lookup.
+    """
+    _load_rules()
+    find_character = _character_finder(characters, clients)
+    user_ids = list(inventories)
+    for uid, conn in clients.items():
+        if uid not in inventories and getattr(conn, "role", "") != "dm":
+            user_ids.append(uid)
+
+    out: dict[str, dict] = {}
+    for user_id in user_ids:
+        char = find_character(user_id)
+        sheet = (char.get("sheet") or {}) if char else {}
+        sheet_key = _sheet_key(sheet)
+        equipment = (inventories.get(user_id) or {}).get("equipment") or {}
+        signature = tuple(
+            sorted(
+                (
+                    slot,
+                    it.get("id") or "",
+                    it.get("name") or "",
+                    _coerce_int(it.get("magicBonus")) or 0,
+                    bool(it.get("is_two_handed")),
+                )
+                for slot, it in equipment.items()
+                if isinstance(it, dict)
+            )
+        )
+        cache_key = (sheet_key, signature)
+        stats = _LOADOUTS.get(cache_key)
+        if stats is None:
+            stats = _loadout_stats(sheet, sheet_key, equipment)
+            if len(_LOADOUTS) >= MAX_DERIVED:
+                _LOADOUTS.clear()
+            _LOADOUTS[cache_key] = stats
+        conn = clients.get(user_id)
+        out[user_id] = {
+            "user_id": user_id,
+            "name": conn.name if conn else "",
+            "character_id": char.get("character_id") if char else None,
+            "character_name": (char.get("name") or sheet.get("name") or "") if char else "",
+            **stats,
+        }
+    return out
@@ -1,14 +1,38 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import logging
 import os
 import re
+import sqlite3
+import threading
 import time
+import urllib.error
+import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Iterable
 
+logger = logging.getLogger(__name__)
+
 OPEN5E_BASE_URL = (os.getenv("ARCANE_OPEN5E_URL") or "https://api.open5e.com").rstrip("/")
 OPEN5E_TIMEOUT = int(os.getenv("ARCANE_OPEN5E_TIMEOUT") or "8")
+OPEN5E_WORKERS = int(os.getenv("ARCANE_OPEN5E_WORKERS") or "4")
+
+# Progress of the current/last sync, reported by rules_status().
+SYNC_PROGRESS: dict[str, Any] = {"state": "idle"}
+_progress_lock = threading.Lock()
+_sync_lock = threading.Lock()
+
+# Encoded /api/rules/{kind} bodies keyed by (kind, full, limit); cleared whenever
+# rule rows change. _catalog_generation counts those changes, so a body built
+# from rows read before an invalidation is never stored after it.
+_catalog_cache: dict[tuple, dict] = {}
+_CATALOG_CACHE_MAX = 64
+_catalog_generation = 0
+_catalog_lock = threading.Lock()
 
 ABILITY_DATA = [
     ("str", "Strength", "STR", "Physical power and athleticism."),
@@ -81,22 +105,20 @@ def seed_core_rules(conn) -> None:
         )
         """
     )
-    for ability_id, name, abbr, desc in ABILITY_DATA:
-        cur.execute(
-            """
-            INSERT OR REPLACE INTO rules_abilities (
-              ability_id, name, abbr, description
-            ) VALUES (?, ?, ?, ?)
-            """,
-            (ability_id, name, abbr, desc),
-        )
-    for score in range(1, 31):
-        modifier = (score - 10) // 2
-        cur.execute(
-            "INSERT OR REPLACE INTO rules_ability_mods (score, modifier) VALUES (?, ?)",
-            (score, modifier),
-        )
+    cur.executemany(
+        """
+        INSERT OR REPLACE INTO rules_abilities (
+          ability_id, name, abbr, description
+        ) VALUES (?, ?, ?, ?)
+        """,
+        ABILITY_DATA,
+    )
+    cur.executemany(
+        "INSERT OR REPLACE INTO rules_ability_mods (score, modifier) VALUES (?, ?)",
+        [(score, (score - 10) // 2) for score in range(1, 31)],
+    )
     conn.commit()
+    invalidate_catalog()
 
 
 def _slugify(value: str) -> str:
@@ -105,39 +127,178 @@ def _slugify(value: str) -> str:
     return text.strip("-")
 
 
-def _fetch_json(url: str) -> dict | None:
+def _set_progress(**fields: Any) -> None:
+    with _progress_lock:
+        SYNC_PROGRESS.update(fields)
+
+
+def _bump_progress(kind: str, **deltas: int) -> None:
+    with _progress_lock:
+        entry = SYNC_PROGRESS.setdefault("kinds", {}).setdefault(kind, {})
+        for key, delta in deltas.items():
+            entry[key] = entry.get(key, 0) + delta
+
+
+def sync_progress() -> dict:
+    with _progress_lock:
+        out = dict(SYNC_PROGRESS)
+        out["kinds"] = {k: dict(v) for k, v in (SYNC_PROGRESS.get("kinds") or {}).items()}
+        return out
+
+
+def _fetch_page(url: str, validators: dict | None = None) -> tuple[int, dict | None, dict]:
+    """Conditional GET; returns (status, payload, {"etag", "last_modified"})."""
+    headers = {"Accept": "application/json"}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
     try:
-        with urllib.request.urlopen(url, timeout=OPEN5E_TIMEOUT) as resp:
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=OPEN5E_TIMEOUT) as resp:
             payload = json.loads(resp.read().decode("utf-8"))
-        return payload if isinstance(payload, dict) else None
+            fresh = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+        return resp.status, payload if isinstance(payload, dict) else None, fresh
+    except urllib.error.HTTPError as exc:
+        return exc.code, None, {}
     except Exception:
-        return None
+        return 0, None, {}
 
 
-def _fetch_open5e(endpoint: str) -> list[dict]:
-    url = f"{OPEN5E_BASE_URL}/{endpoint.strip('/')}/"
+def _page_urls(next_url: str | None, count: int, page_size: int) -> list[str] | None:
+    """Every remaining page URL derived from the first page's `next` link, or None if unknown."""
+    if not next_url:
+        return []
+    if not count or not page_size:
+        return None
+    parts = urllib.parse.urlsplit(next_url)
+    params = urllib.parse.parse_qs(parts.query)
+    pages = -(-count // page_size)
+    urls = []
+    for n in range(2, pages + 1):
+        if "page" in params:
+            params["page"] = [str(n)]
+        elif "offset" in params:
+            params["offset"] = [str((n - 1) * page_size)]
+        else:
+            return None
+        urls.append(urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(params, doseq=True))))
+    return urls
+
+
+def _load_http_cache(conn) -> dict[str, dict]:
+    rows = conn.cursor().execute(
+        "SELECT url, etag, last_modified, count, page_size, next_url FROM rules_http_cache"
+    ).fetchall()
+    return {
+        row[0]: {
+            "etag": row[1],
+            "last_modified": row[2],
+            "count": row[3],
+            "page_size": row[4],
+            "next_url": row[5],
+        }
+        for row in rows
+    }
+
+
+def _fetch_open5e(conn, endpoint: str, kind: str, conditional: bool = True) -> tuple[list[dict], bool]:
+    """Fetch changed Open5e pages; returns (results from changed pages, reachable).
+
+    Pages answered with 304 Not Modified contribute nothing, since their rows are
+    already stored. Remaining pages are fetched concurrently once the first page
+    tells us how many there are.
+    """
+    http_cache = _load_http_cache(conn) if conditional else {}
+    fresh_meta: list[tuple] = []
     out: list[dict] = []
-    while url:
-        payload = _fetch_json(url)
-        if not payload:
-            break
+    now = time.time()
+
+    def handle(url: str, status: int, payload: dict | None, validators: dict) -> dict | None:
+        cached = http_cache.get(url) or {}
+        if status == 304 and cached:
+            _bump_progress(kind, pages_done=1, pages_unchanged=1)
+            return cached
+        if status != 200 or not payload:
+            _bump_progress(kind, pages_done=1, pages_failed=1)
+            return None
         results = payload.get("results")
-        if isinstance(results, list):
-            out.extend([item for item in results if isinstance(item, dict)])
-        url = payload.get("next")
-    return out
+        results = [item for item in results if isinstance(item, dict)] if isinstance(results, list) else []
+        out.extend(results)
+        meta = {
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+            "count": payload.get("count"),
+            "page_size": len(results),
+            "next_url": payload.get("next"),
+        }
+        fresh_meta.append((url, meta["etag"], meta["last_modified"], meta["count"], meta["page_size"], meta["next_url"], now))
+        _bump_progress(kind, pages_done=1)
+        return meta
+
+    first_url = f"{OPEN5E_BASE_URL}/{endpoint.strip('/')}/"
+    _bump_progress(kind, pages_total=1)
+    first = handle(first_url, *_fetch_page(first_url, http_cache.get(first_url)))
+    if first is None:
+        return out, False
+
+    urls = _page_urls(first.get("next_url"), int(first.get("count") or 0), int(first.get("page_size") or 0))
+    if urls is None:
+        url = first.get("next_url")
+        while url:
+            _bump_progress(kind, pages_total=1)
+            meta = handle(url, *_fetch_page(url, http_cache.get(url)))
+            url = (meta or {}).get("next_url")
+    elif urls:
+        _bump_progress(kind, pages_total=len(urls))
+        with ThreadPoolExecutor(max_workers=max(1, OPEN5E_WORKERS), thread_name_prefix="open5e") as pool:
+            fetched = list(pool.map(lambda u: _fetch_page(u, http_cache.get(u)), urls))
+        for url, result in zip(urls, fetched):
+            handle(url, *result)
+
+    if fresh_meta:
+        conn.cursor().executemany(
+            """
+            INSERT OR REPLACE INTO rules_http_cache (
+              url, etag, last_modified, count, page_size, next_url, fetched_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            fresh_meta,
+        )
+        conn.commit()
+    return out, True
 
 
-def _insert_many(conn, rows: Iterable[tuple], sql: str) -> None:
-    cur = conn.cursor()
-    cur.executemany(sql, list(rows))
-    conn.commit()
+def _content_hash(data_json: str) -> str:
+    return hashlib.sha1(data_json.encode("utf-8")).hexdigest()
 
 
-def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
-    kinds = [k.strip().lower() for k in (kinds or ["races", "feats", "skills", "weapons"]) if k]
-    counts: dict[str, int] = {}
+def _upsert_changed(conn, table: str, cols: list[str], rows: list[tuple], kind: str) -> int:
+    """INSERT OR REPLACE only rows whose data_json hash differs from the stored one.
 
+    rows hold values for cols (slug first, data_json last); returns rows written.
+    """
+    cur = conn.cursor()
+    stored = dict(cur.execute(f"SELECT slug, content_hash FROM {table}").fetchall())
+    now = time.time()
+    changed = []
+    for row in rows:
+        digest = _content_hash(row[-1])
+        if stored.get(row[0]) == digest:
+            continue
+        changed.append((*row, digest, now))
+    if changed:
+        col_list = ", ".join([*cols, "content_hash", "synced_at"])
+        marks = ", ".join("?" for _ in range(len(cols) + 2))
+        cur.executemany(f"INSERT OR REPLACE INTO {table} ({col_list}) VALUES ({marks})", changed)
+        conn.commit()
+        invalidate_catalog()
+    _bump_progress(kind, rows_seen=len(rows), rows_changed=len(changed))
+    return len(changed)
+
+
+def ensure_rules_tables(conn) -> None:
     cur = conn.cursor()
     cur.execute(
         """
@@ -146,7 +307,8 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
           name TEXT,
           source TEXT,
           data_json TEXT,
-          synced_at REAL
+          synced_at REAL,
+          content_hash TEXT
         )
         """
     )
@@ -158,7 +320,8 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
           prerequisites TEXT,
           source TEXT,
           data_json TEXT,
-          synced_at REAL
+          synced_at REAL,
+          content_hash TEXT
         )
         """
     )
@@ -170,7 +333,8 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
           ability TEXT,
           source TEXT,
           data_json TEXT,
-          synced_at REAL
+          synced_at REAL,
+          content_hash TEXT
         )
         """
     )
@@ -186,16 +350,57 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
           range_text TEXT,
           source TEXT,
           data_json TEXT,
-          synced_at REAL
+          synced_at REAL,
+          content_hash TEXT
         )
         """
     )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rules_http_cache (
+          url TEXT PRIMARY KEY,
+          etag TEXT,
+          last_modified TEXT,
+          count INTEGER,
+          page_size INTEGER,
+          next_url TEXT,
+          fetched_at REAL
+        )
+        """
+    )
+    for table, _cols in RULES_TABLES.values():
+        existing = {row[1] for row in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+        if "content_hash" not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN content_hash TEXT")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_name ON {table}(name)")
     conn.commit()
 
-    now = time.time()
+
+def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
+    kinds = [k.strip().lower() for k in (kinds or ["races", "feats", "skills", "weapons"]) if k]
+    with _sync_lock:
+        _set_progress(state="running", kinds={}, started_at=time.time(), finished_at=None, error=None)
+        try:
+            counts = _sync_open5e(conn, kinds)
+        except Exception as exc:
+            _set_progress(state="error", error=str(exc), finished_at=time.time())
+            raise
+        _set_progress(state="done", finished_at=time.time(), counts=counts)
+        return counts
+
+
+def _sync_open5e(conn, kinds: list[str]) -> dict:
+    counts: dict[str, int] = {}
+    ensure_rules_tables(conn)
+    stored = rules_counts(conn)
+
+    def fetch(endpoint: str, kind: str) -> tuple[list[dict], bool]:
+        _set_progress(current=kind)
+        # An empty table means the validators are stale; refetch everything.
+        return _fetch_open5e(conn, endpoint, kind, conditional=stored.get(kind, 0) > 0)
 
     if "races" in kinds:
-        races = _fetch_open5e("races")
+        races = fetch("races", "races")[0]
         rows = []
         for race in races:
             name = race.get("name") or ""
@@ -203,20 +408,12 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
             if not slug:
                 continue
             source = race.get("document__slug") or race.get("document__title") or ""
-            rows.append((slug, name, source, json.dumps(race, default=str), now))
-        _insert_many(
-            conn,
-            rows,
-            """
-            INSERT OR REPLACE INTO rules_races (
-              slug, name, source, data_json, synced_at
-            ) VALUES (?, ?, ?, ?, ?)
-            """,
-        )
+            rows.append((slug, name, source, json.dumps(race, default=str, sort_keys=True)))
+        _upsert_changed(conn, "rules_races", ["slug", "name", "source", "data_json"], rows, "races")
         counts["races"] = len(rows)
 
     if "feats" in kinds:
-        feats = _fetch_open5e("feats")
+        feats = fetch("feats", "feats")[0]
         rows = []
         for feat in feats:
             name = feat.get("name") or ""
@@ -225,20 +422,14 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
                 continue
             prereq = feat.get("prerequisite") or ""
             source = feat.get("document__slug") or feat.get("document__title") or ""
-            rows.append((slug, name, prereq, source, json.dumps(feat, default=str), now))
-        _insert_many(
-            conn,
-            rows,
-            """
-            INSERT OR REPLACE INTO rules_feats (
-              slug, name, prerequisites, source, data_json, synced_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """,
+            rows.append((slug, name, prereq, source, json.dumps(feat, default=str, sort_keys=True)))
+        _upsert_changed(
+            conn, "rules_feats", ["slug", "name", "prerequisites", "source", "data_json"], rows, "feats"
         )
         counts["feats"] = len(rows)
 
     if "skills" in kinds:
-        skills = _fetch_open5e("skills")
+        skills, reachable = fetch("skills", "skills")
         rows = []
         if skills:
             for skill in skills:
@@ -248,24 +439,18 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
                     continue
                 ability = skill.get("ability") or ""
                 source = skill.get("document__slug") or skill.get("document__title") or ""
-                rows.append((slug, name, ability, source, json.dumps(skill, default=str), now))
-        else:
+                rows.append((slug, name, ability, source, json.dumps(skill, default=str, sort_keys=True)))
+        elif not reachable or not stored.get("skills"):
             for slug, name, ability, description in SKILL_DATA:
                 payload = {"name": name, "slug": slug, "ability": ability, "description": description}
-                rows.append((slug, name, ability, "core", json.dumps(payload, default=str), now))
-        _insert_many(
-            conn,
-            rows,
-            """
-            INSERT OR REPLACE INTO rules_skills (
-              slug, name, ability, source, data_json, synced_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """,
+                rows.append((slug, name, ability, "core", json.dumps(payload, default=str, sort_keys=True)))
+        _upsert_changed(
+            conn, "rules_skills", ["slug", "name", "ability", "source", "data_json"], rows, "skills"
         )
         counts["skills"] = len(rows)
 
     if "weapons" in kinds or "attacks" in kinds:
-        weapons = _fetch_open5e("weapons")
+        weapons = fetch("weapons", "attacks")[0]
         rows = []
         for weapon in weapons:
             name = weapon.get("name") or ""
@@ -292,20 +477,10 @@ def sync_open5e(conn, kinds: list[str] | None = None) -> dict:
                     properties_text,
                     range_text,
                     source,
-                    json.dumps(weapon, default=str),
-                    now,
+                    json.dumps(weapon, default=str, sort_keys=True),
                 )
             )
-        _insert_many(
-            conn,
-            rows,
-            """
-            INSERT OR REPLACE INTO rules_attacks (
-              slug, name, attack_type, damage_dice, damage_type, properties,
-              range_text, source, data_json, synced_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-        )
+        _upsert_changed(conn, "rules_attacks", list(RULES_TABLES["attacks"][1]), rows, "attacks")
         counts["attacks"] = len(rows)
 
     return counts
@@ -333,7 +508,7 @@ def rules_status(conn) -> dict[str, dict]:
             last_sync[kind] = float(row[0]) if row and row[0] is not None else None
         except Exception:
             last_sync[kind] = None
-    return {"counts": counts, "last_sync": last_sync}
+    return {"counts": counts, "last_sync": last_sync, "sync": sync_progress()}
 
 
 def list_rules(conn, kind: str, full: bool = False, limit: int | None = None) -> list[dict]:
@@ -374,3 +549,46 @@ def list_rules(conn, kind: str, full: bool = False, limit: int | None = None) ->
             entry["data"] = json.loads(row["data_json"] or "{}")
         out.append(entry)
     return out
+
+
+def invalidate_catalog() -> None:
+    global _catalog_generation
+    with _catalog_lock:
+        _catalog_generation += 1
+        _catalog_cache.clear()
+
+
+def _catalog_entry(entries: list) -> dict:
+    body = json.dumps(entries, separators=(",", ":")).encode("utf-8")
+    return {
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=6),
+        "etag": f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+    }
+
+
+def catalog_response(conn, kind: str, full: bool = False, limit: int | None = None) -> dict:
+    """Encoded list_rules() body with its ETag and gzip form, built once per data change."""
+    key = ((kind or "").strip().lower(), bool(full), limit if isinstance(limit, int) and limit > 0 else None)
+    with _catalog_lock:
+        cached = _catalog_cache.get(key)
+        generation = _catalog_generation
+    if cached is not None:
+        return cached
+    try:
+        entries = list_rules(conn, key[0], full=key[1], limit=key[2])
+    except sqlite3.Error as e:
+        # Migration 3 creates the rules_* tables, so this is a transient error
+        # such as "database is locked" during a sync: serve empty, don't cache.
+        logger.warning("rules catalog %r unavailable: %s", key[0], e)
+        return _catalog_entry([])
+    except Exception:
+        logger.exception("rules catalog %r failed", key[0])
+        raise
+    entry = _catalog_entry(entries)
+    with _catalog_lock:
+        if generation == _catalog_generation:
+            if len(_catalog_cache) >= _CATALOG_CACHE_MAX:
+                _catalog_cache.clear()
+            _catalog_cache[key] = entry
+    return entry
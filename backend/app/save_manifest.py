@@ -0,0 +1,93 @@
+"""
+Summary manifests for the file-based save directories.
+
+Listing saves used to open and parse every JSON file just to read a few
+fields. Each directory now keeps a small ``.manifest`` of per-file summaries
+keyed by mtime and size, so a listing only re-reads files that changed.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List
+
+
+# No .json suffix so it is never mistaken for a save.
+MANIFEST_NAME = ".manifest"
+
+# abs directory -> {filename: {"mtime_ns", "size", "summary"}}
+_manifests: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def _read_manifest(directory: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_manifest(directory: str, entries: Dict[str, Dict[str, Any]]) -> None:
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # The in-memory manifest still works; only the next process pays for a rescan.
+        print(f"Error writing manifest {path}: {e}")
+
+
+def list_summaries(
+    directory: str,
+    summarize: Callable[[Dict[str, Any], str], Dict[str, Any]],
+    label: str = "save",
+) -> List[Dict[str, Any]]:
+    """
+    Summaries of every ``*.json`` save in a directory.
+
+    Args:
+        directory: Directory holding one JSON file per save
+        summarize: Builds the summary dict from (parsed file, filename)
+        label: Noun used in read-error messages
+
+    Returns:
+        List of summary dicts (unsorted copies)
+    """
+    if not os.path.isdir(directory):
+        return []
+    key = os.path.abspath(directory)
+    with _lock:
+        cached = _manifests.get(key)
+        if cached is None:
+            cached = _read_manifest(key)
+        fresh: Dict[str, Dict[str, Any]] = {}
+        changed = False
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json') or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                previous = cached.get(entry.name)
+                if previous and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("size") == stat.st_size:
+                    fresh[entry.name] = previous
+                    continue
+                try:
+                    with open(entry.path, 'r') as f:
+                        data = json.load(f)
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"Error reading {label} {entry.name}: {e}")
+                    continue
+                fresh[entry.name] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "summary": summarize(data, entry.name),
+                }
+                changed = True
+        if changed or fresh.keys() != cached.keys():
+            _write_manifest(key, fresh)
+        _manifests[key] = fresh
+        return [dict(entry["summary"]) for entry in fresh.values()]
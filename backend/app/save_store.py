@@ -0,0 +1,463 @@
+"""
+SQLite storage for saved characters and campaigns.
+
+Replaces the one-JSON-file-per-save directories with two tables holding the
+save as a JSON column, indexed by owner and last_played.
+
+Opt in with ARCANE_SAVE_BACKEND=sqlite; the default stays "file", the JSON
+directories with their id index, last_played sidecar and listing manifests
+(character_system, play_history, save_manifest). With sqlite, each save
+directory is imported once, the first time it is used, and recorded in
+save_imports by its realpath. Files written to that directory afterwards are
+not imported, so switch every worker sharing it at the same time.
+
+The tables are created by main.py's SCHEMA_MIGRATIONS (migration 4) and live
+in main's database: main registers its db() here with register_connection().
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+SAVE_BACKEND = (os.getenv("ARCANE_SAVE_BACKEND") or "file").strip().lower()
+
+_lock = threading.RLock()
+_imported: set = set()
+
+# Set by main.py to its db(): the shared, migrated connection.
+_connection: Optional[Callable[[], sqlite3.Connection]] = None
+
+
+def register_connection(connection: Callable[[], sqlite3.Connection]) -> None:
+    """Register main.py's db(), which applies pending SCHEMA_MIGRATIONS on first use."""
+    global _connection
+    _connection = connection
+
+
+def enabled() -> bool:
+    """True when saves live in SQLite rather than in JSON directories."""
+    return SAVE_BACKEND == "sqlite"
+
+
+def ensure_tables(conn: sqlite3.Connection) -> None:
+    """Schema migration 4: saved characters/campaigns and the import ledger."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS saved_characters (
+          character_id TEXT PRIMARY KEY,
+          player_id TEXT NOT NULL,
+          data_json TEXT NOT NULL,
+          created_at TEXT,
+          last_played TEXT,
+          updated_at REAL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_saved_characters_player
+        ON saved_characters(player_id, last_played DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS saved_campaigns (
+          campaign_id TEXT PRIMARY KEY,
+          owner_user_id TEXT,
+          data_json TEXT NOT NULL,
+          created_at TEXT,
+          last_played TEXT,
+          updated_at REAL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_saved_campaigns_owner
+        ON saved_campaigns(owner_user_id, last_played DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_saved_campaigns_last_played
+        ON saved_campaigns(last_played DESC, created_at DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS save_imports (
+          source TEXT PRIMARY KEY,
+          imported INTEGER,
+          imported_at REAL
+        )
+        """
+    )
+    conn.commit()
+
+
+def _db() -> sqlite3.Connection:
+    if _connection is None:
+        raise RuntimeError("save_store used before main.py registered its database")
+    return _connection()
+
+
+def _now_iso() -> str:
+    return datetime.now().isoformat()
+
+
+# ============================================================================
+# CHARACTERS
+# ============================================================================
+
+def put_character(character_data: Dict[str, Any]) -> str:
+    """Insert or replace a character; returns its ID."""
+    character_id = character_data["character_id"]
+    with _lock:
+        conn = _db()
+        conn.execute(
+            """
+            INSERT INTO saved_characters (
+              character_id, player_id, data_json, created_at, last_played, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(character_id) DO UPDATE SET
+              player_id=excluded.player_id,
+              data_json=excluded.data_json,
+              created_at=excluded.created_at,
+              last_played=COALESCE(excluded.last_played, saved_characters.last_played),
+              updated_at=excluded.updated_at
+            """,
+            (
+                character_id,
+                character_data.get("player_id") or "",
+                json.dumps(character_data, default=str),
+                character_data.get("created_at"),
+                character_data.get("last_played"),
+                time.time(),
+            ),
+        )
+        conn.commit()
+    return character_id
+
+
+def get_character(character_id: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+    """Load a character, bumping last_played unless touch is False."""
+    with _lock:
+        conn = _db()
+        row = conn.execute(
+            "SELECT data_json, last_played FROM saved_characters WHERE character_id=?",
+            (character_id,),
+        ).fetchone()
+        if not row:
+            return None
+        character_data = json.loads(row["data_json"])
+        character_data["last_played"] = row["last_played"]
+        if touch:
+            character_data["last_played"] = _now_iso()
+            conn.execute(
+                "UPDATE saved_characters SET last_played=? WHERE character_id=?",
+                (character_data["last_played"], character_id),
+            )
+            conn.commit()
+    return character_data
+
+
+def update_character(character_id: str, updates: Dict[str, Any]) -> bool:
+    """Apply updates to existing keys of a stored character in one transaction."""
+    with _lock:
+        character_data = get_character(character_id, touch=False)
+        if character_data is None:
+            return False
+        for key, value in updates.items():
+            if key in character_data:
+                character_data[key] = value
+        character_data["last_played"] = _now_iso()
+        put_character(character_data)
+    return True
+
+
+def delete_character(character_id: str) -> bool:
+    with _lock:
+        conn = _db()
+        cur = conn.execute("DELETE FROM saved_characters WHERE character_id=?", (character_id,))
+        conn.commit()
+    return cur.rowcount > 0
+
+
+def list_characters(player_id: str) -> List[Dict[str, Any]]:
+    """Character summaries for a player, most recently played first."""
+    with _lock:
+        rows = _db().execute(
+            """
+            SELECT character_id,
+                   json_extract(data_json, '$.character_name') AS character_name,
+                   json_extract(data_json, '$.player_name') AS player_name,
+                   json_extract(data_json, '$.race') AS race,
+                   json_extract(data_json, '$.class_name') AS class_name,
+                   COALESCE(json_extract(data_json, '$.level'), 1) AS level,
+                   json_extract(data_json, '$.background') AS background,
+                   created_at, last_played
+            FROM saved_characters
+            WHERE player_id=?
+            ORDER BY COALESCE(last_played, created_at, '') DESC, COALESCE(created_at, '') DESC
+            """,
+            (player_id,),
+        ).fetchall()
+    return [
+        {
+            "id": row["character_id"],
+            "character_name": row["character_name"],
+            "player_name": row["player_name"],
+            "race": row["race"],
+            "class": row["class_name"],
+            "level": row["level"],
+            "background": row["background"],
+            "created_at": row["created_at"],
+            "last_played": row["last_played"],
+        }
+        for row in rows
+    ]
+
+
+# ============================================================================
+# CAMPAIGNS
+# ============================================================================
+
+def put_campaign(campaign_data: Dict[str, Any]) -> str:
+    """Insert or replace a serialized campaign; returns its ID."""
+    campaign_id = campaign_data["campaign_id"]
+    with _lock:
+        conn = _db()
+        conn.execute(
+            """
+            INSERT INTO saved_campaigns (
+              campaign_id, owner_user_id, data_json, created_at, last_played, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(campaign_id) DO UPDATE SET
+              owner_user_id=excluded.owner_user_id,
+              data_json=excluded.data_json,
+              created_at=excluded.created_at,
+              last_played=COALESCE(excluded.last_played, saved_campaigns.last_played),
+              updated_at=excluded.updated_at
+            """,
+            (
+                campaign_id,
+                campaign_data.get("created_by_user_id"),
+                json.dumps(campaign_data, default=str),
+                campaign_data.get("created_at"),
+                campaign_data.get("last_played"),
+                time.time(),
+            ),
+        )
+        conn.commit()
+    return campaign_id
+
+
+def get_campaign(campaign_id: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+    """Load serialized campaign data (without last_played), bumping last_played unless touch is False."""
+    with _lock:
+        conn = _db()
+        row = conn.execute(
+            "SELECT data_json FROM saved_campaigns WHERE campaign_id=?", (campaign_id,)
+        ).fetchone()
+        if not row:
+            return None
+        if touch:
+            conn.execute(
+                "UPDATE saved_campaigns SET last_played=? WHERE campaign_id=?", (_now_iso(), campaign_id)
+            )
+            conn.commit()
+    campaign_data = json.loads(row["data_json"])
+    campaign_data.pop("last_played", None)
+    return campaign_data
+
+
+def delete_campaign(campaign_id: str) -> bool:
+    with _lock:
+        conn = _db()
+        cur = conn.execute("DELETE FROM saved_campaigns WHERE campaign_id=?", (campaign_id,))
+        conn.commit()
+    return cur.rowcount > 0
+
+
+def list_campaigns(owner_user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Campaign summaries, most recently played first."""
+    where = "WHERE owner_user_id=?" if owner_user_id else ""
+    params = (owner_user_id,) if owner_user_id else ()
+    with _lock:
+        rows = _db().execute(
+            f"""
+            SELECT campaign_id,
+                   json_extract(data_json, '$.campaign_name') AS name,
+                   json_extract(data_json, '$.story_type') AS story_type,
+                   json_extract(data_json, '$.campaign_length') AS campaign_length,
+                   json_extract(data_json, '$.core_conflict') AS core_conflict,
+                   json_extract(data_json, '$.estimated_sessions') AS estimated_sessions,
+                   created_at, last_played
+            FROM saved_campaigns
+            {where}
+            ORDER BY COALESCE(last_played, created_at, '') DESC, COALESCE(created_at, '') DESC
+            """,
+            params,
+        ).fetchall()
+    return [
+        {
+            "id": row["campaign_id"],
+            "name": row["name"],
+            "story_type": row["story_type"],
+            "campaign_length": row["campaign_length"],
+            "core_conflict": row["core_conflict"],
+            "estimated_sessions": row["estimated_sessions"],
+            "created_at": row["created_at"],
+            "last_played": row["last_played"],
+        }
+        for row in rows
+    ]
+
+
+# ============================================================================
+# ONE-TIME IMPORT FROM SAVE DIRECTORIES
+# ============================================================================
+
+def _read_json_files(directory: str) -> List[Dict[str, Any]]:
+    out = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.json') or not entry.is_file():
+                continue
+            try:
+                with open(entry.path, 'r') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Error importing save {entry.path}: {e}")
+                continue
+            if isinstance(data, dict):
+                data.setdefault("_id_from_filename", entry.name[:-len(".json")])
+                out.append(data)
+    return out
+
+
+def _import_once(source: str, rows: List[tuple], sql: str) -> int:
+    conn = _db()
+    cur = conn.cursor()
+    try:
+        cur.executemany(sql, rows)
+        cur.execute(
+            "INSERT OR REPLACE INTO save_imports (source, imported, imported_at) VALUES (?, ?, ?)",
+            (source, len(rows), time.time()),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(rows)
+
+
+def _already_imported(source: str) -> bool:
+    if source in _imported:
+        return True
+    row = _db().execute("SELECT 1 FROM save_imports WHERE source=?", (source,)).fetchone()
+    if row:
+        _imported.add(source)
+    return bool(row)
+
+
+def import_character_dir(characters_dir: str) -> int:
+    """
+    Import a saved_characters/ tree once (rows already in SQLite win).
+
+    Args:
+        characters_dir: Directory containing player_{id}/{character_id}.json
+
+    Returns:
+        Number of files imported by this call (0 if already imported)
+    """
+    from .play_history import store_for
+
+    # realpath: the same directory reached from another CWD or symlink is one source.
+    source = "characters:" + os.path.realpath(characters_dir)
+    with _lock:
+        if _already_imported(source):
+            return 0
+        rows = []
+        if os.path.isdir(characters_dir):
+            last_played = store_for(characters_dir)
+            with os.scandir(characters_dir) as players:
+                player_dirs = [p for p in players if p.name.startswith("player_") and p.is_dir()]
+            for player_entry in player_dirs:
+                for data in _read_json_files(player_entry.path):
+                    character_id = data.get("character_id") or data.pop("_id_from_filename")
+                    data.pop("_id_from_filename", None)
+                    data["character_id"] = character_id
+                    player_id = data.get("player_id") or player_entry.name[len("player_"):]
+                    played = last_played.get(character_id, fallback=data.get("last_played"))
+                    rows.append(
+                        (character_id, player_id, json.dumps(data, default=str), data.get("created_at"), played, time.time())
+                    )
+        count = _import_once(
+            source,
+            rows,
+            """
+            INSERT OR IGNORE INTO saved_characters (
+              character_id, player_id, data_json, created_at, last_played, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+        )
+        _imported.add(source)
+    if count:
+        print(f"[save_store] imported {count} characters from {characters_dir}")
+    return count
+
+
+def import_campaign_dir(campaigns_dir: str) -> int:
+    """
+    Import a saved_campaigns/ directory once (rows already in SQLite win).
+
+    Args:
+        campaigns_dir: Directory containing {campaign_id}.json files
+
+    Returns:
+        Number of files imported by this call (0 if already imported)
+    """
+    from .play_history import store_for
+
+    source = "campaigns:" + os.path.realpath(campaigns_dir)
+    with _lock:
+        if _already_imported(source):
+            return 0
+        rows = []
+        if os.path.isdir(campaigns_dir):
+            last_played = store_for(campaigns_dir)
+            for data in _read_json_files(campaigns_dir):
+                campaign_id = data.get("campaign_id") or data.pop("_id_from_filename")
+                data.pop("_id_from_filename", None)
+                data["campaign_id"] = campaign_id
+                played = last_played.get(campaign_id, fallback=data.pop("last_played", None))
+                rows.append(
+                    (
+                        campaign_id,
+                        data.get("created_by_user_id"),
+                        json.dumps(data, default=str),
+                        data.get("created_at"),
+                        played,
+                        time.time(),
+                    )
+                )
+        count = _import_once(
+            source,
+            rows,
+            """
+            INSERT OR IGNORE INTO saved_campaigns (
+              campaign_id, owner_user_id, data_json, created_at, last_played, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+        )
+        _imported.add(source)
+    if count:
+        print(f"[save_store] imported {count} campaigns from {campaigns_dir}")
+    return count
@@ -0,0 +1,96 @@
+"""
+Benchmark ItemsDB.xml compilation on a synthetic item database.
+
+Compares a full ElementTree DOM parse (what the loaders used to build before
+extracting anything) against the streaming catalog compiler, then a warm load
+from the compiled cache. Reports wall time and peak traced memory; the
+compiler's peak includes the catalog it returns. Run from the backend directory:
+
+    python bench_item_catalog.py --mb 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import item_catalog  # noqa: E402
+
+MATERIALS = ["wood", "metal", "leather", "cloth", "bone", "crystal"]
+DAMAGE = ["slashing", "piercing", "bludgeoning"]
+ARMOR_SLOTS = ["footwear", "leggings", "belt", "gloves", "bracers", "headwear"]
+
+
+def write_synthetic_xml(path: str, target_mb: float) -> int:
+    """Write a homebrew-pack-shaped ItemsDB.xml of roughly target_mb; returns base item count."""
+    target = int(target_mb * 1024 * 1024)
+    count = 0
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write('<?xml version="1.0" encoding="UTF-8"?>\n<itemDatabase version="1.1">\n  <categories>\n')
+        fh.write('    <category id="weapons" name="Weapons">\n')
+        while fh.tell() < target * 0.6:
+            fh.write(
+                f'      <baseItem id="weapon{count}" name="Homebrew Blade {count}" material="{MATERIALS[count % 6]}" '
+                f'weaponClass="martial" rangeType="melee" damageDice="1d{4 + 2 * (count % 5)}" '
+                f'damageType="{DAMAGE[count % 3]}" hands="{1 + count % 2}" properties="finesse,light" '
+                f'mastery="nick" tags="homebrew,pack{count % 50}"/>\n'
+            )
+            count += 1
+        fh.write('      <appliesQuality tierRefs="0,1,2,3"/>\n    </category>\n')
+        fh.write('    <category id="armor" name="Armor">\n')
+        for slot in ARMOR_SLOTS:
+            fh.write(f'      <slot id="{slot}" name="{slot.title()}">\n')
+            while fh.tell() < target * (0.6 + 0.4 * (ARMOR_SLOTS.index(slot) + 1) / len(ARMOR_SLOTS)):
+                fh.write(
+                    f'        <baseItem id="armor{count}" name="Homebrew {slot} {count}" material="{MATERIALS[count % 6]}" '
+                    f'armorType="light" armorCategory="light" acBase="{11 + count % 3}" dexCap="" '
+                    f'stealthDisadvantage="false" tags="homebrew"/>\n'
+                )
+                count += 1
+            fh.write('      </slot>\n')
+        fh.write('      <appliesQuality tierRefs="0,1,2,3"/>\n    </category>\n')
+        fh.write('  </categories>\n</itemDatabase>\n')
+    return count
+
+
+def measure(label: str, fn):
+    # Time and memory come from separate runs: tracemalloc slows allocation-heavy code severalfold.
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    del result
+    tracemalloc.start()
+    result = fn()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed:8.2f} s   peak {peak / 1e6:8.1f} MB   retained {retained / 1e6:8.1f} MB")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=float, default=50.0, help="size of the synthetic XML in MB")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="arcane-items-bench-")
+    xml_path = os.path.join(work, "ItemsDB.xml")
+    os.environ["ARCANE_CATALOG_CACHE_DIR"] = os.path.join(work, "cache")
+
+    bases = write_synthetic_xml(xml_path, args.mb)
+    print(f"synthetic ItemsDB.xml: {os.path.getsize(xml_path) / 1e6:.1f} MB, {bases} base items\n")
+
+    measure("ElementTree DOM (ET.parse)", lambda: ET.parse(xml_path).getroot())
+    catalog = measure("streaming compile_xml", lambda: item_catalog.compile_xml(xml_path))
+    print(f"  -> {len(catalog.items)} items, {len(catalog.weapons)} weapons, {len(catalog.armor)} armor")
+
+    item_catalog.load_catalog(xml_path)  # writes the compiled cache
+    measure("load_catalog (cache hit)", lambda: item_catalog.load_catalog(xml_path))
+
+
+if __name__ == "__main__":
+    main()
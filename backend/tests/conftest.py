@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+
+# Point the app at throwaway storage before anything imports app.main.
+_TMP = tempfile.mkdtemp(prefix="arcane-tests-")
+os.environ["ARCANE_DB_PATH"] = os.path.join(_TMP, "arcane.db")
+os.environ["ARCANE_CATALOG_CACHE_DIR"] = os.path.join(_TMP, "catalog-cache")
+os.environ["ARCANE_RULES_SYNC_KINDS"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _loot_debug_log(monkeypatch):
+    # Keep the loot debug log out of the package tree.
+    from app import main
+
+    monkeypatch.setattr(main, "LOOT_DEBUG_LOG_PATH", os.path.join(_TMP, "loot-debug.log"))
@@ -0,0 +1,54 @@
+from app import main
+
+REFS = {
+    "mm": {"index": "magic-missile", "name": "Magic Missile", "url": "/api/spells/magic-missile"},
+    "shield": {"index": "shield", "name": "Shield", "url": "/api/spells/shield"},
+    "fireball": {"index": "fireball", "name": "Fireball", "url": "/api/spells/fireball"},
+    "wizard": {"index": "wizard", "name": "Wizard", "url": "/api/classes/wizard"},
+}
+
+
+def _fake_lookups(monkeypatch):
+    calls = []
+
+    def lookup_many(lookups):
+        calls.extend(value for _kind, value in lookups)
+        return [REFS.get(main._slugify(str(value or ""))) for _kind, value in lookups]
+
+    monkeypatch.setattr(main, "_lookup_dnd_many", lookup_many)
+    return calls
+
+
+def test_unchanged_aliased_spells_reuse_stored_refs(monkeypatch):
+    calls = _fake_lookups(monkeypatch)
+    previous_sheet = {"class": "Wizard", "spells": ["MM", "Shield"]}
+    previous_enriched, _ = main._enrich_character_sheet(previous_sheet)
+    assert [r["index"] for r in previous_enriched["spells"]] == ["magic-missile", "shield"]
+
+    calls.clear()
+    sheet = {"class": "Wizard", "spells": ["MM", "Shield", "Fireball"]}
+    enriched, warnings = main._enrich_character_sheet(sheet, (previous_sheet, previous_enriched))
+    assert calls == ["Fireball"]
+    assert warnings == []
+    assert [r["index"] for r in enriched["spells"]] == ["magic-missile", "shield", "fireball"]
+    assert enriched["class"]["index"] == "wizard"
+
+
+def test_spells_without_a_stored_ref_are_resolved_again(monkeypatch):
+    calls = _fake_lookups(monkeypatch)
+    previous_sheet = {"spells": ["MM", "Bogus"]}
+    # Bogus was unknown, so typed values and refs no longer line up by position.
+    previous_enriched = {"spells": [REFS["mm"]]}
+
+    enriched, warnings = main._enrich_character_sheet(previous_sheet, (previous_sheet, previous_enriched))
+    assert sorted(calls) == ["Bogus", "MM"]
+    assert [r["index"] for r in enriched["spells"]] == ["magic-missile"]
+    assert warnings == ["Unknown spell: Bogus"]
+
+
+def test_unresolved_class_is_retried(monkeypatch):
+    calls = _fake_lookups(monkeypatch)
+    sheet = {"class": "Wizard"}
+    enriched, warnings = main._enrich_character_sheet(sheet, (sheet, {}))
+    assert calls == ["Wizard"]
+    assert enriched["class"]["index"] == "wizard" and warnings == []
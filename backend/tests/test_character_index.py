@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+from app import character_system, save_store
+from app.play_history import store_for
+
+
+@pytest.fixture
+def characters_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(save_store, "SAVE_BACKEND", "file")
+    monkeypatch.setattr(character_system, "CHARACTERS_DIR", str(tmp_path))
+    monkeypatch.setattr(character_system, "_character_index", None)
+    monkeypatch.setattr(character_system, "_character_index_stamp", None)
+    return tmp_path
+
+
+def _write(path, character_id):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"character_id": character_id, "character_name": "Tess"}, f)
+
+
+def test_index_miss_finds_files_written_by_another_process(characters_dir):
+    assert character_system.load_character("late") is None  # index built, empty
+
+    _write(characters_dir / "player_p2" / "late.json", "late")
+    loaded = character_system.load_character("late")
+    assert loaded["character_name"] == "Tess"
+    assert character_system._get_character_index()["late"].endswith("late.json")
+
+
+def test_unknown_ids_do_not_rescan_an_unchanged_directory(characters_dir, monkeypatch):
+    _write(characters_dir / "player_a" / "known.json", "known")
+    assert character_system.load_character("known")
+    store_for(str(characters_dir)).flush()  # the last_played sidecar lives in the same directory
+    character_system.load_character("bogus")
+
+    scans = []
+    build = character_system._build_character_index
+    monkeypatch.setattr(character_system, "_build_character_index", lambda: scans.append(1) or build())
+    for _ in range(5):
+        assert character_system.load_character("bogus") is None
+    assert scans == []
+
+    _write(characters_dir / "player_b" / "bogus.json", "bogus")
+    assert character_system.load_character("bogus")
+    assert scans == [1]
+
+
+def test_moved_file_is_found_again(characters_dir):
+    _write(characters_dir / "player_a" / "moved.json", "moved")
+    assert character_system.load_character("moved")
+    os.rename(characters_dir / "player_a", characters_dir / "player_b")
+    assert character_system.load_character("moved")
+    assert "player_b" in character_system._get_character_index()["moved"]
+
+
+def test_ids_cannot_escape_the_directory(characters_dir):
+    _write(characters_dir.parent / "outside.json", "outside")
+    assert character_system.load_character("../outside") is None
@@ -0,0 +1,54 @@
+import asyncio
+import random
+
+import pytest
+
+from app import dice, message_handlers, rng_service
+
+
+@pytest.mark.parametrize("sides", [6, 20, 100])
+def test_bulk_rolls_are_uniform(sides):
+    rolls = dice._roll_dice(60000, sides, random.Random(sides))
+    expected = len(rolls) / sides
+    chi2 = sum((rolls.count(face) - expected) ** 2 / expected for face in range(1, sides + 1))
+    # Well above the chi-squared 99.9th percentile for sides - 1 degrees of freedom.
+    assert chi2 < 2 * sides + 40
+    assert min(rolls) == 1 and max(rolls) == sides
+
+
+def test_seeded_rolls_replay():
+    first = dice.roll_dice("500d8+3", rng=random.Random("replay"))
+    again = dice.roll_dice("500d8+3", rng=random.Random("replay"))
+    assert first == again
+    assert first["total"] == sum(first["rolls"]) + 3
+
+
+def test_buffered_system_random_stays_in_range():
+    rolls = dice._roll_dice(5000, 12, rng_service.BufferedSystemRandom(64))
+    assert len(rolls) == 5000 and set(rolls) <= set(range(1, 13))
+
+
+class _Manager:
+    def __init__(self):
+        self.sent = []
+
+    async def broadcast(self, room_id, message):
+        self.sent.append(message)
+
+
+def _roll(expr):
+    manager = _Manager()
+    asyncio.run(message_handlers.handle_dice_roll(None, None, {"expr": expr}, manager, "dice-room", "u1", "player", "Pat"))
+    return manager.sent[0]
+
+
+def test_broadcast_lists_small_rolls():
+    message = _roll("3d6")
+    assert len(message["rolls"]) == 3
+
+
+def test_broadcast_omits_mass_rolls():
+    message = _roll(f"{dice.MAX_COUNT}d6")
+    assert "rolls" not in message
+    assert message["roll_count"] == dice.MAX_COUNT
+    assert "sum=" in message["detail"]
@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from app import item_catalog, item_db
+
+XML = b"""<?xml version="1.0"?>
+<itemsDb>
+  <items>
+    <item id="ember_blade" name="Ember Blade" slot="mainHand" tier="2" category="weapons" tags="fire,magic"/>
+    <item id="plain_ring" name="Plain Ring" slot="ring" tier="0" category="jewelry"/>
+  </items>
+</itemsDb>
+"""
+
+
+@pytest.fixture
+def small_catalog(tmp_path, monkeypatch):
+    path = tmp_path / "ItemsDB.xml"
+    path.write_bytes(XML)
+    monkeypatch.setenv("ARCANE_ITEM_DB_PATH", str(path))
+    assert item_catalog.reload_if_changed()
+    yield path
+    monkeypatch.delenv("ARCANE_ITEM_DB_PATH")
+    item_catalog.reload_if_changed()
+
+
+def test_compiled_cache_is_private_json(small_catalog):
+    catalog = item_catalog.get_catalog()
+    cache_path = item_catalog._cache_file(catalog.digest)
+    with open(cache_path, encoding="utf-8") as fh:
+        assert json.load(fh)["format"] == item_catalog.CATALOG_FORMAT
+    assert os.stat(cache_path).st_mode & 0o077 == 0
+
+    cached = item_catalog.load_catalog(str(small_catalog))
+    assert cached.items == catalog.items
+    assert all(isinstance(record[-1], tuple) for record in cached.items)
+
+
+def test_corrupt_cache_is_recompiled(small_catalog):
+    catalog = item_catalog.get_catalog()
+    with open(item_catalog._cache_file(catalog.digest), "w", encoding="utf-8") as fh:
+        fh.write('{"format": 5, "digest": "%s", "items": [["x"]]}' % catalog.digest)
+    assert item_catalog.load_catalog(str(small_catalog)).items == catalog.items
+
+
+def test_reload_publishes_a_consistent_snapshot(small_catalog):
+    snap = item_db._snapshot()
+    assert snap.version == item_catalog.get_catalog().version
+    assert sorted(snap.by_id) == ["ember_blade", "plain_ring"]
+    assert snap.index["items"] is snap.items
+    assert item_db.get_item_by_id("ember_blade").tags == ("fire", "magic")
+    with pytest.raises(AttributeError):
+        snap.items = []
+
+    small_catalog.write_bytes(XML.replace(b"plain_ring", b"gold_ring"))
+    assert item_catalog.reload_if_changed()
+    fresh = item_db._snapshot()
+    assert fresh is not snap and "gold_ring" in fresh.by_id
+    assert "plain_ring" in snap.by_id  # readers holding the old snapshot are unaffected
@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+
+from app import main
+from app.item_db import ItemDef
+from app.item_search import ItemSearchIndex
+
+ITEMS = [
+    ItemDef("longsword_t1", "Longsword", "mainhand", tier=1, category="weapons", tags=("martial", "slashing")),
+    ItemDef("longsword_t2", "Longsword", "mainhand", tier=2, category="weapons", tags=("martial", "slashing")),
+    ItemDef("longbow_t1", "Longbow", "mainhand", tier=1, category="weapons", tags=("ranged",)),
+    ItemDef("fire_ring_t2", "Ring of Embers", "ring", tier=2, category="jewelry", tags=("fire",)),
+    ItemDef("chain_mail_t1", "Chain Mail", "chest", tier=1, category="armor", tags=("heavy",)),
+]
+
+
+def _ids(result):
+    return [hit["id"] for hit in result["results"]]
+
+
+def test_exact_name_ranks_above_prefix():
+    result = ItemSearchIndex(ITEMS).search("longsword")
+    assert _ids(result) == ["longsword_t1", "longsword_t2"]
+
+    result = ItemSearchIndex(ITEMS).search("long")
+    assert set(_ids(result)) == {"longsword_t1", "longsword_t2", "longbow_t1"}
+
+
+def test_tags_and_multiple_words_intersect():
+    index = ItemSearchIndex(ITEMS)
+    assert _ids(index.search("fire")) == ["fire_ring_t2"]
+    assert _ids(index.search("chain heavy")) == ["chain_mail_t1"]
+    assert _ids(index.search("chain ranged")) == []
+
+
+def test_trigram_fallback_tolerates_typos():
+    assert _ids(ItemSearchIndex(ITEMS).search("lonsgword"))[:2] == ["longsword_t1", "longsword_t2"]
+
+
+def test_facets_count_matches_before_filters_and_paginate():
+    result = ItemSearchIndex(ITEMS).search("", tier=1, limit=2, offset=1)
+    assert result["facets"]["tier"] == {"1": 3, "2": 2}
+    assert result["facets"]["category"] == {"weapons": 3, "jewelry": 1, "armor": 1}
+    assert result["total"] == 3 and len(result["results"]) == 2
+
+    result = ItemSearchIndex(ITEMS).search("", category="ARMOR")
+    assert _ids(result) == ["chain_mail_t1"]
+
+
+def test_search_endpoint_uses_the_catalog():
+    response = TestClient(main.app).get("/api/items/search", params={"q": "sword", "limit": 500})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["limit"] == 200
+    assert body["results"] and all("sword" in (hit["name"] + hit["id"]).lower() for hit in body["results"])
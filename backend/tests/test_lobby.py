@@ -0,0 +1,51 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app import main
+
+client = TestClient(main.app)
+
+
+def _make_rooms(prefix, count):
+    for i in range(count):
+        client.post("/api/rooms", json={"name": f"{prefix} {i:02d}"})
+
+
+def test_api_rooms_is_unpaginated_without_limit():
+    prefix = f"Unpaged-{uuid.uuid4().hex[:6]}"
+    _make_rooms(prefix, main.LOBBY_PAGE_MAX // 2 + 5)
+    rooms = client.get("/api/rooms", params={"q": prefix}).json()
+    assert isinstance(rooms, list)
+    assert len(rooms) == main.LOBBY_PAGE_MAX // 2 + 5
+    assert len(client.get("/api/rooms", params={"q": prefix, "limit": 10}).json()) == 10
+
+
+def test_lobby_pages_and_total():
+    prefix = f"Paged-{uuid.uuid4().hex[:6]}"
+    _make_rooms(prefix, 25)
+    first = client.get("/api/lobby", params={"q": prefix, "limit": 10}).json()
+    last = client.get("/api/lobby", params={"q": prefix, "limit": 10, "offset": 20}).json()
+    assert first["total"] == last["total"] == 25
+    assert len(first["rooms"]) == 10 and len(last["rooms"]) == 5
+    # Newest first.
+    assert first["rooms"][0]["name"] == f"{prefix} 24"
+    assert last["rooms"][-1]["name"] == f"{prefix} 00"
+    assert all(r["max_seats"] == main.MAX_SEATS_TOTAL for r in first["rooms"])
+
+
+def test_lobby_version_invalidates_cached_pages():
+    prefix = f"Versioned-{uuid.uuid4().hex[:6]}"
+    _make_rooms(prefix, 1)
+    assert client.get("/api/lobby", params={"q": prefix}).json()["total"] == 1
+
+    version = main.manager.lobby_version
+    _make_rooms(prefix, 1)
+    assert main.manager.lobby_version == version + 1
+    assert client.get("/api/lobby", params={"q": prefix}).json()["total"] == 2
+
+
+def test_lobby_filter_escapes_like_wildcards():
+    prefix = f"Escape-{uuid.uuid4().hex[:6]}"
+    _make_rooms(prefix, 1)
+    assert client.get("/api/lobby", params={"q": f"{prefix}%"}).json()["total"] == 0
@@ -0,0 +1,55 @@
+import random
+
+from app import item_catalog, item_db
+from app.item_db import ItemDef
+
+
+def _item(iid, tier, category="weapons"):
+    return ItemDef(iid, iid.title(), "mainHand", tier=tier, category=category)
+
+
+def test_alias_sampling_matches_weights():
+    weights = [1.0, 2.0, 3.0, 4.0]
+    prob, alias = item_db._alias_table(weights)
+    pool = list(range(len(weights)))
+    rng = random.Random(1234)
+    draws = 40000
+    counts = [0] * len(weights)
+    for _ in range(draws):
+        counts[item_db._alias_pick(pool, prob, alias, rng)] += 1
+    for weight, count in zip(weights, counts):
+        assert abs(count / draws - weight / sum(weights)) < 0.01
+
+
+def test_seeded_loot_replays():
+    cfg = {"source": "boss", "count": 10, "tierMin": 0, "tierMax": 3}
+    first, err = item_db.generate_loot(cfg, random.Random("replay"))
+    assert not err and len(first) == 10
+    again, _ = item_db.generate_loot(cfg, random.Random("replay"))
+    assert [it["id"] for it in again] == [it["id"] for it in first]
+
+
+def test_pool_cache_is_per_items_list():
+    old = [_item("club", 0), _item("mace", 1)]
+    new = [_item("axe", 0)]
+    args = (0, 3, True, ["weapons"], [], [], 1.0)
+
+    pool, _, _ = item_db._loot_pool(old, *args)
+    assert {it.id for it in pool} == {"club", "mace"}
+    pool, _, _ = item_db._loot_pool(new, *args)
+    assert [it.id for it in pool] == ["axe"]
+
+
+def test_broken_catalog_is_reported_without_a_forced_reload(monkeypatch):
+    broken = item_catalog.CompiledCatalog(path="", digest="", stamp=None, error="ItemsDB.xml not found", version=-1)
+    calls = []
+
+    def get_catalog(force=False):
+        calls.append(force)
+        return broken
+
+    monkeypatch.setattr(item_catalog, "get_catalog", get_catalog)
+    monkeypatch.setattr(item_db, "_SNAPSHOT", None)
+    assert item_db.generate_loot({"count": 2}) == ([], "ItemsDB.xml not found")
+    assert item_db.generate_loot({"count": 2}) == ([], "ItemsDB.xml not found")
+    assert not any(calls)
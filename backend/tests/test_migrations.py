@@ -0,0 +1,130 @@
+import json
+import sqlite3
+
+from app import main
+
+
+# CREATE TABLE statements of the last release before schema_version, as its
+# db_init(), seed_core_rules() and sync_open5e() ran them.
+BASELINE_SCHEMA = """
+CREATE TABLE rooms (
+  room_id TEXT PRIMARY KEY,
+  name TEXT,
+  created_at REAL,
+  updated_at REAL,
+  scene_title TEXT,
+  scene_text TEXT,
+  grid_cols INTEGER,
+  grid_rows INTEGER,
+  grid_cell INTEGER,
+  map_image_url TEXT
+);
+CREATE TABLE inventory (
+  room_id TEXT,
+  user_id TEXT,
+  json TEXT,
+  updated_at REAL,
+  PRIMARY KEY (room_id, user_id)
+);
+CREATE TABLE characters (
+  character_id TEXT PRIMARY KEY,
+  room_id TEXT,
+  owner_user_id TEXT,
+  name TEXT,
+  sheet_json TEXT,
+  enriched_json TEXT,
+  created_at REAL,
+  updated_at REAL
+);
+CREATE TABLE chat_log (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  room_id TEXT,
+  ts REAL,
+  type TEXT,
+  user_id TEXT,
+  name TEXT,
+  role TEXT,
+  channel TEXT,
+  text TEXT,
+  expr TEXT
+);
+CREATE TABLE loot_bags (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  room_id TEXT,
+  bag_id TEXT,
+  name TEXT,
+  items TEXT,
+  created_by TEXT,
+  visible_to_players INTEGER,
+  created_at REAL,
+  updated_at REAL,
+  UNIQUE(room_id, bag_id)
+);
+CREATE TABLE rules_abilities (
+  ability_id TEXT PRIMARY KEY,
+  name TEXT,
+  abbr TEXT,
+  description TEXT
+);
+CREATE TABLE rules_ability_mods (
+  score INTEGER PRIMARY KEY,
+  modifier INTEGER
+);
+CREATE TABLE rules_races (
+  slug TEXT PRIMARY KEY,
+  name TEXT,
+  source TEXT,
+  data_json TEXT,
+  synced_at REAL
+);
+"""
+
+
+def _old_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO rooms (room_id, name, created_at) VALUES ('old-room', 'Old Room', 1.0)")
+    conn.execute("INSERT INTO inventory (room_id, user_id, json) VALUES ('old-room', 'u1', '{\"bag\": []}')")
+    conn.execute("INSERT INTO chat_log (room_id, ts, type, text) VALUES ('old-room', 1.0, 'chat', 'hello')")
+    sheet = {"name": "Vex", "class": "Rogue", "level": 5, "stats": {"dex": 18}, "notes": "x" * 100}
+    conn.execute(
+        "INSERT INTO characters (character_id, room_id, owner_user_id, name, sheet_json, enriched_json) "
+        "VALUES ('ch1', 'old-room', 'u1', 'Vex', ?, '{}')",
+        (json.dumps(sheet),),
+    )
+    conn.execute("INSERT INTO rules_races (slug, name, data_json) VALUES ('elf', 'Elf', '{}')")
+    conn.commit()
+    conn.close()
+
+
+def _columns(conn, table):
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_old_database_is_migrated_in_place(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.db")
+    _old_database(path)
+    monkeypatch.setattr(main, "DB_PATH", path)
+    monkeypatch.setattr(main, "_db", None)
+    monkeypatch.setattr(main, "_db_ready", False)
+
+    conn = main.db()
+    try:
+        assert main.db_schema_version() == main.SCHEMA_MIGRATIONS[-1][0]
+        assert {"tokens_json", "lighting_json", "locked"} <= _columns(conn, "rooms")
+        assert {"class_name", "level", "summary_json"} <= _columns(conn, "characters")
+        assert {"saved_characters", "saved_campaigns", "save_imports"} <= {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+
+        assert conn.execute("SELECT name FROM rooms WHERE room_id='old-room'").fetchone()["name"] == "Old Room"
+        assert conn.execute("SELECT json FROM inventory WHERE user_id='u1'").fetchone()["json"] == '{"bag": []}'
+        assert conn.execute("SELECT text FROM chat_log").fetchone()["text"] == "hello"
+        assert conn.execute("SELECT name FROM rules_races WHERE slug='elf'").fetchone()["name"] == "Elf"
+        row = conn.execute("SELECT class_name, level, summary_json FROM characters WHERE character_id='ch1'").fetchone()
+        assert (row["class_name"], row["level"]) == ("Rogue", 5)
+        assert json.loads(row["summary_json"]) == {"name": "Vex", "level": 5, "stats": {"dex": 18}}
+
+        assert main.db_migrate() == []  # up to date: nothing runs twice
+    finally:
+        conn.close()
@@ -0,0 +1,62 @@
+from app import item_db, rules5e
+
+
+class _Seat:
+    def __init__(self, name, role="player"):
+        self.name = name
+        self.role = role
+
+
+SHEET = {"name": "Brak", "level": 5, "stats": {"str": 16, "dex": 14}, "proficiencies_text": "Martial weapons, Medium armor"}
+CHARACTERS = [{"character_id": "c1", "owner_user_id": "u1", "name": "Brak", "sheet": SHEET}]
+CLIENTS = {"u1": _Seat("Brak"), "u2": _Seat("Ivy"), "dm": _Seat("DM", role="dm")}
+
+
+def _inventories(**equipment):
+    return {"u1": {"equipment": equipment}}
+
+
+def test_attack_and_ac_lines():
+    stats = rules5e.party_stats(
+        _inventories(mainhand={"id": "longsword_t1", "name": "Longsword"}, legs={"id": "chainLeggings_t1"}),
+        CHARACTERS,
+        CLIENTS,
+    )
+    brak = stats["u1"]
+    assert (brak["character_id"], brak["prof_bonus"]) == ("c1", 3)
+    # Medium armor 13 + dex capped at +2.
+    assert (brak["ac"], brak["ac_armor"], brak["ac_dex_cap"]) == (15, "chainLeggings_t1", 2)
+    [attack] = brak["attacks"]
+    assert attack["item_id"] == "longsword_t1"
+    assert (attack["ability"], attack["proficient"], attack["attack_bonus"], attack["damage"]) == ("str", True, 6, "1d8+3")
+
+
+def test_connected_players_without_inventory_are_listed_but_not_the_dm():
+    stats = rules5e.party_stats(_inventories(), CHARACTERS, CLIENTS)
+    assert set(stats) == {"u1", "u2"}
+    assert (stats["u2"]["ac"], stats["u2"]["attacks"], stats["u2"]["character_id"]) == (10, [], None)
+    assert stats["u1"]["ac"] == 12  # unarmored: 10 + dex
+
+
+def test_character_found_by_seat_name():
+    unowned = [{**CHARACTERS[0], "owner_user_id": ""}]
+    stats = rules5e.party_stats(_inventories(), unowned, CLIENTS)
+    assert stats["u1"]["character_id"] == "c1"
+
+
+def test_loadouts_are_memoized_until_equipment_changes():
+    inventories = _inventories(mainhand={"id": "longsword_t1", "name": "Longsword"})
+    first = rules5e.party_stats(inventories, CHARACTERS, CLIENTS)["u1"]
+    again = rules5e.party_stats(inventories, CHARACTERS, CLIENTS)["u1"]
+    assert again["attacks"] is first["attacks"]
+
+    magic = _inventories(mainhand={"id": "longsword_t1", "name": "Longsword", "magicBonus": 1})
+    changed = rules5e.party_stats(magic, CHARACTERS, CLIENTS)["u1"]
+    assert changed["attacks"][0]["attack_bonus"] == 7
+
+
+def test_tiered_catalog_ids_resolve_to_stat_blocks():
+    rules5e._load_rules()
+    items, _ = item_db.load_items()
+    weapons = [it.id for it in items if it.category == "weapons"]
+    assert weapons and all(rules5e._base_id(iid) in rules5e._CACHE["weapons"] for iid in weapons)
@@ -0,0 +1,52 @@
+import json
+import time
+
+from app.play_history import LastPlayedStore
+
+
+def _on_disk(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_pending_touches_flush_on_a_timer(tmp_path):
+    path = str(tmp_path / ".last_played")
+    store = LastPlayedStore(path, flush_seconds=0.2)
+
+    store.touch("a")  # first touch is due immediately
+    assert set(_on_disk(path)) == {"a"}
+
+    store.touch("b")
+    store.forget("a")
+    assert set(_on_disk(path)) == {"a"}  # still inside the batch window
+
+    deadline = time.monotonic() + 2
+    while set(_on_disk(path)) != {"b"} and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert set(_on_disk(path)) == {"b"}
+
+
+def test_get_prefers_the_newer_fallback(tmp_path):
+    store = LastPlayedStore(str(tmp_path / ".last_played"))
+    assert store.get("x", fallback="2024-01-01") == "2024-01-01"
+    stamp = store.touch("x")
+    assert store.get("x", fallback="2000-01-01") == stamp
+
+
+def test_workers_sharing_a_sidecar_merge_their_stamps(tmp_path):
+    path = str(tmp_path / ".last_played")
+    first = LastPlayedStore(path, flush_seconds=60)
+    second = LastPlayedStore(path, flush_seconds=60)
+    first.get("warm")  # both load the empty file before either writes
+    second.get("warm")
+
+    first.touch("a")
+    second.touch("b")
+    first.touch("c")
+    first.flush()
+    assert set(_on_disk(path)) == {"a", "b", "c"}
+
+    second.forget("a")
+    second.flush()
+    assert set(_on_disk(path)) == {"b", "c"}
+    assert second.get("c") == first.get("c")  # the flush picked up the other worker's stamps
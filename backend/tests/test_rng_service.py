@@ -0,0 +1,88 @@
+import asyncio
+import random
+
+from app import ai_dm, interactive_items, message_handlers, rng_service
+
+
+def _draws(room_id, n=5):
+    rng = rng_service.stream("loot", room_id)
+    return [rng.random() for _ in range(n)]
+
+
+def test_env_seeded_room_keeps_its_streams_across_eviction(monkeypatch):
+    monkeypatch.setenv("ARCANE_RNG_SEED", "replay")
+    reference_rng = random.Random("replay:rng-evicted:loot")
+    reference = [reference_rng.random() for _ in range(10)]
+
+    first = _draws("rng-evicted")
+    rng_service.drop_room("rng-evicted")
+    assert first + _draws("rng-evicted") == reference
+
+
+def test_explicitly_seeded_room_is_kept():
+    rng_service.seed_room("rng-explicit", 7)
+    before = rng_service.for_room("rng-explicit")
+    rng_service.drop_room("rng-explicit")
+    assert rng_service.for_room("rng-explicit") is before
+
+
+def test_unseeded_room_is_dropped(monkeypatch):
+    monkeypatch.delenv("ARCANE_RNG_SEED", raising=False)
+    before = rng_service.for_room("rng-unseeded")
+    rng_service.drop_room("rng-unseeded")
+    assert rng_service.for_room("rng-unseeded") is not before
+
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+class _Manager:
+    def __init__(self):
+        self.sent = []
+
+    async def broadcast(self, room_id, message):
+        self.sent.append(message)
+
+
+def _seed(role, seed):
+    socket, manager = _Socket(), _Manager()
+    asyncio.run(message_handlers.handle_rng_seed(None, socket, {"seed": seed}, manager, "rng-msg", "u1", role, "Pat"))
+    return socket.sent, manager.sent
+
+
+def test_only_the_dm_can_seed_a_room():
+    replies, broadcasts = _seed("player", "abc")
+    assert replies[0]["type"] == "error" and not broadcasts
+    assert rng_service.for_room("rng-msg").seed is None
+
+    _, broadcasts = _seed("dm", "abc")
+    assert rng_service.for_room("rng-msg").seed == "abc"
+    assert broadcasts == [{"type": "rng.seeded", "seeded": True}]  # the seed itself stays private
+
+    _, broadcasts = _seed("dm", "")
+    assert rng_service.for_room("rng-msg").seed is None and broadcasts[0]["seeded"] is False
+
+
+def _replay(draw):
+    rng_service.seed_room("rng-replay", "table-7")
+    first = draw()
+    rng_service.seed_room("rng-replay", "table-7")
+    return first, draw()
+
+
+def test_seeded_rooms_replay_initiative_and_hazards():
+    actors = [{"actor_id": f"a{i}", "actor_name": f"A{i}", "dex_modifier": 0} for i in range(6)]
+    first, again = _replay(
+        lambda: ai_dm.create_combat_state("enc", actors, rng_service.stream("initiative", "rng-replay")).initiative_order
+    )
+    assert first == again
+
+    first, again = _replay(
+        lambda: [interactive_items.parse_and_roll_damage("4d6", room_id="rng-replay")["rolls"] for _ in range(3)]
+    )
+    assert first == again
@@ -0,0 +1,57 @@
+import time
+
+from app import main
+from app.rooms import RoomManager
+
+
+def _idle(room):
+    room.last_active = time.time() - 3600
+
+
+def test_hibernated_room_rehydrates_state():
+    room = main.manager.create_room("Hibernate")
+    room.tokens = [{"id": "t1", "name": "Goblin", "x": 3, "y": 4}]
+    room.scene = {"title": "Crypt", "text": "Dust everywhere."}
+    room.inventories = {"u1": {"user_id": "u1", "bag": [{"id": "dagger", "name": "Dagger"}], "equipment": {}}}
+    room.loot_bags = {"b1": {"bag_id": "b1", "name": "Bag", "items": [{"id": "club", "name": "Club"}]}}
+    room.chat_log = [{"type": "chat.message", "ts": time.time(), "text": "hello", "name": "System"}]
+    _idle(room)
+
+    assert room.room_id in main.manager.evict_idle(main._flush_room)
+    assert main.manager.live_occupancy(room.room_id) is None
+
+    loaded = main.ensure_room_loaded(room.room_id)
+    assert loaded is not room
+    assert loaded.tokens == room.tokens
+    assert loaded.scene == room.scene
+    assert main.db_load_inventories(room.room_id) == room.inventories
+    assert [b["items"] for b in main.db_load_loot_bags(room.room_id).values()] == [[{"id": "club", "name": "Club"}]]
+    assert [m["text"] for m in main.db_load_chat_log(room.room_id)] == ["hello"]
+
+
+def test_rooms_with_live_ai_state_are_not_evicted():
+    manager = RoomManager(idle_seconds=60, max_rooms=0)
+    busy = manager.create_room("Combat")
+    busy.ai_combat = object()
+    quiet = manager.create_room("Quiet")
+    _idle(busy)
+    _idle(quiet)
+
+    flushed = []
+    assert manager.evict_idle(flushed.append) == [quiet.room_id]
+    assert flushed == [quiet]
+    assert manager.live_occupancy(busy.room_id) is busy
+
+    busy.ai_combat = None
+    assert manager.evict_idle(flushed.append) == [busy.room_id]
+
+
+def test_failed_flush_keeps_room():
+    manager = RoomManager(idle_seconds=0)
+    room = manager.create_room("Keep")
+
+    def boom(_room):
+        raise RuntimeError("disk full")
+
+    assert manager.evict_idle(boom) == []
+    assert manager.live_occupancy(room.room_id) is room
@@ -0,0 +1,54 @@
+import json
+import sqlite3
+
+import pytest
+
+from app import rules5e_data
+
+
+def _conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def test_database_errors_serve_an_uncached_empty_catalog():
+    rules5e_data.invalidate_catalog()
+    entry = rules5e_data.catalog_response(_conn(), "races")
+    assert json.loads(entry["body"]) == []
+    assert entry["etag"].startswith('"')
+    assert not rules5e_data._catalog_cache
+
+
+def test_bodies_are_cached_until_invalidated(monkeypatch):
+    rules5e_data.invalidate_catalog()
+    monkeypatch.setattr(rules5e_data, "list_rules", lambda *_args, **_kwargs: [{"slug": "elf"}])
+    entry = rules5e_data.catalog_response(_conn(), "races")
+    assert rules5e_data.catalog_response(_conn(), "races") is entry
+    rules5e_data.invalidate_catalog()
+    assert rules5e_data.catalog_response(_conn(), "races") is not entry
+
+
+def test_rows_read_before_an_invalidation_are_not_cached(monkeypatch):
+    rules5e_data.invalidate_catalog()
+
+    def stale_read(*_args, **_kwargs):
+        rules5e_data.invalidate_catalog()  # the sync thread lands mid-query
+        return [{"slug": "pre-sync"}]
+
+    monkeypatch.setattr(rules5e_data, "list_rules", stale_read)
+    entry = rules5e_data.catalog_response(_conn(), "races")
+    assert json.loads(entry["body"]) == [{"slug": "pre-sync"}]
+    assert not rules5e_data._catalog_cache
+
+
+def test_programming_errors_are_not_swallowed(monkeypatch):
+    rules5e_data.invalidate_catalog()
+
+    def broken(*_args, **_kwargs):
+        raise KeyError("oops")
+
+    monkeypatch.setattr(rules5e_data, "list_rules", broken)
+    with pytest.raises(KeyError):
+        rules5e_data.catalog_response(_conn(), "feats")
+    assert not rules5e_data._catalog_cache
@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import main
+from app import character_system, save_store
+from app.play_history import store_for
+
+
+@pytest.fixture(autouse=True)
+def sqlite_backend(monkeypatch):
+    monkeypatch.setattr(save_store, "SAVE_BACKEND", "sqlite")
+
+
+@pytest.fixture
+def legacy_dir(tmp_path):
+    player = tmp_path / "saved_characters" / "player_p1"
+    player.mkdir(parents=True)
+    for cid, name in (("c-old", "Old"), ("c-new", "New")):
+        with open(player / f"{cid}.json", "w") as f:
+            json.dump({"character_id": cid, "character_name": name, "player_id": "p1", "level": 3,
+                       "created_at": "2024-01-01T00:00:00"}, f)
+    sidecar = store_for(str(tmp_path / "saved_characters"))
+    sidecar.touch("c-new")
+    sidecar.flush()
+    return tmp_path / "saved_characters"
+
+
+def test_file_stays_the_default_backend():
+    env = {k: v for k, v in os.environ.items() if k != "ARCANE_SAVE_BACKEND"}
+    out = subprocess.run(
+        [sys.executable, "-c", "from app import save_store; print(save_store.SAVE_BACKEND, save_store.enabled())"],
+        cwd=os.path.dirname(os.path.dirname(__file__)), env=env, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.split() == ["file", "False"]
+
+
+def test_saves_share_mains_connection():
+    assert save_store._db() is main.db()
+
+
+def test_save_tables_come_from_migration_4():
+    assert main.db_schema_version() >= 4
+    names = {row[0] for row in main.db().execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert {"saved_characters", "saved_campaigns", "save_imports"} <= names
+
+
+def test_legacy_directory_imports_once_from_any_cwd(legacy_dir, monkeypatch):
+    assert save_store.import_character_dir(str(legacy_dir)) == 2
+    assert save_store.import_character_dir(str(legacy_dir)) == 0
+
+    save_store._imported.clear()  # a fresh process, started from another directory
+    monkeypatch.chdir(legacy_dir.parent)
+    assert save_store.import_character_dir("saved_characters") == 0
+
+    listed = save_store.list_characters("p1")
+    assert [c["id"] for c in listed] == ["c-new", "c-old"]  # sidecar last_played wins
+    assert listed[0]["level"] == 3
+
+
+def test_character_round_trip_through_character_system(tmp_path, monkeypatch):
+    monkeypatch.setattr(character_system, "CHARACTERS_DIR", str(tmp_path / "empty"))
+    character = character_system.create_character({"character_name": "Round", "class": "Wizard"}, "p-rt")
+    cid = character_system.save_character(character)
+
+    loaded = character_system.load_character(cid)
+    assert loaded["character_name"] == "Round" and loaded["last_played"]
+    assert not os.path.exists(tmp_path / "empty")  # nothing written to the file tree
+
+    assert character_system.update_character(cid, {"level": 4, "not_a_field": 1})
+    again = character_system.load_character(cid)
+    assert again["level"] == 4 and "not_a_field" not in again
+    assert [c["id"] for c in character_system.list_characters("p-rt")] == [cid]
+
+    assert character_system.delete_character(cid)
+    assert character_system.load_character(cid) is None
+
+
+def test_campaign_round_trip():
+    save_store.put_campaign({"campaign_id": "camp-1", "campaign_name": "Ashes", "created_by_user_id": "dm1",
+                             "created_at": "2024-02-02T00:00:00"})
+    assert save_store.get_campaign("camp-1")["campaign_name"] == "Ashes"
+    assert [c["id"] for c in save_store.list_campaigns("dm1")] == ["camp-1"]
+    assert save_store.list_campaigns("dm1")[0]["last_played"]
+    assert save_store.delete_campaign("camp-1")
+    assert save_store.get_campaign("camp-1") is None